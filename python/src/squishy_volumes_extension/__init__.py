@@ -27,7 +27,11 @@ from .preferences import (
     unregister_preferences,
 )
 from .get_preferences import get_print_debug_info
-from .squishy_volumes_properties import register_properties, unregister_properties
+from .squishy_volumes_properties import (
+    register_properties,
+    reset_properties,
+    unregister_properties,
+)
 from .progress_update import (
     register_progress_update,
     register_progress_update_toggle,
@@ -37,8 +41,6 @@ from .progress_update import (
 from .bridge import (
     SimulationHandle,
     build_info,
-    register_prune_simulation_handles,
-    unregister_prune_simulation_handles,
 )
 from .frame_change import register_handler, unregister_handler
 from .panels import register_panels, unregister_panels
@@ -56,22 +58,29 @@ bl_info = {
 }
 
 
+# Classes and properties survive loading a file, so there is no need to re-register.
+# The simulations of the previous file don't, and neither do timers,
+# message bus subscriptions and handlers that aren't persistent.
 @bpy.app.handlers.persistent
-def toggle_register(*_):
-    unregister()
-    register()
+def reset_after_load(*_):
+    unregister_handler()
+    SimulationHandle.drop_all()
+    reset_properties()
+    register_handler()
+    register_progress_update()
+    register_progress_update_toggle()
 
 
 def register_blend_file_change_handler():
-    if toggle_register not in bpy.app.handlers.load_post:
-        bpy.app.handlers.load_post.append(toggle_register)
+    if reset_after_load not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(reset_after_load)
         if get_print_debug_info():
             print("Squishy Volumes load_post registered.")
 
 
 def unregister_blend_file_change_handler():
-    if toggle_register in bpy.app.handlers.load_post:
-        bpy.app.handlers.load_post.remove(toggle_register)
+    if reset_after_load in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(reset_after_load)
         if get_print_debug_info():
             print("Squishy Volumes load_post unregistered.")
 
@@ -79,7 +88,8 @@ def unregister_blend_file_change_handler():
 def register():
     register_preferences()
 
-    version_rust = build_info()["wrapper"]["crate_info"]["version"]
+    info = build_info()
+    version_rust = info["wrapper"]["crate_info"]["version"]
     manifest_path = Path(__file__).parent / "blender_manifest.toml"
     with manifest_path.open("rb") as f:
         blender_manifest = tomllib.load(f)
@@ -89,9 +99,7 @@ def register():
             f"Version mismatch! Expected {version_python} but loaded {version_rust}"
         )
     if get_print_debug_info():
-        print(
-            f"Squishy Volumes detailed build info: {json.dumps(build_info(), indent=4)}"
-        )
+        print(f"Squishy Volumes detailed build info: {json.dumps(info, indent=4)}")
 
     register_popup()
     register_blend_file_change_handler()
@@ -104,13 +112,11 @@ def register():
     register_view_utils()
     register_script_utils()
     register_append_handler()
-    register_prune_simulation_handles()
     register_drivers()
 
 
 def unregister():
     unregister_drivers()
-    unregister_prune_simulation_handles()
     unregister_append_handler()
     unregister_script_utils()
     unregister_view_utils()
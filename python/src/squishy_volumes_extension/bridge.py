@@ -17,8 +17,6 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import platform
-import bpy
-from bpy.app.handlers import persistent
 
 
 import json
@@ -26,13 +24,18 @@ import numpy
 from typing import Any, Self
 
 from .shim import *
-from .get_preferences import get_print_debug_info
 from .hint_at_info import *
 
 
+_build_info: dict[str, Any] | None = None
+
+
 @hint_at_info
 def build_info() -> dict[str, Any]:
-    return json.loads(squishy_volumes_wrap.build_info_as_json())
+    global _build_info
+    if _build_info is None:
+        _build_info = json.loads(squishy_volumes_wrap.build_info_as_json())
+    return _build_info
 
 
 @hint_at_info
@@ -40,9 +43,40 @@ def available_gpus() -> list[str]:
     return squishy_volumes_wrap.available_gpus()
 
 
-DETECTED_DEVICES = [("CPU", f"CPU ({platform.processor()})", "")] + [
-    (gpu, gpu, "") for gpu in available_gpus()
-]
+# running entries first, then the queued ones in order
+_bake_queue: list[dict[str, Any]] = []
+
+
+@hint_at_info
+def update_bake_queue(*, order: str, max_concurrent: int):
+    global _bake_queue
+    _bake_queue = json.loads(
+        squishy_volumes_wrap.update_bake_queue(
+            settings=json.dumps({"order": order, "max_concurrent": max_concurrent})
+        )
+    )
+
+
+def bake_queue() -> list[dict[str, Any]]:
+    return _bake_queue
+
+
+@hint_at_info
+def move_in_bake_queue(*, uuid: str, offset: int):
+    squishy_volumes_wrap.move_in_bake_queue(uuid=uuid, offset=offset)
+
+
+# enumerating the adapters is slow, so it only happens once the device is first shown
+_detected_devices: list[tuple[str, str, str]] | None = None
+
+
+def detected_devices(*_) -> list[tuple[str, str, str]]:
+    global _detected_devices
+    if _detected_devices is None:
+        _detected_devices = [("CPU", f"CPU ({platform.processor()})", "")] + [
+            (gpu, gpu, "") for gpu in available_gpus()
+        ]
+    return _detected_devices
 
 
 class SimulationInputHandle:
@@ -101,7 +135,14 @@ class SimulationHandle:
         self.handle = handle
         self.last_error = None
         self.progress = None
+        self.bake_state = None
         self.loaded_frame = None
+        # as of the last poll
+        self.computed_frames = 0
+        self.polled_changes = None
+        self.polled_time = 0.0
+        self.stats_snapshot = None
+        self.stats_version = None
 
     @staticmethod
     def exists(*, uuid: str) -> bool:
@@ -126,17 +167,34 @@ class SimulationHandle:
             )
         )  # ty:ignore[invalid-return-type]
 
+    @hint_at_info
+    def fork(self, *, uuid: str, directory: str, frame: int) -> Self:
+        return SimulationHandle(
+            handle=self.handle.fork(
+                uuid=uuid,
+                directory=directory,
+                frame=frame,
+            )
+        )  # ty:ignore[invalid-return-type]
+
     @hint_at_info
     def input_header(self) -> dict[str, Any]:
         return json.loads(self.handle.input_header())
 
+    @hint_at_info
+    def changes(self) -> int:
+        return self.handle.changes()
+
     @hint_at_info
     def poll(self):
-        progress = self.handle.poll()
-        if progress is None:
+        report = self.handle.poll()
+        if report is None:
             self.progress = None
+            self.bake_state = None
         else:
-            self.progress = json.loads(progress)
+            report = json.loads(report)
+            self.progress = report["progress"]
+            self.bake_state = report["bake_state"]
 
     @hint_at_info
     def computing(self) -> bool:
@@ -172,7 +230,6 @@ class SimulationHandle:
             frame=frame,
             attribute=json.dumps(attribute),
         )
-        self.loaded_frame = frame
         return data
 
     @hint_at_info
@@ -183,48 +240,36 @@ class SimulationHandle:
             frame=frame,
             attribute=json.dumps(attribute),
         )
-        self.loaded_frame = frame
         return data
 
     @hint_at_info
     def stats(self) -> dict[str, Any]:
-        return json.loads(self.handle.stats())
+        return json.loads(self.handle.stats(frame=self.loaded_frame))
+
+    # panels draw often, asking for changes is cheap, the stats are not
+    # polls don't see every simulation, e.g. without sync or after an error
+    def cached_stats(self) -> dict[str, Any]:
+        version = (self.changes(), self.loaded_frame)
+        if self.stats_snapshot is None or self.stats_version != version:
+            self.stats_snapshot = self.stats()
+            self.stats_version = version
+        return self.stats_snapshot
 
     @hint_at_info
     def drop(self):
         _simulations.pop(self.handle.uuid())
         self.handle.drop()
 
+    @hint_at_info
+    @staticmethod
+    def prune(*, live_uuids: set[str]):
+        to_drop = [uuid for uuid in _simulations.keys() if uuid not in live_uuids]
+        for uuid in to_drop:
+            _simulations[uuid].drop()
+
     @hint_at_info
     @staticmethod
     def drop_all():
         for simulation in _simulations.values():
             simulation.handle.drop()
         _simulations.clear()
-
-
-# simulation objects can be deleted through uncontrolled means, for example, undo
-@persistent
-def prune_simulation_handles(scene):
-    live_uuids = [
-        obj.squishy_volumes.uuid
-        for obj in bpy.data.objects
-        if obj.squishy_volumes.type == "Simulation"
-    ]
-    to_drop = [uuid for uuid in _simulations.keys() if uuid not in live_uuids]
-    for uuid in to_drop:
-        _simulations[uuid].drop()
-
-
-def register_prune_simulation_handles():
-    if prune_simulation_handles not in bpy.app.handlers.depsgraph_update_post:
-        bpy.app.handlers.depsgraph_update_post.append(prune_simulation_handles)
-    if get_print_debug_info():
-        print("Squishy Volumes prune simulation handles registered.")
-
-
-def unregister_prune_simulation_handles():
-    if prune_simulation_handles in bpy.app.handlers.depsgraph_update_post:
-        bpy.app.handlers.depsgraph_update_post.remove(prune_simulation_handles)
-    if get_print_debug_info():
-        print("Squishy Volumes prune simulation handles unregistered.")
@@ -22,10 +22,15 @@ import bpy
 
 from .popup import with_popup
 from .output import (
-    sync_output,
+    PendingOutputs,
+    apply_outputs,
+    request_outputs,
+    shutdown_fetch_pool,
+    sync_outputs,
 )
+from .util import force_ui_redraw
 
-from .get_preferences import get_print_debug_info
+from .get_preferences import get_async_sync, get_print_debug_info
 from .bridge import SimulationHandle
 from .squishy_volumes_properties import (
     get_simulation_objects,
@@ -38,6 +43,8 @@ from .squishy_volumes_properties import (
 
 
 def sync(scene):
+    # rendering needs the frame right away
+    blocking = not get_async_sync() or bpy.app.is_job_running("RENDER")
     for sim_obj in get_simulation_objects():
         sim_props = sim_obj.squishy_volumes  # ty:ignore[unresolved-attribute]
         if not sim_props.sync:
@@ -53,28 +60,115 @@ def sync(scene):
             sim_props,
             sim_handle,
             scene.frame_current,
+            blocking=blocking,
         )
 
 
+# Outputs that are fetched in the background, at most one frame per simulation.
+_pending_syncs: dict[str, PendingOutputs] = {}
+PENDING_SYNC_INTERVAL = 0.02
+
+
 def sync_simulation(
     sim_props: Squishy_Volumes_Properties,
     sim_handle: SimulationHandle,
     frame: int,
+    blocking: bool = True,
 ):
+    """Without blocking, the outputs keep showing the previous frame until the new one arrived."""
+    scene_frame = frame
     frame = frame_to_load(sim_props, frame)  # ty:ignore[invalid-assignment]
     if frame is None:
         return
 
-    desynced_objs = []
-    for output_obj in get_output_objects_with_uuid(sim_props.uuid):
+    uuid = sim_props.uuid
+    pending = _pending_syncs.pop(uuid, None)
+    if not blocking and pending is not None and pending.frame == frame:
+        _pending_syncs[uuid] = pending
+        return
+    if pending is not None:
+        # scrubbed further, no need to show this one
+        pending.cancel()
+
+    output_objs = []
+    for output_obj in get_output_objects_with_uuid(uuid):
         if output_obj.mode == "EDIT":
             print(f"Skipping sync for object in edit mode: {output_obj.name}")
             continue
-        try:
-            sync_output(sim_handle, output_obj, frame)
-        except RuntimeError as e:
-            desynced_objs.append((output_obj, e))
+        output_objs.append(output_obj)
+
+    if blocking:
+        preloaded = _render_preloads.pop(uuid, None)
+        report_desynced(uuid, sync_outputs(sim_handle, output_objs, frame, preloaded))
+        preload_next_render_frame(
+            sim_props, sim_handle, output_objs, scene_frame, frame
+        )
+        return
+
+    _pending_syncs[uuid] = request_outputs(sim_handle, output_objs, frame)
+    if not bpy.app.timers.is_registered(apply_pending_syncs):
+        bpy.app.timers.register(
+            apply_pending_syncs, first_interval=PENDING_SYNC_INTERVAL
+        )
+
+
+# The scene frames of a running render and the next one's outputs per simulation,
+# which are fetched while the current frame renders.
+_render_frames: range | None = None
+_render_preloads: dict[str, PendingOutputs] = {}
+
+
+def preload_next_render_frame(
+    sim_props: Squishy_Volumes_Properties,
+    sim_handle: SimulationHandle,
+    output_objs: list[bpy.types.Object],
+    scene_frame: int,
+    loaded_frame: int,
+):
+    if _render_frames is None or scene_frame not in _render_frames:
+        return
+    next_scene_frame = scene_frame + _render_frames.step
+    if next_scene_frame not in _render_frames:
+        return
+    next_frame = frame_to_load(sim_props, next_scene_frame)
+    # holding still, e.g. before the simulation starts or after it ended
+    if next_frame is None or next_frame == loaded_frame:
+        return
+    _render_preloads[sim_props.uuid] = request_outputs(
+        sim_handle, output_objs, next_frame
+    )
+
+
+def start_render_preload(scene, *_):
+    global _render_frames
+    _render_frames = range(scene.frame_start, scene.frame_end + 1, scene.frame_step)
+
+
+def stop_render_preload(*_):
+    global _render_frames
+    _render_frames = None
+    for pending in _render_preloads.values():
+        pending.cancel()
+    _render_preloads.clear()
+
+
+def apply_pending_syncs():
+    applied = False
+    for uuid, pending in list(_pending_syncs.items()):
+        if not pending.done():
+            continue
+        del _pending_syncs[uuid]
+        report_desynced(uuid, apply_outputs(pending))
+        applied = True
+
+    if applied:
+        force_ui_redraw()
+    if not _pending_syncs:
+        return None
+    return PENDING_SYNC_INTERVAL
+
 
+def report_desynced(uuid: str, desynced_objs):
     if desynced_objs:
         for output_obj, _ in desynced_objs:
             output_obj.squishy_volumes.uuid = "broken"
@@ -91,7 +185,7 @@ is now incompatible or gone.)
 
             raise RuntimeError(message)
 
-        with_popup(uuid=sim_props.uuid, f=raise_)
+        with_popup(uuid=uuid, f=raise_)
 
 
 def frame_change_handler(scene):
@@ -111,6 +205,17 @@ def check_interface_locked(scene):
 
 
 def register_handler():
+    if start_render_preload not in bpy.app.handlers.render_init:
+        bpy.app.handlers.render_init.append(start_render_preload)  # ty:ignore[invalid-argument-type]
+    for handlers in (
+        bpy.app.handlers.render_complete,
+        bpy.app.handlers.render_cancel,
+    ):
+        if stop_render_preload not in handlers:
+            handlers.append(stop_render_preload)  # ty:ignore[invalid-argument-type]
+    if get_print_debug_info():
+        print("Squishy Volumes render preload registered.")
+
     if check_interface_locked not in bpy.app.handlers.render_pre:
         bpy.app.handlers.render_pre.append(check_interface_locked)  # ty:ignore[invalid-argument-type]
         if get_print_debug_info():
@@ -123,6 +228,23 @@ def register_handler():
 
 
 def unregister_handler():
+    stop_render_preload()
+    if start_render_preload in bpy.app.handlers.render_init:
+        bpy.app.handlers.render_init.remove(start_render_preload)
+    for handlers in (
+        bpy.app.handlers.render_complete,
+        bpy.app.handlers.render_cancel,
+    ):
+        if stop_render_preload in handlers:
+            handlers.remove(stop_render_preload)
+
+    if bpy.app.timers.is_registered(apply_pending_syncs):
+        bpy.app.timers.unregister(apply_pending_syncs)
+    for pending in _pending_syncs.values():
+        pending.cancel()
+    _pending_syncs.clear()
+    shutdown_fetch_pool()
+
     if frame_change_handler in bpy.app.handlers.frame_change_pre:
         bpy.app.handlers.frame_change_pre.remove(frame_change_handler)
         if get_print_debug_info():
@@ -48,3 +48,7 @@ def get_domain_max() -> mathutils.Vector:
 
 def get_print_debug_info() -> bool:
     return bpy.context.preferences.addons.get(__package__).preferences.print_debug_info
+
+
+def get_async_sync() -> bool:
+    return bpy.context.preferences.addons.get(__package__).preferences.async_sync
@@ -27,6 +27,7 @@ OUTPUT_TYPES = [
 
 
 # synchronisable attributes
+SQUISHY_VOLUMES_ATTRIBUTE_PREFIX = "squishy_volumes_"
 SQUISHY_VOLUMES_INSTANCE_COLOR = "squishy_volumes_instance_color"
 SQUISHY_VOLUMES_ELASTIC_ENERGY = "squishy_volumes_elastic_energy"
 SQUISHY_VOLUMES_SIZE = "squishy_volumes_size"
@@ -21,8 +21,11 @@ import bpy
 import json
 import mathutils
 import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, NamedTuple
 
 from .magic_consts import (
+    SQUISHY_VOLUMES_ATTRIBUTE_PREFIX,
     SQUISHY_VOLUMES_DISTANCE,
     SQUISHY_VOLUMES_ELASTIC_ENERGY,
     SQUISHY_VOLUMES_INITIAL_POSITION,
@@ -90,125 +93,240 @@ def add_attribute(mesh, array, attribute_name, attribute_type, domain="POINT"):
         attribute.data.foreach_set("value", array)
 
 
-def sync_output(sim_handle: SimulationHandle, output_obj: bpy.types.Object, frame: int):
+def fetch_region_to_unit_cube(output_obj: bpy.types.Object):
+    region_obj = output_obj.squishy_volumes.fetch_region  # ty:ignore[unresolved-attribute]
+    if region_obj is None:
+        return None
+
+    if region_obj.type == "CAMERA":
+        render = bpy.context.scene.render
+        to_unit_cube = (
+            region_obj.calc_matrix_camera(
+                bpy.context.evaluated_depsgraph_get(),
+                x=render.resolution_x,
+                y=render.resolution_y,
+                scale_x=render.pixel_aspect_x,
+                scale_y=render.pixel_aspect_y,
+            )
+            @ region_obj.matrix_world.inverted_safe()
+        )
+    else:
+        to_unit_cube = (
+            mathutils.Matrix.Scale(1 / region_obj.empty_display_size, 4)
+            @ region_obj.matrix_world.inverted_safe()
+        )
+
+    # the positions are in the local space of the output object
+    to_unit_cube = to_unit_cube @ output_obj.matrix_world
+    return {"to_unit_cube": [list(row) for row in to_unit_cube]}
+
+
+# One array of an output object, the positions of the vertices if there's no attribute name.
+class PlannedFetch(NamedTuple):
+    attribute: dict[str, Any]
+    is_int: bool
+    attribute_name: str | None
+    attribute_type: str | None
+
+
+def plan_output(output_obj: bpy.types.Object) -> list[PlannedFetch]:
     output_props: Squishy_Volumes_Properties_Output = output_obj.squishy_volumes  # ty:ignore[unresolved-attribute]
+    plan = []
 
     if output_props.output_type == GRID:
-        ffa_f32 = lambda attribute: sim_handle.fetch_flat_attribute_f32(
-            frame=frame,
-            attribute={"Grid": attribute},
-        )
-        ffa_i32 = lambda attribute: sim_handle.fetch_flat_attribute_i32(
-            frame=frame,
-            attribute={"Grid": attribute},
+        wrap = lambda attribute: {"Grid": attribute}  # pylint: disable=unnecessary-lambda-assignment
+
+    if output_props.output_type == PARTICLES:
+        region = fetch_region_to_unit_cube(output_obj)
+
+        def wrap(attribute):
+            object_attribute = {
+                "name": output_props.input_name,
+                "attribute": attribute,
+            }
+            if region is not None:
+                object_attribute["region"] = region
+            return {"Object": object_attribute}
+
+    def f32(attribute, attribute_name=None, attribute_type=None):
+        plan.append(
+            PlannedFetch(wrap(attribute), False, attribute_name, attribute_type)
         )
 
-        fill_mesh_with_positions(output_obj.data, ffa_f32("Positions"))
-        if output_props.grid_collider_bits:
-            add_attribute(
-                output_obj.data,
-                ffa_i32("ColliderBits"),
-                SQUISHY_VOLUMES_COLLIDER_BITS,
-                "INT",
-            )
+    def i32(attribute, attribute_name, attribute_type):
+        plan.append(PlannedFetch(wrap(attribute), True, attribute_name, attribute_type))
 
+    if output_props.output_type == GRID:
+        f32("Positions")
+        if output_props.grid_collider_bits:
+            i32("ColliderBits", SQUISHY_VOLUMES_COLLIDER_BITS, "INT")
         if output_props.grid_masses:
-            add_attribute(
-                output_obj.data,
-                ffa_f32("Masses"),
-                SQUISHY_VOLUMES_MASS,
-                "FLOAT",
-            )
+            f32("Masses", SQUISHY_VOLUMES_MASS, "FLOAT")
         if output_props.grid_velocities:
-            add_attribute(
-                output_obj.data,
-                ffa_f32("Velocities"),
-                SQUISHY_VOLUMES_VELOCITY,
-                "FLOAT_VECTOR",
-            )
+            f32("Velocities", SQUISHY_VOLUMES_VELOCITY, "FLOAT_VECTOR")
 
     if output_props.output_type == PARTICLES:
-        # pylint: disable=unnecessary-lambda-assignment
-        ffa_f32 = lambda attribute: sim_handle.fetch_flat_attribute_f32(
-            frame=frame,
-            attribute={
-                "Object": {
-                    "name": output_props.input_name,
-                    "attribute": attribute,
-                }
-            },
-        )
-        ffa_i32 = lambda attribute: sim_handle.fetch_flat_attribute_i32(
-            frame=frame,
-            attribute={
-                "Object": {
-                    "name": output_props.input_name,
-                    "attribute": attribute,
-                }
-            },
-        )
-
-        fill_mesh_with_positions(output_obj.data, ffa_f32("Positions"))
+        f32("Positions")
         if output_props.particle_flags:
-            add_attribute(
-                output_obj.data,
-                ffa_i32("Flags"),
-                SQUISHY_VOLUMES_FLAGS,
-                "INT",
-            )
+            i32("Flags", SQUISHY_VOLUMES_FLAGS, "INT")
         if output_props.particle_masses:
-            add_attribute(
-                output_obj.data,
-                ffa_f32("Masses"),
-                SQUISHY_VOLUMES_MASS,
-                "FLOAT",
-            )
+            f32("Masses", SQUISHY_VOLUMES_MASS, "FLOAT")
         if output_props.particle_initial_volumes:
-            add_attribute(
-                output_obj.data,
-                ffa_f32("InitialVolumes"),
-                SQUISHY_VOLUMES_ELASTIC_ENERGY,
-                "FLOAT",
-            )
+            f32("InitialVolumes", SQUISHY_VOLUMES_ELASTIC_ENERGY, "FLOAT")
         if output_props.particle_initial_positions:
-            add_attribute(
-                output_obj.data,
-                ffa_f32("InitialPositions"),
+            f32(
+                "InitialPositions",
                 SQUISHY_VOLUMES_INITIAL_POSITION,
                 "FLOAT_VECTOR",
             )
         if output_props.particle_velocities:
-            add_attribute(
-                output_obj.data,
-                ffa_f32("Velocities"),
-                SQUISHY_VOLUMES_VELOCITY,
-                "FLOAT_VECTOR",
-            )
+            f32("Velocities", SQUISHY_VOLUMES_VELOCITY, "FLOAT_VECTOR")
         if output_props.particle_sizes:
-            add_attribute(
-                output_obj.data,
-                ffa_f32("Sizes"),
-                SQUISHY_VOLUMES_SIZE,
-                "FLOAT",
-            )
+            f32("Sizes", SQUISHY_VOLUMES_SIZE, "FLOAT")
         if output_props.particle_transformations:
-            add_attribute(
-                output_obj.data,
-                ffa_f32("Transformations"),
-                SQUISHY_VOLUMES_TRANSFORM,
-                "FLOAT4X4",
-            )
+            f32("Transformations", SQUISHY_VOLUMES_TRANSFORM, "FLOAT4X4")
         if output_props.particle_energies:
-            add_attribute(
-                output_obj.data,
-                ffa_f32("ElasticEnergies"),
-                SQUISHY_VOLUMES_ELASTIC_ENERGY,
-                "FLOAT",
-            )
+            f32("ElasticEnergies", SQUISHY_VOLUMES_ELASTIC_ENERGY, "FLOAT")
         if output_props.particle_collider_bits:
-            add_attribute(
-                output_obj.data,
-                ffa_i32("ColliderBits"),
-                SQUISHY_VOLUMES_COLLIDER_BITS,
-                "INT",
-            )
+            i32("ColliderBits", SQUISHY_VOLUMES_COLLIDER_BITS, "INT")
+
+    return plan
+
+
+# doesn't touch bpy, so it can run off the main thread
+def fetch_planned(sim_handle: SimulationHandle, frame: int, planned: PlannedFetch):
+    if planned.is_int:
+        return sim_handle.fetch_flat_attribute_i32(
+            frame=frame, attribute=planned.attribute
+        )
+    return sim_handle.fetch_flat_attribute_f32(frame=frame, attribute=planned.attribute)
+
+
+def apply_output(output_obj: bpy.types.Object, plan: list[PlannedFetch], arrays):
+    if not plan:
+        return
+
+    mesh = output_obj.data
+    for planned, array in zip(plan, arrays):
+        if planned.attribute_name is None:
+            fill_mesh_with_positions(mesh, array)
+        else:
+            add_attribute(mesh, array, planned.attribute_name, planned.attribute_type)
+
+    # a reused mesh still has the attributes that aren't synced anymore
+    synced_attributes = {planned.attribute_name for planned in plan}
+    stale_attributes = [
+        attribute.name
+        for attribute in mesh.attributes
+        if attribute.name.startswith(SQUISHY_VOLUMES_ATTRIBUTE_PREFIX)
+        and attribute.name not in synced_attributes
+    ]
+    for name in stale_attributes:
+        mesh.attributes.remove(mesh.attributes[name])
+
+
+def sync_output(sim_handle: SimulationHandle, output_obj: bpy.types.Object, frame: int):
+    plan = plan_output(output_obj)
+    apply_output(
+        output_obj,
+        plan,
+        [fetch_planned(sim_handle, frame, planned) for planned in plan],
+    )
+    sim_handle.loaded_frame = frame
+
+
+_fetch_pool = None
+
+
+def shutdown_fetch_pool():
+    global _fetch_pool
+    if _fetch_pool is not None:
+        _fetch_pool.shutdown()
+        _fetch_pool = None
+
+
+class PendingOutputs(NamedTuple):
+    sim_handle: SimulationHandle
+    frame: int
+    fetches: list[tuple[bpy.types.Object, list[PlannedFetch], list[Future]]]
+
+    def done(self) -> bool:
+        return all(array.done() for _, _, arrays in self.fetches for array in arrays)
+
+    def cancel(self):
+        for _, _, arrays in self.fetches:
+            for array in arrays:
+                array.cancel()
+
+
+def request_outputs(
+    sim_handle: SimulationHandle,
+    output_objs: list[bpy.types.Object],
+    frame: int,
+    preloaded: PendingOutputs | None = None,
+) -> PendingOutputs:
+    """Starts fetching the arrays of all outputs, they are written by apply_outputs.
+
+    Fetching releases the GIL and the loaded frame is shared between fetches,
+    so the arrays are fetched concurrently while the main thread continues.
+    Fetches of `preloaded` are reused where the plan is still the same."""
+    global _fetch_pool
+    if _fetch_pool is None:
+        _fetch_pool = ThreadPoolExecutor(thread_name_prefix="squishy_volumes_fetch")
+
+    reusable = {}
+    if preloaded is not None and preloaded.frame == frame:
+        reusable = {
+            output_obj.name: (plan, arrays)
+            for output_obj, plan, arrays in preloaded.fetches
+        }
+
+    fetches = []
+    for output_obj in output_objs:
+        plan = plan_output(output_obj)
+        preloaded_plan, arrays = reusable.pop(output_obj.name, (None, None))
+        if preloaded_plan != plan:
+            # e.g. a fetch region that moved since
+            if arrays is not None:
+                for array in arrays:
+                    array.cancel()
+            arrays = [
+                _fetch_pool.submit(fetch_planned, sim_handle, frame, planned)
+                for planned in plan
+            ]
+        fetches.append((output_obj, plan, arrays))
+
+    for _, arrays in reusable.values():
+        for array in arrays:
+            array.cancel()
+    return PendingOutputs(sim_handle, frame, fetches)
+
+
+def apply_outputs(
+    pending: PendingOutputs,
+) -> list[tuple[bpy.types.Object, RuntimeError]]:
+    """Writes the arrays as they arrive, returns the objects that failed."""
+    failed = []
+    for output_obj, plan, arrays in pending.fetches:
+        try:
+            apply_output(output_obj, plan, [array.result() for array in arrays])
+        except RuntimeError as e:
+            failed.append((output_obj, e))
+        except ReferenceError:
+            # removed while fetching
+            continue
+    # not when fetching, that might be a preload of the next frame
+    pending.sim_handle.loaded_frame = pending.frame
+    return failed
+
+
+def sync_outputs(
+    sim_handle: SimulationHandle,
+    output_objs: list[bpy.types.Object],
+    frame: int,
+    preloaded: PendingOutputs | None = None,
+) -> list[tuple[bpy.types.Object, RuntimeError]]:
+    """Like sync_output for many objects, returns the ones that failed.
+
+    The main thread writes the finished arrays while the rest are fetched."""
+    return apply_outputs(request_outputs(sim_handle, output_objs, frame, preloaded))
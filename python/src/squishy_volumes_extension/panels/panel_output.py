@@ -445,6 +445,12 @@ class SCENE_PT_Squishy_Volumes_Output(bpy.types.Panel):
                 icon="REMOVE",
             ).name = remove_obj.name
 
+        if (
+            remove_obj is not None
+            and remove_obj.squishy_volumes.output_type == PARTICLES  # ty:ignore[unresolved-attribute]
+        ):
+            self.layout.prop(remove_obj.squishy_volumes, "fetch_region")  # ty:ignore[unresolved-attribute]
+
 
 classes = [
     Squishy_Volumes_New_Output_Object,
@@ -28,7 +28,7 @@ import uuid
 from pathlib import Path
 
 
-from ..bridge import SimulationHandle, build_info
+from ..bridge import SimulationHandle, bake_queue, build_info, move_in_bake_queue
 from ..frame_change import sync_simulation
 from ..popup import popup
 from ..progress_update import cleanup_markers
@@ -128,6 +128,42 @@ It just creates the Blender object to track the simulation."""
         return {"FINISHED"}
 
 
+def clone_simulation_objects(context, source_uuid: str):
+    sim_obj = get_simulation_object_with_uuid(source_uuid)
+
+    new_uuid = str(uuid.uuid4())
+    bpy.ops.scene.squishy_volumes_add_simulation(  # ty:ignore[unresolved-attribute]
+        "INVOKE_DEFAULT", uuid=new_uuid, name=sim_obj.name
+    )
+    new_sim_obj = get_simulation_object_with_uuid(new_uuid)
+
+    copy_simple_property_group(
+        sim_obj.squishy_volumes,  # ty: ignore[unresolved-attribute]
+        new_sim_obj.squishy_volumes,  # ty: ignore[unresolved-attribute]
+        ["uuid"],
+    )
+
+    input_mapping = {}
+    for input_obj in get_input_objects_with_uuid(source_uuid):
+        new_input_obj = input_obj.copy()
+        new_input_obj.squishy_volumes.uuid = new_uuid  # ty: ignore[unresolved-attribute]
+        context.collection.objects.link(new_input_obj)
+        new_input_obj.select_set(True)
+        input_mapping[input_obj.name] = new_input_obj.name
+
+    for output_obj in get_output_objects_with_uuid(source_uuid):
+        new_output_obj = output_obj.copy()
+        assert output_obj.data is not None
+        new_output_obj.data = output_obj.data.copy()
+        new_output_obj.squishy_volumes.uuid = new_uuid  # ty: ignore[unresolved-attribute]
+        context.collection.objects.link(new_output_obj)
+        new_output_obj.squishy_volumes.input_name = input_mapping[  # ty: ignore[unresolved-attribute]
+            new_output_obj.squishy_volumes.input_name  # ty: ignore[unresolved-attribute]
+        ]
+
+    return new_sim_obj
+
+
 class SCENE_OT_Squishy_Volumes_Clone_Simulation(bpy.types.Operator):
     bl_idname = "scene.squishy_volumes_clone_simulation"
     bl_label = "Clone"
@@ -138,40 +174,53 @@ class SCENE_OT_Squishy_Volumes_Clone_Simulation(bpy.types.Operator):
 
     def execute(self, context):
         sim_obj = get_simulation_object_with_uuid(self.uuid)
+        clone_simulation_objects(context, self.uuid)
+        self.report({"INFO"}, f"Cloned {sim_obj.name}.")
+        return {"FINISHED"}
 
-        new_uuid = str(uuid.uuid4())
-        bpy.ops.scene.squishy_volumes_add_simulation(  # ty:ignore[unresolved-attribute]
-            "INVOKE_DEFAULT", uuid=new_uuid, name=sim_obj.name
-        )
-        new_sim_obj = get_simulation_object_with_uuid(new_uuid)
 
-        copy_simple_property_group(
-            sim_obj.squishy_volumes,  # ty: ignore[unresolved-attribute]
-            new_sim_obj.squishy_volumes,  # ty: ignore[unresolved-attribute]
-            ["uuid"],
-        )
+class SCENE_OT_Squishy_Volumes_Fork_Simulation(bpy.types.Operator):
+    bl_idname = "scene.squishy_volumes_fork_simulation"
+    bl_label = "Fork"
+    bl_description = """Clone this Simulation and keep its input and its first frames.
 
-        input_mapping = {}
-        for input_obj in get_input_objects_with_uuid(self.uuid):
-            new_input_obj = input_obj.copy()
-            new_input_obj.squishy_volumes.uuid = new_uuid  # ty: ignore[unresolved-attribute]
-            context.collection.objects.link(new_input_obj)
-            new_input_obj.select_set(True)
-            input_mapping[input_obj.name] = new_input_obj.name
-
-        for output_obj in get_output_objects_with_uuid(self.uuid):
-            new_output_obj = output_obj.copy()
-            assert output_obj.data is not None
-            new_output_obj.data = output_obj.data.copy()
-            new_output_obj.squishy_volumes.uuid = new_uuid  # ty: ignore[unresolved-attribute]
-            context.collection.objects.link(new_output_obj)
-            new_output_obj.squishy_volumes.input_name = input_mapping[  # ty: ignore[unresolved-attribute]
-                new_output_obj.squishy_volumes.input_name  # ty: ignore[unresolved-attribute]
-            ]
+The cache files are shared, so nothing needs to be captured again
+and baking the clone continues from the chosen frame."""
+    bl_options = {"REGISTER", "UNDO"}
 
-        self.report({"INFO"}, f"Cloned {sim_obj.name}.")
+    uuid: bpy.props.StringProperty()  # type: ignore
+    frame: bpy.props.IntProperty(
+        name="Frames to Keep",
+        description="Baking the fork continues from here.",
+        min=0,
+    )  # type: ignore
+
+    def execute(self, context):
+        sim_obj = get_simulation_object_with_uuid(self.uuid)
+        sim_handle = SimulationHandle.get(uuid=self.uuid)
+        if sim_handle is None:
+            self.report({"ERROR"}, f"{sim_obj.name} is not loaded.")
+            return {"CANCELLED"}
+
+        new_sim_obj = clone_simulation_objects(context, self.uuid)
+        new_sim_props = new_sim_obj.squishy_volumes  # ty: ignore[unresolved-attribute]
+
+        new_sim_handle = sim_handle.fork(
+            uuid=new_sim_props.uuid,
+            directory=new_sim_props.directory,
+            frame=min(self.frame, sim_handle.available_frames()),
+        )
+        sync_simulation(new_sim_props, new_sim_handle, context.scene.frame_current)
+
+        self.report({"INFO"}, f"Forked {sim_obj.name}.")
         return {"FINISHED"}
 
+    def invoke(self, context, event):
+        sim_handle = SimulationHandle.get(uuid=self.uuid)
+        if sim_handle is not None:
+            self.frame = sim_handle.available_frames()
+        return context.window_manager.invoke_props_dialog(self)
+
 
 class SCENE_OT_Squishy_Volumes_Reload(bpy.types.Operator):
     bl_idname = "scene.squishy_volumes_reload"
@@ -303,6 +352,58 @@ class SCENE_OT_Squishy_Volumes_Show_Message(bpy.types.Operator):
         return {"FINISHED"}
 
 
+class SCENE_OT_Squishy_Volumes_Move_In_Bake_Queue(bpy.types.Operator):
+    bl_idname = "scene.squishy_volumes_move_in_bake_queue"
+    bl_label = "Move in Queue"
+    bl_description = "Let this bake start earlier or later."
+    bl_options = {"REGISTER"}
+
+    uuid: bpy.props.StringProperty()  # type: ignore
+    offset: bpy.props.IntProperty()  # type: ignore
+
+    def execute(self, context):
+        move_in_bake_queue(uuid=self.uuid, offset=self.offset)
+        force_ui_redraw()
+        return {"FINISHED"}
+
+
+def draw_bake_queue(layout: bpy.types.UILayout, context):
+    scene_props = context.scene.squishy_volumes
+    layout.label(text="Bake Queue")
+    box = layout.box()
+    row = box.row()
+    row.prop(scene_props, "bake_queue_order", text="")
+    row.prop(scene_props, "bake_queue_max_concurrent")
+
+    names = {
+        sim_obj.squishy_volumes.uuid: sim_obj.name  # ty:ignore[unresolved-attribute]
+        for sim_obj in get_simulation_objects()
+    }
+    position = 0
+    for entry in bake_queue():
+        row = box.row()
+        name = names.get(entry["uuid"], entry["uuid"])
+        if entry["running"]:
+            row.label(text=f"{name}: Running", icon="PLAY")
+            continue
+        position += 1
+        row.label(text=f"{name}: Queued #{position}", icon="SORTTIME")
+        up = row.operator(
+            SCENE_OT_Squishy_Volumes_Move_In_Bake_Queue.bl_idname,
+            text="",
+            icon="TRIA_UP",
+        )
+        up.uuid = entry["uuid"]
+        up.offset = -1
+        down = row.operator(
+            SCENE_OT_Squishy_Volumes_Move_In_Bake_Queue.bl_idname,
+            text="",
+            icon="TRIA_DOWN",
+        )
+        down.uuid = entry["uuid"]
+        down.offset = 1
+
+
 class SCENE_PT_Squishy_Volumes_Overview(bpy.types.Panel):
     bl_label = f"Overview  -  v{build_info()['wrapper']['crate_info']['version']}"
     bl_space_type = "VIEW_3D"
@@ -358,7 +459,10 @@ class SCENE_PT_Squishy_Volumes_Overview(bpy.types.Panel):
                 progress_text = f"{sim_obj.name}: "
                 factor = 0.0
                 if sim_handle is not None:
-                    if sim_handle.progress is not None and sim_handle.progress:
+                    bake_state = sim_handle.bake_state
+                    if bake_state is not None and bake_state["state"] == "Queued":
+                        progress_text += f"Queued #{bake_state['position'] + 1}"
+                    elif sim_handle.progress is not None and sim_handle.progress:
                         progress = sim_handle.progress[0]
                         progress_text += progress["label"]
                         completed_steps = progress["completed_steps"]
@@ -411,6 +515,11 @@ class SCENE_PT_Squishy_Volumes_Overview(bpy.types.Panel):
                     SCENE_OT_Squishy_Volumes_Clone_Simulation.bl_idname,
                     icon="DUPLICATE",
                 ).uuid = sim_props.uuid
+                if sim_handle is not None:
+                    row.operator(
+                        SCENE_OT_Squishy_Volumes_Fork_Simulation.bl_idname,
+                        icon="OUTLINER_DATA_GP_LAYER",
+                    ).uuid = sim_props.uuid
                 row.operator(
                     SCENE_OT_Squishy_Volumes_Remove_Simulation.bl_idname,
                     icon="TRASH",
@@ -418,7 +527,7 @@ class SCENE_PT_Squishy_Volumes_Overview(bpy.types.Panel):
 
                 if sim_handle is None:
                     continue
-                stats = sim_handle.stats()
+                stats = sim_handle.cached_stats()
                 state = stats["state"]
                 compute = stats["compute"]
                 bytes_on_disk = stats["bytes_on_disk"]
@@ -459,6 +568,31 @@ class SCENE_PT_Squishy_Volumes_Overview(bpy.types.Panel):
                     grid.label(text="Last frame substeps")
                     grid.label(text=f"{last_frame_substeps}")
 
+                    phase_times_sec = compute.get("last_frame_phase_times_sec", [])
+                    if phase_times_sec:
+                        total_sec = sum(sec for _, sec in phase_times_sec)
+                        body.label(text="Last Frame Phases")
+                        box = body.box()
+                        grid = box.grid_flow(
+                            row_major=True, columns=2, even_columns=False
+                        )
+                        for phase, sec in phase_times_sec:
+                            grid.label(text=phase)
+                            grid.label(
+                                text=f"{sec:0.2f} sec ({100 * sec / max(total_sec, 1e-9):0.0f}%)"
+                            )
+
+                    time_step_limits = compute.get("last_frame_time_step_limits", [])
+                    if time_step_limits:
+                        body.label(text="Last Frame Time Step Limits")
+                        box = body.box()
+                        grid = box.grid_flow(
+                            row_major=True, columns=2, even_columns=False
+                        )
+                        for limit, substeps in time_step_limits:
+                            grid.label(text=limit)
+                            grid.label(text=f"{substeps} substeps")
+
         layout.separator()
 
         if len(get_simulation_objects()) > 1:
@@ -467,17 +601,21 @@ class SCENE_PT_Squishy_Volumes_Overview(bpy.types.Panel):
                 "selected_simulation",
                 text="Select",
             )
+            layout.separator()
+            draw_bake_queue(layout, context)
 
 
 classes = [
     SCENE_OT_Squishy_Volumes_Add_Example_Simulation,
     SCENE_OT_Squishy_Volumes_Add_Simulation,
     SCENE_OT_Squishy_Volumes_Clone_Simulation,
+    SCENE_OT_Squishy_Volumes_Fork_Simulation,
     SCENE_OT_Squishy_Volumes_Reload,
     SCENE_OT_Squishy_Volumes_Reload_All,
     SCENE_OT_Squishy_Volumes_Remove_Simulation,
     SCENE_OT_Squishy_Volumes_Remove_Lock_File,
     SCENE_OT_Squishy_Volumes_Show_Message,
+    SCENE_OT_Squishy_Volumes_Move_In_Bake_Queue,
     SCENE_PT_Squishy_Volumes_Overview,
 ]
 
@@ -28,7 +28,12 @@ from ..squishy_volumes_properties import (
     Squishy_Volumes_Properties_Simulation,
 )
 from ..bridge import SimulationHandle, SimulationInputHandle
-from ..util import giga_f32_to_u64, simulation_input_exists, u64_to_giga_f32
+from ..util import (
+    giga_f32_to_u64,
+    parse_core_set,
+    simulation_input_exists,
+    u64_to_giga_f32,
+)
 from ..input_capture import create_input_header, capture_input_frame
 from ..get_preferences import (
     get_confirm_bake_overwrite,
@@ -59,9 +64,14 @@ This check can be disabled in the add-on peferences."""
         "time_step": sim_props.time_step,
         "gpu": None if sim_props.compute_device == "CPU" else sim_props.compute_device,
         "adaptive_time_steps": sim_props.adaptive_time_steps,
+        "multi_rate": sim_props.multi_rate,
+        "trace": sim_props.record_trace,
         "next_frame": next_frame,
         "number_of_frames": number_of_frames,
         "max_bytes_on_disk": giga_f32_to_u64(sim_props.max_giga_bytes_on_disk),
+        "threads": sim_props.compute_threads or None,
+        "cores": parse_core_set(sim_props.compute_cores),
+        "priority": sim_props.compute_priority,
     }
     sim_handle.start_compute(compute_settings=compute_settings)
 
@@ -139,7 +149,12 @@ Note that this also discards all computed frames in the cache."""
 
         sim_handle = SimulationHandle.new()
         if self.start_baking:
-            start_compute(sim_handle, sim_props, 0, sim_props.bake_frames)
+            try:
+                start_compute(sim_handle, sim_props, 0, sim_props.bake_frames)
+            except ValueError as e:
+                # the input is recorded anyway, baking can start once it's fixed
+                self.report({"ERROR"}, str(e))
+                return {"FINISHED"}
             self.report({"INFO"}, f"Commence baking of {sim_obj.name}.")
 
         return {"FINISHED"}
@@ -251,7 +266,12 @@ class SCENE_OT_Squishy_Volumes_Record_Input_To_Cache_Modal(bpy.types.Operator):
         sim_handle = SimulationHandle.new()
 
         if self.start_baking:
-            start_compute(sim_handle, sim_props, 0, sim_props.bake_frames)
+            try:
+                start_compute(sim_handle, sim_props, 0, sim_props.bake_frames)
+            except ValueError as e:
+                # the input is recorded anyway, baking can start once it's fixed
+                self.report({"ERROR"}, str(e))
+                return {"FINISHED"}
             self.report({"INFO"}, f"Commence baking of {sim_obj.name}.")
 
         return {"FINISHED"}
@@ -288,12 +308,16 @@ or cancellation occurs due to user input or error."""
         sim_props = sim_obj.squishy_volumes  # ty:ignore[unresolved-attribute]
         sim_handle = SimulationHandle.get(uuid=self.uuid)
         assert sim_handle is not None
-        start_compute(
-            sim_handle=sim_handle,
-            sim_props=sim_props,
-            next_frame=sim_handle.available_frames(),
-            number_of_frames=sim_props.bake_frames,
-        )
+        try:
+            start_compute(
+                sim_handle=sim_handle,
+                sim_props=sim_props,
+                next_frame=sim_handle.available_frames(),
+                number_of_frames=sim_props.bake_frames,
+            )
+        except ValueError as e:
+            self.report({"ERROR"}, str(e))
+            return {"CANCELLED"}
 
         self.report({"INFO"}, f"Commence baking of {sim_obj.name}.")
         return {"FINISHED"}
@@ -336,12 +360,16 @@ come after the displayed one."""
         sim_handle = SimulationHandle.get(uuid=self.uuid)
         assert sim_handle is not None
         assert sim_handle.loaded_frame is not None
-        start_compute(
-            sim_handle=sim_handle,
-            sim_props=sim_props,
-            next_frame=sim_handle.loaded_frame + 1,
-            number_of_frames=sim_props.bake_frames,
-        )
+        try:
+            start_compute(
+                sim_handle=sim_handle,
+                sim_props=sim_props,
+                next_frame=sim_handle.loaded_frame + 1,
+                number_of_frames=sim_props.bake_frames,
+            )
+        except ValueError as e:
+            self.report({"ERROR"}, str(e))
+            return {"CANCELLED"}
         self.report({"INFO"}, f"Commence baking of {sim_obj.name}.")
         return {"FINISHED"}
 
@@ -435,6 +463,22 @@ class SCENE_PT_Squishy_Volumes_Simulate(bpy.types.Panel):
         adaptive_col = bake_box.column()
         adaptive_col.enabled = sim_props.compute_device == "CPU"
         adaptive_col.prop(sim_props, "adaptive_time_steps")
+        multi_rate_row = adaptive_col.row()
+        multi_rate_row.enabled = sim_props.adaptive_time_steps
+        multi_rate_row.prop(sim_props, "multi_rate")
+
+        cpu_col = bake_box.column()
+        cpu_col.enabled = sim_props.compute_device == "CPU"
+        cpu_row = cpu_col.row()
+        cpu_row.prop(sim_props, "compute_threads")
+        cpu_row.prop(sim_props, "compute_priority")
+        cpu_col.prop(sim_props, "compute_cores")
+        try:
+            parse_core_set(sim_props.compute_cores)
+        except ValueError as e:
+            cpu_col.label(text=str(e), icon="ERROR")
+
+        bake_box.prop(sim_props, "record_trace")
 
         bake_box.prop(sim_props, "bake_frames")
 
@@ -458,6 +502,13 @@ class SCENE_PT_Squishy_Volumes_Simulate(bpy.types.Panel):
             icon="CANCEL",
         ).uuid = sim_props.uuid
 
+        bake_state = sim_handle.bake_state
+        if bake_state is not None and bake_state["state"] == "Queued":
+            bake_box.label(
+                text=f"Waiting in bake queue at #{bake_state['position'] + 1}",
+                icon="SORTTIME",
+            )
+
         if sim_handle.progress is not None:
             for info in sim_handle.progress:
                 name = info["label"]
@@ -69,6 +69,17 @@ Particles that rise above this are deactivated.""",
         options=set(),  # can't be animated
     )  # type: ignore
 
+    async_sync: bpy.props.BoolProperty(
+        name="Sync In Background",
+        description="""Load frames in the background while scrubbing the timeline.
+
+The outputs keep showing the previous frame until the new one is loaded,
+frames that were skipped over are never written into Blender.
+Rendering always waits for the frame.""",
+        default=False,
+        options=set(),  # can't be animated
+    )  # type: ignore
+
     print_debug_info: bpy.props.BoolProperty(
         name="Print Debug Info",
         description="""Can be used to disable certain debug printouts.
@@ -83,6 +94,7 @@ This is most likely only relevant to developers of other extensions.""",
         self.layout.prop(self, "confirm_bake_overwrite")
         self.layout.prop(self, "domain_min")
         self.layout.prop(self, "domain_max")
+        self.layout.prop(self, "async_sync")
         self.layout.prop(self, "print_debug_info")
 
 
@@ -16,78 +16,88 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import time
 import bpy
 
-from .get_preferences import get_print_debug_info
+from .get_preferences import get_async_sync, get_print_debug_info
 from .popup import with_popup
 from .frame_change import sync_simulation
-from .bridge import SimulationHandle
+from .bridge import SimulationHandle, bake_queue, update_bake_queue
 from .util import add_or_update_marker, force_ui_redraw, remove_marker
 from .squishy_volumes_properties import frame_to_load, get_simulation_objects
 
 
 PROGRESS_INTERVAL = 0.25
+# polling also checks the cache directory, which can be changed from outside
+FULL_POLL_INTERVAL = 2.0
+
+MARKER_SUFFIXES = [
+    "Capture Start",
+    "Capture End",
+    "Bake Start",
+    "Bake Latest",
+    "Bake End",
+    "Bake Latest & End",
+]
 
 
 def update_progress():
     should_redraw = False
-    for sim_obj in get_simulation_objects():
-        cleanup_markers(sim_obj)
-
-        sim_props = sim_obj.squishy_volumes  # ty:ignore[unresolved-attribute]
-        add_or_update_marker(
-            f"{sim_obj.name} Capture Start",
-            sim_props.capture_start_frame,
-        )
-        add_or_update_marker(
-            f"{sim_obj.name} Capture End",
-            sim_props.capture_start_frame + sim_props.capture_frames - 1,
-        )
-
-        if not sim_props.sync:
-            continue
-
-        sim_handle = SimulationHandle.get(uuid=sim_props.uuid)
-        if sim_handle is None:
-            continue
-
-        if sim_handle.last_error is not None:
-            continue
 
-        progess = sim_handle.progress
-
-        def poll_and_true():
-            sim_handle.poll()
-            return True
-
-        if not with_popup(uuid=sim_props.uuid, f=poll_and_true):
-            continue
-
-        if progess != sim_handle.progress:
-            should_redraw = True
-
-        add_or_update_marker(
-            f"{sim_obj.name} Bake Start",
-            sim_props.display_start_frame,
+    scene_props = bpy.context.scene.squishy_volumes  # ty:ignore[possibly-missing-attribute]
+    queue = bake_queue()
+    try:
+        update_bake_queue(
+            order=scene_props.bake_queue_order,
+            max_concurrent=scene_props.bake_queue_max_concurrent,
         )
+    except RuntimeError as e:
+        # a failing start is reported by that simulation's poll
+        print(f"Squishy Volumes bake queue: {e}")
+    if queue != bake_queue():
+        should_redraw = True
 
-        computed_frames = sim_handle.available_frames()
-        if computed_frames == 0:
-            continue
-
-        latest_frame = sim_props.display_start_frame + computed_frames - 1
-        end_frame = sim_props.display_start_frame + sim_props.bake_frames - 1
-        if latest_frame != end_frame:
-            add_or_update_marker(f"{sim_obj.name} Bake Latest", latest_frame)
-            add_or_update_marker(f"{sim_obj.name} Bake End", end_frame)
-        else:
-            add_or_update_marker(f"{sim_obj.name} Bake Latest & End", end_frame)
-
-        if sim_handle.loaded_frame != frame_to_load(
-            sim_props,
-            bpy.context.scene.frame_current,  # ty:ignore[possibly-missing-attribute]
-        ):
-            sync_simulation(sim_props, sim_handle, bpy.context.scene.frame_current)  # ty:ignore[possibly-missing-attribute]
+    for sim_obj in get_simulation_objects():
+        sim_props = sim_obj.squishy_volumes  # ty:ignore[unresolved-attribute]
+        markers = {
+            "Capture Start": sim_props.capture_start_frame,
+            "Capture End": sim_props.capture_start_frame + sim_props.capture_frames - 1,
+        }
+
+        sim_handle = None
+        if sim_props.sync:
+            sim_handle = SimulationHandle.get(uuid=sim_props.uuid)
+        polled = None
+        if sim_handle is not None and sim_handle.last_error is None:
+            polled, changed = poll_if_changed(sim_props.uuid, sim_handle)
+            should_redraw |= changed
+
+        # a failed poll is reported by the popup
+        if sim_handle is not None and polled is not None:
+            markers["Bake Start"] = sim_props.display_start_frame
+            if sim_handle.computed_frames > 0:
+                latest_frame = (
+                    sim_props.display_start_frame + sim_handle.computed_frames - 1
+                )
+                end_frame = sim_props.display_start_frame + sim_props.bake_frames - 1
+                if latest_frame != end_frame:
+                    markers["Bake Latest"] = latest_frame
+                    markers["Bake End"] = end_frame
+                else:
+                    markers["Bake Latest & End"] = end_frame
+
+            if polled and sim_handle.loaded_frame != frame_to_load(
+                sim_props,
+                bpy.context.scene.frame_current,  # ty:ignore[possibly-missing-attribute]
+            ):
+                sync_simulation(
+                    sim_props,
+                    sim_handle,
+                    bpy.context.scene.frame_current,  # ty:ignore[possibly-missing-attribute]
+                    blocking=not get_async_sync(),
+                )
+
+        update_markers(sim_obj, markers)
 
     if should_redraw:
         force_ui_redraw()
@@ -95,13 +105,52 @@ def update_progress():
     return PROGRESS_INTERVAL
 
 
+def poll_if_changed(
+    uuid: str, sim_handle: SimulationHandle
+) -> tuple[bool | None, bool]:
+    """Whether it polled, None on failure, and whether the progress changed."""
+    changes = sim_handle.changes()
+    now = time.monotonic()
+    if (
+        changes == sim_handle.polled_changes
+        and now - sim_handle.polled_time < FULL_POLL_INTERVAL
+    ):
+        return False, False
+
+    progress = sim_handle.progress
+    bake_state = sim_handle.bake_state
+
+    def poll_and_true():
+        sim_handle.poll()
+        return True
+
+    if not with_popup(uuid=uuid, f=poll_and_true):
+        return None, False
+
+    sim_handle.computed_frames = sim_handle.available_frames()
+    sim_handle.polled_changes = changes
+    sim_handle.polled_time = now
+    return True, progress != sim_handle.progress or bake_state != sim_handle.bake_state
+
+
+def update_markers(sim_obj: bpy.types.Object, markers: dict[str, int]):
+    """Only touches the markers that changed, recreating them all is expensive."""
+    scene = bpy.context.scene
+    assert scene is not None
+    for suffix in MARKER_SUFFIXES:
+        name = f"{sim_obj.name} {suffix}"
+        frame = markers.get(suffix)
+        marker = scene.timeline_markers.get(name)
+        if frame is None:
+            if marker is not None:
+                scene.timeline_markers.remove(marker)
+        elif marker is None or marker.frame != frame:
+            add_or_update_marker(name, frame)
+
+
 def cleanup_markers(sim_obj: bpy.types.Object):
-    remove_marker(f"{sim_obj.name} Capture Start")
-    remove_marker(f"{sim_obj.name} Capture End")
-    remove_marker(f"{sim_obj.name} Bake Start")
-    remove_marker(f"{sim_obj.name} Bake Latest")
-    remove_marker(f"{sim_obj.name} Bake End")
-    remove_marker(f"{sim_obj.name} Bake Latest & End")
+    for suffix in MARKER_SUFFIXES:
+        remove_marker(f"{sim_obj.name} {suffix}")
 
 
 def is_updating():
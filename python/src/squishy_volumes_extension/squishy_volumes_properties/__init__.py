@@ -22,6 +22,11 @@ from ..bridge import SimulationHandle
 from ..get_preferences import get_print_debug_info, get_default_cache_location
 
 from .object import *
+from .object_index import (
+    invalidate_object_index,
+    register_object_index,
+    unregister_object_index,
+)
 from .scene import *
 
 
@@ -62,12 +67,21 @@ def register_properties():
         type=Squishy_Volumes_Properties_Scene
     )
     subscribe_to_selection()
+    register_object_index()
 
     if get_print_debug_info():
         print("Squishy Volumes properties registered.")
 
 
+def reset_properties():
+    # loading a file clears the message bus
+    unsubscribe_from_selection()
+    subscribe_to_selection()
+    invalidate_object_index()
+
+
 def unregister_properties():
+    unregister_object_index()
     unsubscribe_from_selection()
     del bpy.types.Scene.squishy_volumes  # ty:ignore[unresolved-attribute]
     del bpy.types.Object.squishy_volumes  # ty:ignore[unresolved-attribute]
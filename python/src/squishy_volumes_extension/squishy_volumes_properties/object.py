@@ -22,6 +22,11 @@ import bpy
 from ..bridge import SimulationHandle
 from ..util import simulation_locked, simulation_input_exists
 
+from .object_index import (
+    indexed_objects,
+    indexed_objects_with_uuid,
+    invalidate_object_index,
+)
 from .object_simulation import *
 from .object_input import *
 from .object_output import *
@@ -66,6 +71,7 @@ class Squishy_Volumes_Properties(bpy.types.PropertyGroup):
         description="Reference to the Simulation.",
         default="unassigned",
         options=set(),
+        update=invalidate_object_index,
     )  # type: ignore
 
     type: bpy.props.EnumProperty(
@@ -80,39 +86,24 @@ class Squishy_Volumes_Properties(bpy.types.PropertyGroup):
 It might be unreated, a simulation itself or in/output.""",
         default=TYPE_NONE,
         options=set(),
+        update=invalidate_object_index,
     )  # type: ignore
 
 
 def get_input_objects() -> list[bpy.types.Object]:
-    return [
-        obj
-        for obj in bpy.data.objects
-        if obj.squishy_volumes.type == TYPE_INPUT  # ty:ignore[unresolved-attribute]
-    ]
+    return indexed_objects(TYPE_INPUT)
 
 
 def get_output_objects() -> list[bpy.types.Object]:
-    return [
-        obj
-        for obj in bpy.data.objects
-        if obj.squishy_volumes.type == TYPE_OUTPUT  # ty:ignore[unresolved-attribute]
-    ]
+    return indexed_objects(TYPE_OUTPUT)
 
 
 def get_input_objects_with_uuid(uuid: str) -> list[bpy.types.Object]:
-    return [
-        obj
-        for obj in get_input_objects()
-        if obj.squishy_volumes.uuid == uuid  # ty:ignore[unresolved-attribute]
-    ]
+    return indexed_objects_with_uuid(TYPE_INPUT, uuid)
 
 
 def get_output_objects_with_uuid(uuid: str) -> list[bpy.types.Object]:
-    return [
-        obj
-        for obj in get_output_objects()
-        if obj.squishy_volumes.uuid == uuid  # ty:ignore[unresolved-attribute]
-    ]
+    return indexed_objects_with_uuid(TYPE_OUTPUT, uuid)
 
 
 def locked_simulations() -> list[bpy.types.Object]:
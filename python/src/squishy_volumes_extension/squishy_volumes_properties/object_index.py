@@ -0,0 +1,130 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of the Squishy Volumes extension.
+# Copyright (C) 2025  Algebraic UG (haftungsbeschränkt)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import bpy
+from bpy.app.handlers import persistent
+
+from ..bridge import SimulationHandle
+from ..get_preferences import get_print_debug_info
+
+# Scanning all of bpy.data.objects is slow in big scenes and the lookups happen
+# on every frame change, progress update and redraw.
+# The index only holds names, references to objects don't survive undo.
+# Entries are checked when resolved, so renamed or deleted objects trigger a rebuild,
+# and so does a changed number of objects, which covers added ones.
+
+_names_by_type: dict[str, list[str]] | None = None
+_names_by_type_and_uuid: dict[tuple[str, str], list[str]] = {}
+_num_objects: int = 0
+
+
+@persistent
+def invalidate_object_index(*_):
+    global _names_by_type
+    _names_by_type = None
+
+
+def _build_object_index():
+    global _names_by_type, _num_objects
+    _names_by_type = {}
+    _names_by_type_and_uuid.clear()
+    for obj in bpy.data.objects:
+        props = obj.squishy_volumes  # ty:ignore[unresolved-attribute]
+        _names_by_type.setdefault(props.type, []).append(obj.name)
+        _names_by_type_and_uuid.setdefault((props.type, props.uuid), []).append(
+            obj.name
+        )
+    _num_objects = len(bpy.data.objects)
+
+
+def _resolve(names: list[str], object_type: str, uuid: str | None):
+    objs = []
+    for name in names:
+        obj = bpy.data.objects.get(name)
+        if obj is None:
+            return None
+        props = obj.squishy_volumes  # ty:ignore[unresolved-attribute]
+        if props.type != object_type or (uuid is not None and props.uuid != uuid):
+            return None
+        objs.append(obj)
+    return objs
+
+
+def _lookup(object_type: str, uuid: str | None) -> list[bpy.types.Object]:
+    for _ in range(2):
+        if _names_by_type is None or _num_objects != len(bpy.data.objects):
+            _build_object_index()
+        assert _names_by_type is not None
+        if uuid is None:
+            names = _names_by_type.get(object_type, [])
+        else:
+            names = _names_by_type_and_uuid.get((object_type, uuid), [])
+        objs = _resolve(names, object_type, uuid)
+        if objs is not None:
+            return objs
+        invalidate_object_index()
+    raise RuntimeError("Failed to index objects")
+
+
+def indexed_objects(object_type: str) -> list[bpy.types.Object]:
+    return _lookup(object_type, None)
+
+
+def indexed_objects_with_uuid(object_type: str, uuid: str) -> list[bpy.types.Object]:
+    return _lookup(object_type, uuid)
+
+
+# simulation objects can be deleted through uncontrolled means, for example, undo
+@persistent
+def prune_simulation_handles(scene):
+    SimulationHandle.prune(
+        live_uuids={
+            obj.squishy_volumes.uuid  # ty:ignore[unresolved-attribute]
+            for obj in indexed_objects("Simulation")
+        }
+    )
+
+
+_invalidating_handlers = [
+    bpy.app.handlers.undo_post,
+    bpy.app.handlers.redo_post,
+    bpy.app.handlers.load_post,
+]
+
+
+def register_object_index():
+    invalidate_object_index()
+    for handlers in _invalidating_handlers:
+        if invalidate_object_index not in handlers:
+            handlers.append(invalidate_object_index)  # ty:ignore[invalid-argument-type]
+    if prune_simulation_handles not in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.append(prune_simulation_handles)  # ty:ignore[invalid-argument-type]
+    if get_print_debug_info():
+        print("Squishy Volumes object index registered.")
+
+
+def unregister_object_index():
+    if prune_simulation_handles in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(prune_simulation_handles)
+    for handlers in _invalidating_handlers:
+        if invalidate_object_index in handlers:
+            handlers.remove(invalidate_object_index)
+    invalidate_object_index()
+    if get_print_debug_info():
+        print("Squishy Volumes object index unregistered.")
@@ -67,6 +67,17 @@ class Squishy_Volumes_Properties_Output(bpy.types.PropertyGroup):
         options=set(),
     )  # type: ignore
 
+    fetch_region: bpy.props.PointerProperty(
+        type=bpy.types.Object,
+        name="Fetch Region",
+        description="""Only sync particles inside this cube empty or camera view.
+
+The particles outside are never copied into Blender,
+which speeds up close-ups of large simulations.""",
+        poll=lambda _, obj: obj.type in ("EMPTY", "CAMERA"),
+        options=set(),
+    )  # type: ignore
+
     # ----------------------------------------------------------------
     # Attribute syncing
     # ----------------------------------------------------------------
@@ -22,25 +22,19 @@ import re
 import bpy
 
 from ..get_preferences import get_default_cache_location
-from ..bridge import SimulationHandle, DETECTED_DEVICES
+from ..bridge import SimulationHandle, detected_devices
+
+from .object_index import indexed_objects, indexed_objects_with_uuid
 
 TYPE_SIMULATION = "Simulation"
 
 
 def get_simulation_objects() -> list[bpy.types.Object]:
-    return [
-        obj
-        for obj in bpy.data.objects
-        if obj.squishy_volumes.type == TYPE_SIMULATION  # ty:ignore[unresolved-attribute]
-    ]
+    return indexed_objects(TYPE_SIMULATION)
 
 
 def get_simulation_object_with_uuid(uuid: str) -> bpy.types.Object:
-    candidates = [
-        obj
-        for obj in get_simulation_objects()
-        if obj.squishy_volumes.uuid == uuid  # ty:ignore[unresolved-attribute]
-    ]
+    candidates = indexed_objects_with_uuid(TYPE_SIMULATION, uuid)
     if len(candidates) != 1:
         print(f"There are {len(candidates)} simulation objects for {uuid}")
         raise RuntimeError(f"There are {len(candidates)} simulation objects for {uuid}")
@@ -76,8 +70,7 @@ def update_directory(self, context):
             self.directory,
             [
                 obj.squishy_volumes.directory  # ty:ignore[unresolved-attribute]
-                for obj in bpy.data.objects
-                if obj.squishy_volumes.type == TYPE_SIMULATION  # ty:ignore[unresolved-attribute]
+                for obj in get_simulation_objects()
             ],
         )
         return  # we'll re-enter anyway
@@ -240,7 +233,7 @@ Smaller grid node size, stiffer objects and higher velocities dictate a smaller
     )  # type: ignore
 
     compute_device: bpy.props.EnumProperty(
-        items=DETECTED_DEVICES,
+        items=detected_devices,
         name="Device",
         description="Select the device you want Squishy Volumes to simulate on.",
         options=set(),
@@ -256,6 +249,57 @@ TODO: Not yet available on GPU""",
         default=True,
         options=set(),
     )  # type: ignore
+    multi_rate: bpy.props.BoolProperty(
+        name="Multi-Rate",
+        description="""Groups of particles that stay apart within a frame
+use their own 'Time Step', e.g. a small fast object
+doesn't slow down a big soft mass elsewhere.
+
+Only available with 'Adaptive Time Steps' on CPU""",
+        default=False,
+        options=set(),
+    )  # type: ignore
+    compute_threads: bpy.props.IntProperty(
+        name="Threads",
+        description="""Limits the number of CPU threads used for baking.
+Zero means all cores that aren't claimed by other bakes.
+
+(Re)Start baking to manifest changes.""",
+        default=0,
+        min=0,
+        options=set(),
+    )  # type: ignore
+    compute_cores: bpy.props.StringProperty(
+        name="Cores",
+        description="""Pins the CPU threads to these cores, for example "0-3,8".
+Leave empty to let the operating system decide.
+Pinned cores are not shared with other bakes.
+
+(Re)Start baking to manifest changes.""",
+        default="",
+        options=set(),
+    )  # type: ignore
+    compute_priority: bpy.props.IntProperty(
+        name="Priority",
+        description="""Weight when sharing cores with other bakes that run at the same time.
+A bake with priority 2 gets twice the cores of one with priority 1.
+
+(Re)Start baking to manifest changes.""",
+        default=1,
+        min=1,
+        max=100,
+        options=set(),
+    )  # type: ignore
+    record_trace: bpy.props.BoolProperty(
+        name="Record Trace",
+        description="""Records a timeline of baking, storing and loading frames
+into 'trace.json' in the cache directory.
+Open it in Perfetto or chrome://tracing to see what stalls.
+
+(Re)Start baking to manifest changes.""",
+        default=False,
+        options=set(),
+    )  # type: ignore
     bake_frames: bpy.props.IntProperty(
         name="Bake Frames",
         description="""The number of frames that should be baked.
@@ -130,6 +130,24 @@ subscribe_to_selection()
 
 
 class Squishy_Volumes_Properties_Scene(bpy.types.PropertyGroup):
+    bake_queue_order: bpy.props.EnumProperty(
+        items=[
+            ("Fifo", "First Come", "Bakes start in the order they were requested."),
+            ("Priority", "Priority", "Bakes with higher priority start first."),
+        ],
+        name="Queue Order",
+        description="Decides which waiting bake starts next.",
+        default="Fifo",
+        options=set(),
+    )  # type: ignore
+    bake_queue_max_concurrent: bpy.props.IntProperty(
+        name="Concurrent Bakes",
+        description="""How many simulations may bake at the same time.
+Further bakes wait in the queue until one finishes or is paused.""",
+        default=1,
+        min=1,
+        options=set(),
+    )  # type: ignore
     selected_simulation: bpy.props.EnumProperty(
         items=_selectable_simulations,
         name="Selected Simulation",
@@ -80,9 +80,16 @@ def fill_mesh_with_positions(mesh, positions):
     num_floats = positions.size
     num_vertices = num_floats // 3
 
-    mesh.clear_geometry()
-    mesh.vertices.add(num_vertices)  # Pre-allocate vertex space
+    # the particle count rarely changes, so the vertices and attributes are usually reused
+    if (
+        len(mesh.vertices) != num_vertices
+        or len(mesh.edges) != 0
+        or len(mesh.polygons) != 0
+    ):
+        mesh.clear_geometry()
+        mesh.vertices.add(num_vertices)  # Pre-allocate vertex space
     mesh.vertices.foreach_set("co", positions)  # Set all coordinates in one go
+    mesh.update_tag()
 
 
 def fill_mesh_with_vertices_and_triangles(mesh, vertices, triangles):
@@ -181,3 +188,24 @@ def giga_f32_to_u64(giga_float: float) -> int:
 
 def u64_to_giga_f32(u: int) -> float:
     return u * 1e-9
+
+
+def parse_core_set(text: str) -> list[int] | None:
+    # "0-3,8" -> [0, 1, 2, 3, 8], empty means unpinned
+    # the text is typed by the user, so the ValueError says what's wrong with it
+    cores = []
+    for part in text.replace(" ", "").split(","):
+        if not part:
+            continue
+        bounds = part.split("-")
+        if len(bounds) > 2 or not all(bound.isdecimal() for bound in bounds):
+            raise ValueError(
+                f'Cores: "{part}" is neither a core like "8" nor a range like "0-3".'
+            )
+        first, last = int(bounds[0]), int(bounds[-1])
+        if first > last:
+            raise ValueError(
+                f'Cores: "{part}" is a reversed range, did you mean "{last}-{first}"?'
+            )
+        cores.extend(range(first, last + 1))
+    return sorted(set(cores)) or None
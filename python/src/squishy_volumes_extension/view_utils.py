@@ -22,6 +22,8 @@ import mathutils
 
 from .util import local_bounding_box
 from .nodes import create_geometry_nodes_restrict_view
+from .magic_consts import PARTICLES
+from .squishy_volumes_properties import TYPE_OUTPUT
 
 
 class OBJECT_OT_Squishy_Volumes_Restrict_View(bpy.types.Operator):
@@ -30,7 +32,8 @@ class OBJECT_OT_Squishy_Volumes_Restrict_View(bpy.types.Operator):
     bl_description = """Add an empty cuboid for restricting the view.
 
 The selected object is restricted via a geometry nodes modifier.
-This modifier deletes vertices that are outside of the cuboid."""
+This modifier deletes vertices that are outside of the cuboid.
+Particle outputs also only fetch the particles inside of it."""
     bl_options = {"REGISTER", "UNDO"}
 
     empty_name: bpy.props.StringProperty(
@@ -86,6 +89,10 @@ This modifier deletes vertices that are outside of the cuboid."""
 
         obj.modifiers.move(len(obj.modifiers) - 1, 0)
 
+        props = obj.squishy_volumes
+        if props.type == TYPE_OUTPUT and props.output_type == PARTICLES:
+            props.fetch_region = empty
+
         self.report(
             {"INFO"},
             message=f"Restricting view of {obj.name} with {self.empty_name}",
@@ -8,29 +8,46 @@
 
 use anyhow::Result;
 use serde_json::Value;
-use std::path::PathBuf;
+use std::{
+    path::PathBuf,
+    sync::{Arc, Mutex, RwLock},
+};
 
 use crate::{Simulation, SimulationInput};
 
+// Handed out by the context, so a call only locks what it touches.
+// Read-only calls on simulations can run concurrently.
+pub type SharedSimulation = Arc<RwLock<dyn Simulation>>;
+pub type SharedSimulationInput = Arc<Mutex<dyn SimulationInput>>;
+
 pub trait Context: Send + Sync {
     fn available_gpus(&self) -> Vec<String>;
 
     fn new_simulation_input(
-        &mut self,
+        &self,
         uuid: String,
         directory: PathBuf,
         input_header: Value,
         max_bytes_on_disk: u64,
     ) -> Result<()>;
 
-    fn get_simulation_input(&mut self) -> Option<&mut dyn SimulationInput>;
-    fn drop_simulation_input(&mut self);
+    fn get_simulation_input(&self) -> Option<SharedSimulationInput>;
+    fn drop_simulation_input(&self);
+
+    fn new_simulation(&self) -> Result<String>;
+    fn load_simulation(&self, uuid: String, directory: PathBuf) -> Result<()>;
+    fn fork_simulation(
+        &self,
+        source_uuid: &str,
+        uuid: String,
+        directory: PathBuf,
+        frame: usize,
+    ) -> Result<()>;
 
-    fn new_simulation(&mut self) -> Result<String>;
-    fn load_simulation(&mut self, uuid: String, directory: PathBuf) -> Result<()>;
+    fn get_simulation(&self, uuid: &str) -> Option<SharedSimulation>;
 
-    fn get_simulation(&self, uuid: &str) -> Option<&dyn Simulation>;
-    fn get_simulation_mut(&mut self, uuid: &str) -> Option<&mut dyn Simulation>;
+    fn drop_simulation(&self, uuid: &str);
 
-    fn drop_simulation(&mut self, uuid: &str);
+    fn update_bake_queue(&self, settings: Value) -> Result<Value>;
+    fn move_in_bake_queue(&self, uuid: &str, offset: i64) -> Result<()>;
 }
@@ -9,11 +9,13 @@
 use anyhow::Result;
 use serde_json::Value;
 
-pub trait Simulation {
+pub trait Simulation: Send + Sync {
     fn input_header(&self) -> Result<Value>;
 
     fn computing(&self) -> bool;
 
+    /// Cheap, compare it to the previous value to decide whether to poll.
+    fn changes(&self) -> u64;
     fn poll(&mut self) -> Result<Value>;
 
     fn start_compute(&mut self, settings: Value) -> Result<()>;
@@ -23,5 +25,6 @@ pub trait Simulation {
     fn available_attributes(&self) -> Result<Vec<Value>>;
     fn fetch_flat_attribute_f32(&self, frame: usize, attribute: Value) -> Result<Vec<f32>>;
     fn fetch_flat_attribute_i32(&self, frame: usize, attribute: Value) -> Result<Vec<i32>>;
-    fn stats(&self) -> Result<Value>;
+    /// The grid nodes are counted in `frame`, usually the displayed one.
+    fn stats(&self, frame: Option<usize>) -> Result<Value>;
 }
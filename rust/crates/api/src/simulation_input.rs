@@ -9,7 +9,7 @@
 use anyhow::Result;
 use serde_json::Value;
 
-pub trait SimulationInput {
+pub trait SimulationInput: Send {
     fn start_frame(&mut self, frame_start: Value) -> Result<()>;
     fn record_input(&mut self, meta: Value, bulk: InputBulk) -> Result<()>;
     fn finish_frame(&mut self) -> Result<()>;
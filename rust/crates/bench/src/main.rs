@@ -0,0 +1,187 @@
+// SPDX-License-Identifier: MIT
+//
+// Copyright 2025  Algebraic UG (haftungsbeschränkt)
+//
+// Use of this source code is governed by an MIT-style
+// license that can be found in the LICENSE_MIT file or at
+// https://opensource.org/licenses/MIT.
+
+use std::{
+    collections::BTreeMap, fs::remove_file, io::stderr, num::NonZero, path::Path,
+    thread::available_parallelism, time::Instant,
+};
+
+use anyhow::Result;
+use clap::Parser;
+use rayon::ThreadPoolBuilder;
+use serde::Serialize;
+use squishy_volumes_core::{MaterialOverrides, initialize_io_state};
+use squishy_volumes_cpu::{CpuRunParameters, CpuState};
+use squishy_volumes_file_input::InputReader;
+use squishy_volumes_xpu::{FrameInput, Harness};
+use tracing::{info, subscriber::set_global_default};
+use tracing_subscriber::FmtSubscriber;
+
+use crate::scene::{FRAMES_PER_SECOND, Scene, write_input};
+
+mod scene;
+
+/// Bakes synthetic scenes on the CPU, one JSON line per scene, particle count and thread count.
+#[derive(Parser)]
+struct Cli {
+    #[arg(long, value_enum, value_delimiter = ',', default_value = "solid,fluid")]
+    scenes: Vec<Scene>,
+
+    #[arg(
+        long,
+        value_name = "NUMBERS_OF_PARTICLES",
+        value_delimiter = ',',
+        default_value = "10000,100000"
+    )]
+    particles: Vec<usize>,
+
+    /// All available cores if not given.
+    #[arg(long, value_name = "NUMBERS_OF_THREADS", value_delimiter = ',')]
+    threads: Vec<NonZero<usize>>,
+
+    #[arg(long, value_name = "NUMBER_OF_FRAMES", default_value_t = 10)]
+    frames: usize,
+
+    /// Baked before the measured frames.
+    #[arg(long, value_name = "NUMBER_OF_FRAMES", default_value_t = 1)]
+    warmup_frames: usize,
+
+    #[arg(long, value_name = "TIME_STEP", default_value_t = 0.01)]
+    time_step: f32,
+
+    /// Always use the given time step.
+    #[arg(long)]
+    fixed_time_steps: bool,
+
+    /// Scatter per block of particles instead of per grid node.
+    #[arg(long)]
+    particle_centric_scatter: bool,
+}
+
+#[derive(Serialize)]
+struct RunResult {
+    scene: Scene,
+    particles: usize,
+    threads: usize,
+    frames: usize,
+    seconds: f64,
+    substeps: usize,
+    substeps_per_second: f64,
+    particle_steps_per_second: f64,
+    phase_seconds: BTreeMap<&'static str, f64>,
+    time_step_limits: BTreeMap<&'static str, usize>,
+}
+
+fn main() -> Result<()> {
+    // stdout is reserved for the results
+    set_global_default(FmtSubscriber::builder().with_writer(stderr).finish())?;
+
+    let cli = Cli::parse();
+    let threads = if cli.threads.is_empty() {
+        vec![available_parallelism()?]
+    } else {
+        cli.threads.clone()
+    };
+
+    let directory = tempfile::Builder::new()
+        .prefix("SquishyVolumesBench")
+        .tempdir()?;
+    for &scene in &cli.scenes {
+        for &particles in &cli.particles {
+            let input_path = directory.path().join(format!("{scene:?}_{particles}.bin"));
+            info!(?scene, particles, "writing input");
+            // the last frame is only interpolated towards
+            write_input(
+                &input_path,
+                scene,
+                particles,
+                cli.warmup_frames + cli.frames + 1,
+            )?;
+
+            for threads in threads.iter().map(|threads| threads.get()) {
+                info!(?scene, particles, threads, "baking");
+                let result = run(&cli, &input_path, scene, particles, threads)?;
+                println!("{}", serde_json::to_string(&result)?);
+            }
+            remove_file(&input_path)?;
+        }
+    }
+    Ok(())
+}
+
+fn run(
+    cli: &Cli,
+    input_path: &Path,
+    scene: Scene,
+    particles: usize,
+    threads: usize,
+) -> Result<RunResult> {
+    let pool = ThreadPoolBuilder::new().num_threads(threads).build()?;
+    let total_frames = cli.warmup_frames + cli.frames;
+    let harness = Harness::new(
+        "Benchmark".to_string(),
+        NonZero::new(total_frames + 1).unwrap(),
+    );
+
+    let mut input_reader = InputReader::new(input_path)?;
+    let io_state = pool.install(|| {
+        initialize_io_state(&harness, &mut input_reader, &MaterialOverrides::default())
+    })?;
+    let mut frame_input = pool.install(|| FrameInput::new(input_reader, 0))?;
+    let mut cpu_state = CpuState::from_io_state(io_state)?;
+
+    let mut result = RunResult {
+        scene,
+        particles,
+        threads,
+        frames: cli.frames,
+        seconds: 0.,
+        substeps: 0,
+        substeps_per_second: 0.,
+        particle_steps_per_second: 0.,
+        phase_seconds: Default::default(),
+        time_step_limits: Default::default(),
+    };
+    for frame in 1..=total_frames {
+        pool.install(|| frame_input.load(frame - 1))?;
+
+        let start_frame = Instant::now();
+        let (_, frame_result) = pool.install(|| {
+            cpu_state.produce_next_state(
+                &harness,
+                &frame_input,
+                CpuRunParameters {
+                    target_time: frame as f64 / FRAMES_PER_SECOND as f64,
+                    max_time_step: cli.time_step,
+                    adaptive_time_steps: !cli.fixed_time_steps,
+                    particle_centric_scatter: cli.particle_centric_scatter,
+                    store_grid: false,
+                },
+            )
+        })?;
+        let seconds = start_frame.elapsed().as_secs_f64();
+        frame_result?;
+
+        if frame <= cli.warmup_frames {
+            continue;
+        }
+        let frame_stats = cpu_state.frame_stats();
+        result.seconds += seconds;
+        result.substeps += frame_stats.substeps;
+        for &(phase, duration) in &frame_stats.phase_durations {
+            *result.phase_seconds.entry(phase).or_default() += duration.as_secs_f64();
+        }
+        for &(limit, substeps) in &frame_stats.time_step_limits {
+            *result.time_step_limits.entry(limit).or_default() += substeps;
+        }
+    }
+
+    result.substeps_per_second = result.substeps as f64 / result.seconds;
+    result.particle_steps_per_second = result.substeps_per_second * particles as f64;
+    Ok(result)
+}
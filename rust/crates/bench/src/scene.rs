@@ -0,0 +1,252 @@
+// SPDX-License-Identifier: MIT
+//
+// Copyright 2025  Algebraic UG (haftungsbeschränkt)
+//
+// Use of this source code is governed by an MIT-style
+// license that can be found in the LICENSE_MIT file or at
+// https://opensource.org/licenses/MIT.
+
+use std::{collections::BTreeMap, path::Path};
+
+use anyhow::Result;
+use clap::ValueEnum;
+use nalgebra::{Rotation3, Vector3, Vector4};
+use serde::Serialize;
+use serde_json::{from_value, json};
+use squishy_volumes_file_frame::ParticleFlags;
+use squishy_volumes_file_input::{
+    ColliderInput, InputFrame, InputHeader, InputObject, InputWriter, ParticlesInput,
+};
+use squishy_volumes_gpu::{cone, torus};
+use squishy_volumes_mesh_util::Triangle;
+
+pub const FRAMES_PER_SECOND: u32 = 24;
+const GRID_NODE_SIZE: f32 = 0.5;
+// two particles per grid node along each axis, like the default fill
+const PARTICLE_SPACING: f32 = GRID_NODE_SIZE / 2.;
+const DENSITY: f32 = 1000.;
+const YOUNGS_MODULUS: f32 = 1e5;
+const POISSONS_RATIO: f32 = 0.3;
+const BULK_MODULUS: f32 = 1e5;
+const EXPONENT: u32 = 7;
+// the torus and cone are modelled around the y axis
+const GRAVITY: [f32; 3] = [0., -9.81, 0.];
+// keeps the torus moving, so the collider structures are rebuilt every frame
+const TORUS_RADIANS_PER_FRAME: f32 = 0.05;
+
+#[derive(Clone, Copy, Debug, ValueEnum, Serialize)]
+#[serde(rename_all = "snake_case")]
+pub enum Scene {
+    /// An elastic block dropped through a turning torus.
+    Solid,
+    /// A block of fluid dropped onto a cone.
+    Fluid,
+    /// Both next to each other.
+    Mixed,
+}
+
+struct Block {
+    flags: ParticleFlags,
+    center: Vector3<f32>,
+    num_particles: usize,
+}
+
+struct Collider {
+    vertices: Vec<Vector4<f32>>,
+    triangles: Vec<Triangle>,
+    center: Vector3<f32>,
+    scale: f32,
+    radians_per_frame: f32,
+}
+
+fn block_side(num_particles: usize) -> f32 {
+    (num_particles as f32).cbrt().ceil() * PARTICLE_SPACING
+}
+
+fn torus_below(block: &Block) -> Collider {
+    let side = block_side(block.num_particles);
+    Collider {
+        vertices: torus::vertices(),
+        triangles: torus::triangles(),
+        center: block.center - Vector3::y() * side,
+        // the block fits through the hole, but not through the ring
+        scale: side * 0.6,
+        radians_per_frame: TORUS_RADIANS_PER_FRAME,
+    }
+}
+
+fn cone_below(block: &Block) -> Collider {
+    let side = block_side(block.num_particles);
+    Collider {
+        vertices: cone::vertices(),
+        triangles: cone::triangles(),
+        center: block.center - Vector3::y() * side * 1.5,
+        scale: side,
+        radians_per_frame: 0.,
+    }
+}
+
+fn scene_objects(scene: Scene, num_particles: usize) -> (Vec<Block>, Vec<Collider>) {
+    let block = |flags, num_particles, x| Block {
+        flags,
+        center: Vector3::new(x, 0., 0.),
+        num_particles,
+    };
+    let blocks = match scene {
+        Scene::Solid => vec![block(ParticleFlags::IS_SOLID, num_particles, 0.)],
+        Scene::Fluid => vec![block(ParticleFlags::IS_FLUID, num_particles, 0.)],
+        Scene::Mixed => {
+            let offset = block_side(num_particles / 2) * 1.5;
+            vec![
+                block(ParticleFlags::IS_SOLID, num_particles / 2, -offset),
+                block(
+                    ParticleFlags::IS_FLUID,
+                    num_particles - num_particles / 2,
+                    offset,
+                ),
+            ]
+        }
+    };
+    let colliders = blocks
+        .iter()
+        .map(|block| {
+            if block.flags.contains(ParticleFlags::IS_SOLID) {
+                torus_below(block)
+            } else {
+                cone_below(block)
+            }
+        })
+        .collect();
+    (blocks, colliders)
+}
+
+fn particles_input(block: &Block) -> ParticlesInput {
+    let per_side = (block.num_particles as f32).cbrt().ceil() as usize;
+    let min = block.center - Vector3::repeat(block_side(block.num_particles) / 2.);
+    let transforms = (0..block.num_particles)
+        .map(|i| {
+            let lattice = Vector3::new(
+                i / per_side / per_side,
+                i / per_side % per_side,
+                i % per_side,
+            );
+            let position = min + lattice.map(|c| (c as f32 + 0.5) * PARTICLE_SPACING);
+            [
+                [1., 0., 0., 0.],
+                [0., 1., 0., 0.],
+                [0., 0., 1., 0.],
+                [position.x, position.y, position.z, 1.],
+            ]
+        })
+        .collect();
+    let n = block.num_particles;
+    ParticlesInput {
+        flags: vec![block.flags.bits(); n],
+        transforms: Some(transforms),
+        sizes: Some(vec![PARTICLE_SPACING; n]),
+        densities: Some(vec![DENSITY; n]),
+        youngs_moduluses: Some(vec![YOUNGS_MODULUS; n]),
+        poissons_ratios: Some(vec![POISSONS_RATIO; n]),
+        exponents: Some(vec![EXPONENT; n]),
+        bulk_moduluses: Some(vec![BULK_MODULUS; n]),
+        ..Default::default()
+    }
+}
+
+fn collider_input(collider: &Collider, frame: usize) -> ColliderInput {
+    let rotation = Rotation3::from_axis_angle(
+        &Vector3::y_axis(),
+        collider.radians_per_frame * frame as f32,
+    );
+    ColliderInput {
+        vertex_positions: collider
+            .vertices
+            .iter()
+            .map(|vertex| (collider.center + rotation * vertex.xyz() * collider.scale).into())
+            .collect(),
+        triangle_indices: collider
+            .triangles
+            .iter()
+            .map(|triangle| [triangle.a, triangle.b, triangle.c])
+            .collect(),
+        triangle_frictions: vec![0.5; collider.triangles.len()],
+        triangle_dampings: vec![0.; collider.triangles.len()],
+    }
+}
+
+/// Records `number_of_frames` input frames of `scene`, like capturing it in Blender would.
+pub fn write_input(
+    path: &Path,
+    scene: Scene,
+    num_particles: usize,
+    number_of_frames: usize,
+) -> Result<()> {
+    let (blocks, colliders) = scene_objects(scene, num_particles);
+    let block_name = |i: usize| format!("block_{i}");
+    let collider_name = |i: usize| format!("collider_{i}");
+
+    // far enough that nothing leaves the domain within a typical benchmark
+    let extent = 10. * block_side(num_particles);
+    let header: InputHeader = from_value(json!({
+        "consts": {
+            "grid_node_size": GRID_NODE_SIZE,
+            "leaf_size": GRID_NODE_SIZE * 2.,
+            "leaf_threshold": 16,
+            "simulation_scale": 1.,
+            "frames_per_second": FRAMES_PER_SECOND,
+            "domain_min": [-extent, -extent, -extent],
+            "domain_max": [extent, extent, extent],
+        },
+        "objects": {},
+    }))?;
+    let header = InputHeader {
+        objects: blocks
+            .iter()
+            .enumerate()
+            .map(|(i, block)| {
+                (
+                    block_name(i),
+                    InputObject::Particles {
+                        num_particles: block.num_particles,
+                    },
+                )
+            })
+            .chain(colliders.iter().enumerate().map(|(i, collider)| {
+                (
+                    collider_name(i),
+                    InputObject::Collider {
+                        num_vertices: collider.vertices.len(),
+                        num_triangles: collider.triangles.len(),
+                    },
+                )
+            }))
+            .collect(),
+        ..header
+    };
+
+    let mut input_writer = InputWriter::new(path, header)?;
+    for frame in 0..number_of_frames {
+        let particles_inputs = if frame == 0 {
+            blocks
+                .iter()
+                .enumerate()
+                .map(|(i, block)| (block_name(i), particles_input(block)))
+                .collect()
+        } else {
+            Default::default()
+        };
+        let collider_inputs = colliders
+            .iter()
+            .enumerate()
+            .map(|(i, collider)| (collider_name(i), collider_input(collider, frame)))
+            .collect::<BTreeMap<_, _>>()
+            .try_into()?;
+        input_writer.record_frame(&InputFrame {
+            gravity: GRAVITY,
+            particles_inputs,
+            collider_inputs,
+        })?;
+    }
+    input_writer.flush()?;
+    Ok(())
+}
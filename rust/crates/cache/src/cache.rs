@@ -7,30 +7,68 @@
 // https://opensource.org/licenses/MIT.
 
 use std::sync::{
-    Arc, Mutex, MutexGuard,
+    Arc, Mutex, OnceLock,
     atomic::{AtomicU64, AtomicUsize, Ordering},
 };
 
 use super::*;
 
+// Enough for rendering, which reads the next frame while the current one is fetched.
+const LOADED_FRAMES: usize = 2;
+
 struct LoadedFrame {
     frame: usize,
     state: squishy_volumes_file_frame::IoState,
+    // only built when a region is fetched
+    particle_index: OnceLock<ParticleIndex>,
 }
 
-pub struct CachedState<'a> {
-    guard: MutexGuard<'a, Option<LoadedFrame>>,
+// Shared, so fetches of the same frame only hold the slot's lock while looking it up.
+pub struct CachedState {
+    loaded_frame: Arc<LoadedFrame>,
 }
 
-impl<'a> std::ops::Deref for CachedState<'a> {
+impl std::ops::Deref for CachedState {
     type Target = squishy_volumes_file_frame::IoState;
 
     fn deref(&self) -> &Self::Target {
-        &self
-            .guard
-            .as_ref()
-            .expect("cached state is never none")
-            .state
+        &self.loaded_frame.state
+    }
+}
+
+impl CachedState {
+    pub fn particle_index(&self) -> &ParticleIndex {
+        self.loaded_frame
+            .particle_index
+            .get_or_init(|| ParticleIndex::new(&self.loaded_frame.state.particles.positions))
+    }
+}
+
+// Which frame each slot holds or is about to hold, so a slot is picked without waiting on it.
+// The slot's own lock decides what it actually holds.
+#[derive(Default)]
+struct SlotTable {
+    frames: [Option<usize>; LOADED_FRAMES],
+    last_used: [u64; LOADED_FRAMES],
+    uses: u64,
+}
+
+impl SlotTable {
+    // The slot with `frame` in it, or the least recently used one to load it into.
+    fn claim(&mut self, frame: usize) -> usize {
+        let slot = self
+            .frames
+            .iter()
+            .position(|loaded| *loaded == Some(frame))
+            .unwrap_or_else(|| {
+                (0..LOADED_FRAMES)
+                    .min_by_key(|&slot| self.last_used[slot])
+                    .unwrap()
+            });
+        self.frames[slot] = Some(frame);
+        self.uses += 1;
+        self.last_used[slot] = self.uses;
+        slot
     }
 }
 
@@ -41,7 +79,8 @@ pub struct Cache {
     total_bytes_on_disk: Arc<AtomicU64>,
     max_bytes_on_disk: Arc<AtomicU64>,
 
-    loaded_frame: Mutex<Option<LoadedFrame>>,
+    slot_table: Mutex<SlotTable>,
+    loaded_frames: [Mutex<Option<Arc<LoadedFrame>>>; LOADED_FRAMES],
 
     available_frames: Arc<AtomicUsize>,
     store_thread: Mutex<StoreThread>,
@@ -92,7 +131,8 @@ impl Cache {
             total_bytes_on_disk,
             max_bytes_on_disk,
 
-            loaded_frame: None.into(),
+            slot_table: Default::default(),
+            loaded_frames: Default::default(),
             available_frames,
             store_thread,
         })
@@ -162,9 +202,18 @@ impl Cache {
         Ok(())
     }
 
-    pub fn fetch_frame<'a>(&'a self, frame: usize) -> Result<CachedState<'a>, CacheReadingError> {
-        let mut loaded_frame = self
-            .loaded_frame
+    pub fn fetch_frame(&self, frame: usize) -> Result<CachedState, CacheReadingError> {
+        let _span = tracing::debug_span!("fetch_frame", frame).entered();
+        if frame >= self.available_frames.load(Ordering::Relaxed) {
+            return Err(CacheReadingError::FrameNotReady);
+        }
+        let slot = self
+            .slot_table
+            .lock()
+            .map_err(|_| CacheReadingError::LoadedFrameLockPoisoned)?
+            .claim(frame);
+        // held while reading, so a frame is read only once even if fetched concurrently
+        let mut loaded_frame = self.loaded_frames[slot]
             .lock()
             .map_err(|_| CacheReadingError::LoadedFrameLockPoisoned)?;
 
@@ -172,20 +221,23 @@ impl Cache {
             .as_ref()
             .is_none_or(|loaded_frame| loaded_frame.frame != frame)
         {
-            if frame >= self.available_frames.load(Ordering::Relaxed) {
-                return Err(CacheReadingError::FrameNotReady);
-            }
             tracing::debug!(frame, "reading frame from disk");
-            let state = squishy_volumes_file_frame::IoState::read(frame_path(
-                self.directory_lock.directory(),
+            let state = tracing::debug_span!("read_frame", frame).in_scope(|| {
+                squishy_volumes_file_frame::IoState::read(frame_path(
+                    self.directory_lock.directory(),
+                    frame,
+                ))
+            })?;
+            *loaded_frame = Some(Arc::new(LoadedFrame {
                 frame,
-            ))?;
-            *loaded_frame = Some(LoadedFrame { frame, state });
+                state,
+                particle_index: OnceLock::new(),
+            }));
         }
-
-        Ok(CachedState {
-            guard: loaded_frame,
-        })
+        let loaded_frame = loaded_frame
+            .clone()
+            .expect("the slot was just filled with the frame");
+        Ok(CachedState { loaded_frame })
     }
 
     pub fn drop_frames(&self, from_frame: usize) -> Result<(), CacheError> {
@@ -201,6 +253,17 @@ impl Cache {
         self.available_frames
             .fetch_min(from_frame, Ordering::Relaxed);
         clean_up_frames(self.directory_lock.directory(), from_frame)?;
+        for loaded_frame in &self.loaded_frames {
+            let mut loaded_frame = loaded_frame
+                .lock()
+                .map_err(|_| CacheReadingError::LoadedFrameLockPoisoned)?;
+            if loaded_frame
+                .as_ref()
+                .is_some_and(|loaded_frame| loaded_frame.frame >= from_frame)
+            {
+                *loaded_frame = None;
+            }
+        }
 
         let (bytes_on_disk_from_frames, _frames) =
             discover_frames(self.directory_lock.directory()).map_err(CacheReadingError::IoError)?;
@@ -211,19 +274,18 @@ impl Cache {
         Ok(())
     }
 
-    pub fn grid_node_count(&self) -> Result<Option<usize>, CacheError> {
-        Ok(self
-            .loaded_frame
-            .lock()
-            .map_err(|_| CacheReadingError::LoadedFrameLockPoisoned)?
-            .as_ref()
-            .and_then(|loaded_frame| {
-                loaded_frame
-                    .state
-                    .grid_nodes
-                    .as_ref()
-                    .map(|grid_nodes| grid_nodes.collider_bits.len())
-            }))
+    // Only if `frame` is loaded and stored its grid nodes.
+    // Doesn't wait for a fetch that is reading from disk, stats are drawn often.
+    pub fn grid_node_count(&self, frame: usize) -> Option<usize> {
+        self.loaded_frames.iter().find_map(|loaded_frame| {
+            let loaded_frame = loaded_frame.try_lock().ok()?;
+            let loaded_frame = loaded_frame.as_ref()?;
+            if loaded_frame.frame != frame {
+                return None;
+            }
+            let grid_nodes = loaded_frame.state.grid_nodes.as_ref()?;
+            Some(grid_nodes.collider_bits.len())
+        })
     }
 }
 
@@ -8,11 +8,14 @@
 
 mod cache;
 mod errors;
+mod particle_index;
 mod store_thread;
 mod util;
 
 use store_thread::*;
 use util::*;
 
-pub use cache::{Cache, CachedState};
+pub use cache::{Cache, CachedState, clean_up_frames};
 pub use errors::*;
+pub use particle_index::ParticleIndex;
+pub use util::frame_path;
@@ -0,0 +1,154 @@
+// SPDX-License-Identifier: MIT
+//
+// Copyright 2025  Algebraic UG (haftungsbeschränkt)
+//
+// Use of this source code is governed by an MIT-style
+// license that can be found in the LICENSE_MIT file or at
+// https://opensource.org/licenses/MIT.
+
+// Aim for this many particles per cell, so queries don't visit too many empty cells.
+const PARTICLES_PER_CELL: usize = 64;
+const MAX_CELLS_PER_AXIS: usize = 256;
+
+/// Particles sorted into a uniform grid over their bounding box,
+/// built once per loaded frame to answer region queries.
+pub struct ParticleIndex {
+    min: [f32; 3],
+    max: [f32; 3],
+    inverse_cell_size: [f32; 3],
+    resolution: [usize; 3],
+    // where each cell starts in `particles`, the last entry is the end
+    cell_starts: Vec<u32>,
+    // ascending within each cell
+    particles: Vec<u32>,
+}
+
+impl ParticleIndex {
+    pub fn new(positions: &[[f32; 3]]) -> Self {
+        let _span = tracing::debug_span!("build_particle_index").entered();
+        let mut min = [f32::MAX; 3];
+        let mut max = [f32::MIN; 3];
+        for position in positions {
+            for axis in 0..3 {
+                min[axis] = min[axis].min(position[axis]);
+                max[axis] = max[axis].max(position[axis]);
+            }
+        }
+        if positions.is_empty() {
+            min = [0.; 3];
+            max = [0.; 3];
+        }
+
+        let cells_per_axis = (positions.len() as f32 / PARTICLES_PER_CELL as f32)
+            .cbrt()
+            .ceil()
+            .clamp(1., MAX_CELLS_PER_AXIS as f32) as usize;
+        let resolution = [cells_per_axis; 3];
+        let inverse_cell_size = std::array::from_fn(|axis| {
+            let extent = max[axis] - min[axis];
+            if extent > 0. {
+                cells_per_axis as f32 / extent
+            } else {
+                0.
+            }
+        });
+
+        let mut index = Self {
+            min,
+            max,
+            inverse_cell_size,
+            resolution,
+            cell_starts: Vec::new(),
+            particles: Vec::new(),
+        };
+
+        // counting sort, which keeps the particles ascending within a cell
+        let cells: Vec<usize> = positions
+            .iter()
+            .map(|position| index.cell(index.cell_coordinates(*position)))
+            .collect();
+        let num_cells = resolution.iter().product::<usize>();
+        let mut cell_starts = vec![0u32; num_cells + 1];
+        for &cell in &cells {
+            cell_starts[cell + 1] += 1;
+        }
+        for cell in 0..num_cells {
+            cell_starts[cell + 1] += cell_starts[cell];
+        }
+        let mut next = cell_starts.clone();
+        let mut particles = vec![0u32; positions.len()];
+        for (particle, &cell) in cells.iter().enumerate() {
+            particles[next[cell] as usize] = particle as u32;
+            next[cell] += 1;
+        }
+
+        index.cell_starts = cell_starts;
+        index.particles = particles;
+        index
+    }
+
+    fn cell_coordinates(&self, position: [f32; 3]) -> [usize; 3] {
+        std::array::from_fn(|axis| {
+            let cell = (position[axis] - self.min[axis]) * self.inverse_cell_size[axis];
+            // also clamps NaN to zero
+            (cell.max(0.) as usize).min(self.resolution[axis] - 1)
+        })
+    }
+
+    fn cell(&self, [x, y, z]: [usize; 3]) -> usize {
+        (x * self.resolution[1] + y) * self.resolution[2] + z
+    }
+
+    /// All particles that might be within the box, in no particular order.
+    pub fn candidates(&self, min: [f32; 3], max: [f32; 3]) -> impl Iterator<Item = usize> + '_ {
+        // otherwise, the box would be clamped onto the border cells
+        let overlaps =
+            (0..3).all(|axis| min[axis] <= self.max[axis] && self.min[axis] <= max[axis]);
+        let [min_x, min_y, min_z] = self.cell_coordinates(min);
+        let [max_x, max_y, max_z] = self.cell_coordinates(max);
+
+        overlaps
+            .then(move || {
+                (min_x..=max_x)
+                    .flat_map(move |x| (min_y..=max_y).map(move |y| (x, y)))
+                    .flat_map(move |(x, y)| {
+                        // cells along z are contiguous
+                        let start = self.cell_starts[self.cell([x, y, min_z])] as usize;
+                        let end = self.cell_starts[self.cell([x, y, max_z]) + 1] as usize;
+                        self.particles[start..end]
+                            .iter()
+                            .map(|&particle| particle as usize)
+                    })
+            })
+            .into_iter()
+            .flatten()
+    }
+}
+
+#[cfg(test)]
+mod test {
+    use super::*;
+
+    #[test]
+    fn candidates_contain_all_particles_in_the_box() {
+        let n = 20;
+        let positions: Vec<[f32; 3]> = (0..n * n * n)
+            .map(|i| [(i / n / n) as f32, (i / n % n) as f32, (i % n) as f32 * 0.5])
+            .collect();
+        let index = ParticleIndex::new(&positions);
+
+        let min = [3.5, -1., 2.];
+        let max = [7., 4.2, 2.5];
+        let inside = |p: &[f32; 3]| (0..3).all(|axis| min[axis] <= p[axis] && p[axis] <= max[axis]);
+
+        let candidates: Vec<usize> = index.candidates(min, max).collect();
+        for (particle, position) in positions.iter().enumerate() {
+            if inside(position) {
+                assert!(candidates.contains(&particle));
+            }
+        }
+        assert!(candidates.len() < positions.len() / 4);
+
+        assert_eq!(index.candidates([100.; 3], [101.; 3]).count(), 0);
+    }
+}
@@ -34,13 +34,10 @@ impl StoreThread {
         let (store_tx, store_rx) = mpsc::channel::<squishy_volumes_file_frame::IoState>();
         let thread = std::thread::spawn(move || -> Result<(), CacheWritingError> {
             while let Ok(state) = store_rx.recv() {
-                total_bytes_on_disk.fetch_add(
-                    state.write(frame_path(
-                        &cache_dir,
-                        available_frames.load(Ordering::Relaxed),
-                    ))?,
-                    Ordering::Relaxed,
-                );
+                let frame = available_frames.load(Ordering::Relaxed);
+                let bytes = tracing::debug_span!("write_frame", frame)
+                    .in_scope(|| state.write(frame_path(&cache_dir, frame)))?;
+                total_bytes_on_disk.fetch_add(bytes, Ordering::Relaxed);
                 available_frames.fetch_add(1, Ordering::Relaxed);
                 tracing::debug!(
                     "stored frame {}",
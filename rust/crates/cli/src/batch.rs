@@ -0,0 +1,470 @@
+// SPDX-License-Identifier: MIT
+//
+// Copyright 2025  Algebraic UG (haftungsbeschränkt)
+//
+// Use of this source code is governed by an MIT-style
+// license that can be found in the LICENSE_MIT file or at
+// https://opensource.org/licenses/MIT.
+
+use anyhow::{Context, Result};
+use clap::Args;
+use serde::Deserialize;
+use serde_json::{json, Value};
+use squishy_volumes_core::{
+    BakeQueue, BakeQueueOrder, BakeQueueSettings, BakeState, ComputeSettings, CoreScheduler,
+    MaterialOverrides, SimulationImpl,
+};
+use std::{
+    fs::{self, File},
+    io::{stdout, BufRead, BufReader, Write},
+    num::NonZero,
+    path::{Path, PathBuf},
+    sync::{
+        atomic::{AtomicBool, Ordering},
+        Arc,
+    },
+    thread::sleep,
+    time::{Duration, Instant},
+};
+use tracing::{info, warn};
+use uuid::Uuid;
+
+// The compute state holds a few copies of what ends up in a frame file.
+const MEMORY_PER_FRAME_BYTE: u64 = 4;
+
+#[derive(Args)]
+pub struct BatchArgs {
+    /// Cache directories, the last path component may contain `*` and `?`.
+    #[arg(value_name = "SIMULATION_DIRECTORY")]
+    directories: Vec<String>,
+
+    /// JSON lines, each with a `directory` and optional overrides of the settings below.
+    #[arg(long, value_name = "JOBS_FILE")]
+    jobs: Option<PathBuf>,
+
+    #[command(flatten)]
+    bake: BakeArgs,
+}
+
+/// Settings shared by all jobs, some can be overridden per job.
+#[derive(Args)]
+pub struct BakeArgs {
+    #[arg(long, value_name = "TIME_STEP")]
+    time_step: f32,
+
+    #[arg(long)]
+    adaptive_time_steps: bool,
+
+    /// Scatter per block of particles instead of per grid node.
+    #[arg(long)]
+    particle_centric_scatter: bool,
+
+    /// Step groups of particles that stay apart independently, needs adaptive time steps.
+    #[arg(long)]
+    multi_rate: bool,
+
+    /// Record a timeline into trace.json in the cache directory of a job,
+    /// jobs running at the same time share the trace of the first one.
+    #[arg(long)]
+    trace: bool,
+
+    #[arg(long, value_name = "NUMBER_OF_FRAMES")]
+    number_of_frames: usize,
+
+    #[arg(long, value_name = "NUMBER_OF_BYTES")]
+    max_bytes_on_disk: u64,
+
+    /// Cores shared by all running jobs.
+    #[arg(long, value_name = "NUMBER_OF_CORES")]
+    core_budget: Option<NonZero<usize>>,
+
+    /// Memory shared by all running jobs, estimated from the frame sizes.
+    #[arg(long, value_name = "NUMBER_OF_BYTES")]
+    memory_budget: Option<u64>,
+
+    #[arg(long, value_name = "NUMBER_OF_JOBS", default_value = "1")]
+    max_concurrent: NonZero<usize>,
+
+    /// Where the JSON lines go, stdout otherwise.
+    #[arg(long, value_name = "PROGRESS_FILE")]
+    progress: Option<PathBuf>,
+}
+
+#[derive(Default, Deserialize)]
+pub struct JobLine {
+    pub directory: PathBuf,
+    pub time_step: Option<f32>,
+    pub adaptive_time_steps: Option<bool>,
+    pub particle_centric_scatter: Option<bool>,
+    pub multi_rate: Option<bool>,
+    pub number_of_frames: Option<usize>,
+    pub max_bytes_on_disk: Option<u64>,
+    pub threads: Option<NonZero<usize>>,
+    pub cores: Option<Vec<usize>>,
+    pub priority: Option<NonZero<u32>>,
+    #[serde(default)]
+    pub material_overrides: MaterialOverrides,
+}
+
+#[derive(Clone, Copy, PartialEq, Eq)]
+enum JobState {
+    Pending,
+    Queued,
+    Running,
+    Finished,
+    Skipped,
+    Failed,
+}
+
+struct Job {
+    directory: PathBuf,
+    settings: ComputeSettings,
+    simulation: Option<SimulationImpl>,
+    state: JobState,
+    memory_estimate: u64,
+    started: Option<Instant>,
+    reported_frames: usize,
+    max_substeps: usize,
+    summary: Option<Value>,
+}
+
+struct Progress {
+    out: Box<dyn Write>,
+    start: Instant,
+}
+
+impl Progress {
+    fn emit(&mut self, event: &str, directory: Option<&Path>, mut value: Value) -> Result<()> {
+        value["event"] = json!(event);
+        if let Some(directory) = directory {
+            value["directory"] = json!(directory);
+        }
+        value["time_sec"] = json!(self.start.elapsed().as_secs_f32());
+        writeln!(self.out, "{value}")?;
+        self.out.flush()?;
+        Ok(())
+    }
+}
+
+pub fn run_batch(args: BatchArgs, run: Arc<AtomicBool>) -> Result<()> {
+    let lines = collect_job_lines(&args)?;
+    run_jobs(lines, &args.bake, run)?;
+    Ok(())
+}
+
+/// Bakes the jobs and returns a summary for each of them, failed ones included.
+pub fn run_jobs(lines: Vec<JobLine>, args: &BakeArgs, run: Arc<AtomicBool>) -> Result<Vec<Value>> {
+    let core_scheduler = args
+        .core_budget
+        .map(CoreScheduler::with_budget)
+        .unwrap_or_default();
+    let bake_queue = BakeQueue::default();
+    bake_queue.configure(BakeQueueSettings {
+        order: BakeQueueOrder::Priority,
+        max_concurrent: args.max_concurrent,
+    })?;
+
+    let mut progress = Progress {
+        out: match &args.progress {
+            Some(path) => Box::new(File::create(path)?),
+            None => Box::new(stdout()),
+        },
+        start: Instant::now(),
+    };
+
+    let mut jobs = Vec::new();
+    let mut summaries = Vec::new();
+    for line in lines {
+        let directory = line.directory.clone();
+        match load_job(args, line, &core_scheduler, &bake_queue) {
+            Ok(job) => {
+                if job.state == JobState::Skipped {
+                    progress.emit("skipped", Some(&job.directory), json!({}))?;
+                }
+                jobs.push(job);
+            }
+            Err(e) => {
+                warn!("failed to load {directory:?}: {e:?}");
+                let summary = failed_summary(&directory, &e);
+                progress.emit("failed", Some(&directory), summary.clone())?;
+                summaries.push(summary);
+            }
+        }
+    }
+    info!("loaded {} jobs", jobs.len());
+
+    while run.load(Ordering::Relaxed) {
+        admit_jobs(&mut jobs, args.memory_budget, &mut progress)?;
+
+        for job in &mut jobs {
+            if let Err(e) = update_job(job, &mut progress) {
+                job.state = JobState::Failed;
+                job.simulation = None;
+                let summary = failed_summary(&job.directory, &e);
+                progress.emit("failed", Some(&job.directory), summary.clone())?;
+                job.summary = Some(summary);
+            }
+        }
+
+        if jobs.iter().all(|job| {
+            matches!(
+                job.state,
+                JobState::Finished | JobState::Skipped | JobState::Failed
+            )
+        }) {
+            break;
+        }
+
+        sleep(Duration::from_millis(200));
+    }
+
+    summaries.extend(jobs.iter().filter_map(|job| job.summary.clone()));
+    progress.emit("summary", None, json!({ "jobs": summaries }))?;
+
+    Ok(summaries)
+}
+
+fn failed_summary(directory: &Path, error: &anyhow::Error) -> Value {
+    json!({
+        "directory": directory,
+        "status": "failed",
+        "error": format!("{error:#}"),
+    })
+}
+
+fn collect_job_lines(args: &BatchArgs) -> Result<Vec<JobLine>> {
+    let mut lines = Vec::new();
+    for pattern in &args.directories {
+        for directory in expand_pattern(pattern)? {
+            lines.push(JobLine {
+                directory,
+                ..Default::default()
+            });
+        }
+    }
+    if let Some(jobs) = &args.jobs {
+        for line in BufReader::new(File::open(jobs)?).lines() {
+            let line = line?;
+            if line.trim().is_empty() {
+                continue;
+            }
+            lines.push(serde_json::from_str(&line).with_context(|| format!("bad job: {line}"))?);
+        }
+    }
+    Ok(lines)
+}
+
+fn load_job(
+    args: &BakeArgs,
+    line: JobLine,
+    core_scheduler: &CoreScheduler,
+    bake_queue: &BakeQueue,
+) -> Result<Job> {
+    let simulation = SimulationImpl::load(
+        Uuid::new_v4().to_string(),
+        line.directory.clone(),
+        core_scheduler.clone(),
+        bake_queue.clone(),
+    )?;
+
+    // resume where the cache left off
+    let next_frame = simulation.available_frames_impl();
+    let number_of_frames = line.number_of_frames.unwrap_or(args.number_of_frames);
+
+    let settings = ComputeSettings {
+        time_step: line.time_step.unwrap_or(args.time_step),
+        gpu: None,
+        adaptive_time_steps: line.adaptive_time_steps.unwrap_or(args.adaptive_time_steps),
+        next_frame,
+        number_of_frames,
+        max_bytes_on_disk: line.max_bytes_on_disk.unwrap_or(args.max_bytes_on_disk),
+        threads: line.threads,
+        cores: line.cores,
+        priority: line.priority.unwrap_or(NonZero::new(1).unwrap()),
+        material_overrides: line.material_overrides,
+        particle_centric_scatter: line
+            .particle_centric_scatter
+            .unwrap_or(args.particle_centric_scatter),
+        multi_rate: line.multi_rate.unwrap_or(args.multi_rate),
+        trace: args.trace,
+    };
+
+    let done = next_frame >= number_of_frames;
+    Ok(Job {
+        memory_estimate: estimate_memory(&line.directory)?,
+        directory: line.directory.clone(),
+        settings,
+        simulation: (!done).then_some(simulation),
+        state: if done {
+            JobState::Skipped
+        } else {
+            JobState::Pending
+        },
+        started: None,
+        reported_frames: next_frame,
+        max_substeps: 0,
+        summary: done.then(|| json!({ "directory": line.directory, "status": "skipped" })),
+    })
+}
+
+// Queues pending jobs in order as long as the memory budget allows,
+// the bake queue takes care of the concurrency and the priorities.
+fn admit_jobs(jobs: &mut [Job], memory_budget: Option<u64>, progress: &mut Progress) -> Result<()> {
+    let mut in_flight: u64 = jobs
+        .iter()
+        .filter(|job| matches!(job.state, JobState::Queued | JobState::Running))
+        .map(|job| job.memory_estimate)
+        .sum();
+
+    for job in jobs.iter_mut().filter(|job| job.state == JobState::Pending) {
+        // one job is always allowed, even if it's too big
+        if memory_budget
+            .is_some_and(|budget| in_flight > 0 && in_flight + job.memory_estimate > budget)
+        {
+            break;
+        }
+        let Some(simulation) = job.simulation.as_mut() else {
+            continue;
+        };
+        simulation.start_compute_impl(serde_json::to_value(&job.settings)?)?;
+        in_flight += job.memory_estimate;
+        job.state = JobState::Queued;
+        progress.emit(
+            "queued",
+            Some(&job.directory),
+            json!({
+                "next_frame": job.settings.next_frame,
+                "number_of_frames": job.settings.number_of_frames,
+                "memory_estimate": job.memory_estimate,
+            }),
+        )?;
+    }
+    Ok(())
+}
+
+fn update_job(job: &mut Job, progress: &mut Progress) -> Result<()> {
+    if !matches!(job.state, JobState::Queued | JobState::Running) {
+        return Ok(());
+    }
+    let Some(simulation) = job.simulation.as_mut() else {
+        return Ok(());
+    };
+
+    simulation.poll_impl()?;
+
+    if job.state == JobState::Queued
+        && !matches!(simulation.bake_state_impl()?, BakeState::Queued { .. })
+    {
+        job.state = JobState::Running;
+        job.started = Some(Instant::now());
+        progress.emit("started", Some(&job.directory), json!({}))?;
+    }
+
+    let available_frames = simulation.available_frames_impl();
+    if available_frames != job.reported_frames {
+        job.reported_frames = available_frames;
+        // the substeps needed are the best hint for how close to unstable a bake runs
+        if let Some(substeps) = simulation.stats_impl()?["compute"]["last_frame_substeps"].as_u64()
+        {
+            job.max_substeps = job.max_substeps.max(substeps as usize);
+        }
+        progress.emit(
+            "progress",
+            Some(&job.directory),
+            json!({
+                "available_frames": available_frames,
+                "number_of_frames": job.settings.number_of_frames,
+            }),
+        )?;
+    }
+
+    if simulation.computing_impl() {
+        return Ok(());
+    }
+    // the thread might have stopped with an error since the poll above,
+    // polling again joins it so a failed bake isn't reported as finished
+    simulation.poll_impl()?;
+    let available_frames = simulation.available_frames_impl();
+
+    let seconds = job
+        .started
+        .map_or(0., |started| started.elapsed().as_secs_f32());
+    let computed_frames = available_frames.saturating_sub(job.settings.next_frame);
+    let compute_stats = simulation.stats_impl()?["compute"].clone();
+    let summary = json!({
+        "directory": job.directory,
+        "status": "finished",
+        "first_frame": job.settings.next_frame,
+        "computed_frames": computed_frames,
+        "seconds": seconds,
+        "seconds_per_frame": seconds / computed_frames.max(1) as f32,
+        "max_substeps": job.max_substeps,
+        "compute": compute_stats,
+    });
+    progress.emit("finished", Some(&job.directory), summary.clone())?;
+
+    job.summary = Some(summary);
+    job.state = JobState::Finished;
+    // releases the directory lock
+    job.simulation = None;
+    Ok(())
+}
+
+fn estimate_memory(directory: &Path) -> Result<u64> {
+    let mut largest_frame = 0;
+    let mut input = 0;
+    for entry in fs::read_dir(directory)? {
+        let entry = entry?;
+        let name = entry.file_name();
+        let Some(name) = name.to_str() else {
+            continue;
+        };
+        if name.starts_with("frame_") {
+            largest_frame = largest_frame.max(entry.metadata()?.len());
+        } else if name == "simulation_input.bin" {
+            input = entry.metadata()?.len();
+        }
+    }
+    // without any frame, the input is the best guess there is
+    let reference = if largest_frame > 0 {
+        largest_frame
+    } else {
+        input
+    };
+    Ok(reference * MEMORY_PER_FRAME_BYTE)
+}
+
+fn expand_pattern(pattern: &str) -> Result<Vec<PathBuf>> {
+    let path = Path::new(pattern);
+    let Some(name) = path.file_name().and_then(|name| name.to_str()) else {
+        return Ok(vec![path.to_path_buf()]);
+    };
+    if !name.contains(['*', '?']) {
+        return Ok(vec![path.to_path_buf()]);
+    }
+    let parent = path
+        .parent()
+        .filter(|parent| !parent.as_os_str().is_empty())
+        .unwrap_or(Path::new("."));
+    let name: Vec<char> = name.chars().collect();
+
+    let mut matches = Vec::new();
+    for entry in fs::read_dir(parent)? {
+        let entry = entry?;
+        let candidate: Vec<char> = entry.file_name().to_string_lossy().chars().collect();
+        if entry.path().is_dir() && wildcard_match(&name, &candidate) {
+            matches.push(entry.path());
+        }
+    }
+    matches.sort();
+    Ok(matches)
+}
+
+fn wildcard_match(pattern: &[char], text: &[char]) -> bool {
+    match pattern.split_first() {
+        None => text.is_empty(),
+        Some(('*', rest)) => (0..=text.len()).any(|skip| wildcard_match(rest, &text[skip..])),
+        Some(('?', rest)) => !text.is_empty() && wildcard_match(rest, &text[1..]),
+        Some((c, rest)) => text.first() == Some(c) && wildcard_match(rest, &text[1..]),
+    }
+}
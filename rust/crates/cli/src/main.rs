@@ -7,8 +7,12 @@
 // https://opensource.org/licenses/MIT.
 
 use anyhow::Result;
-use squishy_volumes_core::{ComputeSettings, SimulationImpl};
+use squishy_volumes_core::{
+    trace_layer, BakeQueue, ComputeSettings, CoreScheduler, SimulationImpl,
+};
 use std::{
+    io::stderr,
+    num::NonZero,
     path::PathBuf,
     sync::{
         atomic::{AtomicBool, Ordering},
@@ -18,13 +22,32 @@ use std::{
     time::Duration,
 };
 use tracing::subscriber::set_global_default;
-use tracing_subscriber::FmtSubscriber;
+use tracing_subscriber::{filter::LevelFilter, fmt, layer::SubscriberExt, Layer};
 use uuid::Uuid;
 
-use clap::Parser;
+use clap::{Args, Parser, Subcommand};
+
+mod batch;
+mod sweep;
 
 #[derive(Parser)]
 struct Cli {
+    #[command(subcommand)]
+    command: Command,
+}
+
+#[derive(Subcommand)]
+enum Command {
+    /// Bake a single cache directory.
+    Run(RunArgs),
+    /// Bake many cache directories sharing cores and memory.
+    Batch(batch::BatchArgs),
+    /// Bake variants of one captured input into sibling cache directories.
+    Sweep(sweep::SweepArgs),
+}
+
+#[derive(Args)]
+struct RunArgs {
     #[arg(long, value_name = "SIMULATION_DIRECTORY")]
     directory: PathBuf,
 
@@ -37,6 +60,18 @@ struct Cli {
     #[arg(long)]
     adaptive_time_steps: bool,
 
+    /// Scatter per block of particles instead of per grid node.
+    #[arg(long)]
+    particle_centric_scatter: bool,
+
+    /// Step groups of particles that stay apart independently, needs adaptive time steps.
+    #[arg(long)]
+    multi_rate: bool,
+
+    /// Record a timeline of the bake into trace.json in the cache directory.
+    #[arg(long)]
+    trace: bool,
+
     #[arg(long, value_name = "NUMBER_OF_FRAMES")]
     number_of_frames: usize,
 
@@ -45,21 +80,64 @@ struct Cli {
 
     #[arg(long, value_name = "NUMBER_OF_BYTES")]
     max_bytes_on_disk: u64,
+
+    #[arg(long, value_name = "NUMBER_OF_THREADS")]
+    threads: Option<NonZero<usize>>,
+
+    #[arg(long, value_name = "CORE_INDICES", value_delimiter = ',')]
+    cores: Option<Vec<usize>>,
 }
 
 fn main() -> Result<()> {
-    set_global_default(FmtSubscriber::default())?;
-    let Cli {
+    // stdout is reserved for the batch progress
+    set_global_default(
+        tracing_subscriber::registry()
+            .with(
+                fmt::layer()
+                    .with_writer(stderr)
+                    .with_filter(LevelFilter::INFO),
+            )
+            .with(trace_layer()),
+    )?;
+
+    let run = Arc::new(AtomicBool::new(true));
+    ctrlc::set_handler({
+        let run = run.clone();
+        move || {
+            run.store(false, Ordering::Relaxed);
+        }
+    })?;
+
+    match Cli::parse().command {
+        Command::Run(args) => run_single(args, run),
+        Command::Batch(args) => batch::run_batch(args, run),
+        Command::Sweep(args) => sweep::run_sweep(args, run),
+    }
+}
+
+fn run_single(
+    RunArgs {
         directory,
         time_step,
         gpu,
         adaptive_time_steps,
+        particle_centric_scatter,
+        multi_rate,
+        trace,
         next_frame,
         number_of_frames,
         max_bytes_on_disk,
-    } = Cli::parse();
-
-    let mut simulation = SimulationImpl::load(Uuid::new_v4().to_string(), directory)?;
+        threads,
+        cores,
+    }: RunArgs,
+    run: Arc<AtomicBool>,
+) -> Result<()> {
+    let mut simulation = SimulationImpl::load(
+        Uuid::new_v4().to_string(),
+        directory,
+        CoreScheduler::default(),
+        BakeQueue::default(),
+    )?;
 
     let next_frame = next_frame.unwrap_or(simulation.available_frames_impl());
 
@@ -78,18 +156,17 @@ fn main() -> Result<()> {
             next_frame,
             number_of_frames,
             max_bytes_on_disk,
+            threads,
+            cores,
+            priority: NonZero::new(1).unwrap(),
+            material_overrides: Default::default(),
+            particle_centric_scatter,
+            multi_rate,
+            trace,
         })
         .unwrap(),
     )?;
 
-    let run = Arc::new(AtomicBool::new(true));
-    ctrlc::set_handler({
-        let run = run.clone();
-        move || {
-            run.store(false, Ordering::Relaxed);
-        }
-    })?;
-
     while run.load(Ordering::Relaxed) && simulation.computing_impl() {
         sleep(Duration::from_millis(200));
     }
@@ -0,0 +1,156 @@
+// SPDX-License-Identifier: MIT
+//
+// Copyright 2025  Algebraic UG (haftungsbeschränkt)
+//
+// Use of this source code is governed by an MIT-style
+// license that can be found in the LICENSE_MIT file or at
+// https://opensource.org/licenses/MIT.
+
+use anyhow::{Context, Result};
+use clap::Args;
+use serde::Deserialize;
+use serde_json::Value;
+use squishy_volumes_core::{prepare_sweep_variant, MaterialOverrides};
+use std::{
+    fs::File,
+    io::{stderr, BufRead, BufReader, Write},
+    num::NonZero,
+    path::{Path, PathBuf},
+    sync::{atomic::AtomicBool, Arc},
+};
+use uuid::Uuid;
+
+use crate::batch::{run_jobs, BakeArgs, JobLine};
+
+#[derive(Args)]
+pub struct SweepArgs {
+    /// Cache directory with the captured input, its frames are left alone.
+    #[arg(long, value_name = "SIMULATION_DIRECTORY")]
+    source: PathBuf,
+
+    /// JSON lines, each with a `name` and optional overrides of the settings below,
+    /// a `grid_node_size` and `material_overrides`.
+    /// Every variant bakes into the sibling directory `<SOURCE>_<name>`.
+    #[arg(long, value_name = "VARIANTS_FILE")]
+    variants: PathBuf,
+
+    /// Where the summary table goes as CSV, stderr otherwise.
+    #[arg(long, value_name = "SUMMARY_FILE")]
+    summary: Option<PathBuf>,
+
+    #[command(flatten)]
+    bake: BakeArgs,
+}
+
+#[derive(Deserialize)]
+struct VariantLine {
+    name: String,
+    grid_node_size: Option<f32>,
+    time_step: Option<f32>,
+    adaptive_time_steps: Option<bool>,
+    particle_centric_scatter: Option<bool>,
+    multi_rate: Option<bool>,
+    number_of_frames: Option<usize>,
+    threads: Option<NonZero<usize>>,
+    cores: Option<Vec<usize>>,
+    priority: Option<NonZero<u32>>,
+    #[serde(default)]
+    material_overrides: MaterialOverrides,
+}
+
+pub fn run_sweep(args: SweepArgs, run: Arc<AtomicBool>) -> Result<()> {
+    let variants = read_variants(&args.variants)?;
+
+    let mut lines = Vec::new();
+    for variant in &variants {
+        let directory = variant_directory(&args.source, &variant.name)?;
+        prepare_sweep_variant(
+            Uuid::new_v4().to_string(),
+            &args.source,
+            &directory,
+            variant.grid_node_size,
+        )
+        .with_context(|| format!("failed to prepare variant {}", variant.name))?;
+        lines.push(JobLine {
+            directory,
+            time_step: variant.time_step,
+            adaptive_time_steps: variant.adaptive_time_steps,
+            particle_centric_scatter: variant.particle_centric_scatter,
+            multi_rate: variant.multi_rate,
+            number_of_frames: variant.number_of_frames,
+            max_bytes_on_disk: None,
+            threads: variant.threads,
+            cores: variant.cores.clone(),
+            priority: variant.priority,
+            material_overrides: variant.material_overrides.clone(),
+        });
+    }
+
+    let summaries = run_jobs(lines, &args.bake, run)?;
+
+    let mut out: Box<dyn Write> = match &args.summary {
+        Some(path) => Box::new(File::create(path)?),
+        None => Box::new(stderr()),
+    };
+    writeln!(
+        out,
+        "variant,status,computed_frames,seconds_per_frame,max_substeps,last_frame_substeps,error"
+    )?;
+    for variant in &variants {
+        let directory = variant_directory(&args.source, &variant.name)?;
+        let summary = summaries
+            .iter()
+            .find(|summary| summary["directory"] == serde_json::json!(directory))
+            .cloned()
+            .unwrap_or_else(|| serde_json::json!({ "status": "aborted" }));
+        writeln!(
+            out,
+            "{},{},{},{},{},{},{}",
+            csv_field(&variant.name),
+            csv_value(&summary["status"]),
+            csv_value(&summary["computed_frames"]),
+            csv_value(&summary["seconds_per_frame"]),
+            csv_value(&summary["max_substeps"]),
+            csv_value(&summary["compute"]["last_frame_substeps"]),
+            csv_value(&summary["error"]),
+        )?;
+    }
+    out.flush()?;
+
+    Ok(())
+}
+
+fn read_variants(path: &Path) -> Result<Vec<VariantLine>> {
+    let mut variants = Vec::new();
+    for line in BufReader::new(File::open(path)?).lines() {
+        let line = line?;
+        if line.trim().is_empty() {
+            continue;
+        }
+        variants.push(serde_json::from_str(&line).with_context(|| format!("bad variant: {line}"))?);
+    }
+    Ok(variants)
+}
+
+fn variant_directory(source: &Path, name: &str) -> Result<PathBuf> {
+    let source_name = source
+        .file_name()
+        .with_context(|| format!("source has no directory name: {source:?}"))?;
+    Ok(source.with_file_name(format!("{}_{name}", source_name.to_string_lossy())))
+}
+
+fn csv_value(value: &Value) -> String {
+    match value {
+        Value::Null => String::new(),
+        Value::String(s) => csv_field(s),
+        value => value.to_string(),
+    }
+}
+
+fn csv_field(s: &str) -> String {
+    if s.contains([',', '"', '\n']) {
+        format!("\"{}\"", s.replace('"', "\"\""))
+    } else {
+        s.to_string()
+    }
+}
@@ -12,7 +12,7 @@ impl squishy_volumes_api::Context for crate::ContextImpl {
     }
 
     fn new_simulation_input(
-        &mut self,
+        &self,
         uuid: String,
         directory: std::path::PathBuf,
         input_header: serde_json::Value,
@@ -21,38 +21,45 @@ impl squishy_volumes_api::Context for crate::ContextImpl {
         Ok(self.new_simulation_input_impl(uuid, directory, input_header, max_bytes_on_disk)?)
     }
 
-    fn get_simulation_input(&mut self) -> Option<&mut dyn squishy_volumes_api::SimulationInput> {
+    fn get_simulation_input(&self) -> Option<squishy_volumes_api::SharedSimulationInput> {
         self.get_simulation_input_impl()
     }
 
-    fn drop_simulation_input(&mut self) {
+    fn drop_simulation_input(&self) {
         self.drop_simulation_input_impl()
     }
 
-    fn new_simulation(&mut self) -> anyhow::Result<String> {
+    fn new_simulation(&self) -> anyhow::Result<String> {
         Ok(self.new_simulation_impl()?)
     }
 
-    fn load_simulation(
-        &mut self,
+    fn load_simulation(&self, uuid: String, directory: std::path::PathBuf) -> anyhow::Result<()> {
+        Ok(self.load_simulation_impl(uuid, directory)?)
+    }
+
+    fn fork_simulation(
+        &self,
+        source_uuid: &str,
         uuid: String,
         directory: std::path::PathBuf,
+        frame: usize,
     ) -> anyhow::Result<()> {
-        Ok(self.load_simulation_impl(uuid, directory)?)
+        Ok(self.fork_simulation_impl(source_uuid, uuid, directory, frame)?)
     }
 
-    fn get_simulation(&self, uuid: &str) -> Option<&dyn squishy_volumes_api::Simulation> {
+    fn get_simulation(&self, uuid: &str) -> Option<squishy_volumes_api::SharedSimulation> {
         self.get_simulation_impl(uuid)
     }
 
-    fn get_simulation_mut(
-        &mut self,
-        uuid: &str,
-    ) -> Option<&mut dyn squishy_volumes_api::Simulation> {
-        self.get_simulation_mut_impl(uuid)
+    fn drop_simulation(&self, uuid: &str) {
+        self.drop_simulation_impl(uuid)
     }
 
-    fn drop_simulation(&mut self, uuid: &str) {
-        self.drop_simulation_impl(uuid)
+    fn update_bake_queue(&self, settings: serde_json::Value) -> anyhow::Result<serde_json::Value> {
+        Ok(self.update_bake_queue_impl(settings)?)
+    }
+
+    fn move_in_bake_queue(&self, uuid: &str, offset: i64) -> anyhow::Result<()> {
+        Ok(self.move_in_bake_queue_impl(uuid, offset)?)
     }
 }
@@ -15,6 +15,10 @@ impl squishy_volumes_api::Simulation for crate::SimulationImpl {
         self.computing_impl()
     }
 
+    fn changes(&self) -> u64 {
+        self.changes_impl()
+    }
+
     fn poll(&mut self) -> anyhow::Result<serde_json::Value> {
         Ok(self.poll_impl()?)
     }
@@ -51,7 +55,7 @@ impl squishy_volumes_api::Simulation for crate::SimulationImpl {
         Ok(self.fetch_flat_attribute_i32_impl(frame, attribute)?)
     }
 
-    fn stats(&self) -> anyhow::Result<serde_json::Value> {
-        Ok(self.stats_impl()?)
+    fn stats(&self, frame: Option<usize>) -> anyhow::Result<serde_json::Value> {
+        Ok(self.stats_impl(frame)?)
     }
 }
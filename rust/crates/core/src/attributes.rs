@@ -6,9 +6,10 @@
 // license that can be found in the LICENSE_MIT file or at
 // https://opensource.org/licenses/MIT.
 
-use squishy_volumes_file_frame::IoState;
+use nalgebra::{Matrix4, Vector3, Vector4};
+use squishy_volumes_cache::CachedState;
 use squishy_volumes_file_input::{InputHeader, InputRanges, ObjectError};
-use std::iter::empty;
+use std::{iter::empty, ops::Range};
 use thiserror::Error;
 
 use serde::{Deserialize, Serialize};
@@ -32,10 +33,21 @@ pub enum Attribute {
     Object {
         name: String,
         attribute: AttributeParticles,
+        #[serde(default, skip_serializing_if = "Option::is_none")]
+        region: Option<Region>,
     },
     Grid(AttributeGrid),
 }
 
+/// Only particles that `to_unit_cube` maps into the cube from -1 to 1 are fetched,
+/// after the perspective divide and in ascending order.
+/// An inverted object matrix restricts to a cuboid, a camera projection to its frustum.
+#[derive(Serialize, Deserialize)]
+pub struct Region {
+    // rows, applied to scaled positions
+    pub to_unit_cube: [[f32; 4]; 4],
+}
+
 #[derive(Debug, Default, EnumIter, Serialize, Deserialize)]
 pub enum AttributeConst {
     #[default]
@@ -77,14 +89,98 @@ pub fn available_attributes(input_header: &InputHeader) -> impl Iterator<Item =
             AttributeParticles::iter().map(|attribute| Attribute::Object {
                 name: name.clone(),
                 attribute,
+                region: None,
             })
         }))
 }
 
+impl Region {
+    fn matrix(&self) -> Matrix4<f32> {
+        Matrix4::from_fn(|row, column| self.to_unit_cube[row][column])
+    }
+
+    fn contains(matrix: &Matrix4<f32>, position: Vector3<f32>) -> bool {
+        let projected = matrix * position.push(1.);
+        projected.w > 0. && projected.xyz().iter().all(|c| c.abs() <= projected.w)
+    }
+
+    // None if the region isn't bounded, e.g. with a degenerate matrix
+    fn bounding_box(matrix: &Matrix4<f32>) -> Option<(Vector3<f32>, Vector3<f32>)> {
+        let inverse = matrix.try_inverse()?;
+        let mut min = Vector3::repeat(f32::MAX);
+        let mut max = Vector3::repeat(f32::MIN);
+        for corner in 0..8 {
+            let corner = Vector4::new(
+                if corner & 1 == 0 { -1. } else { 1. },
+                if corner & 2 == 0 { -1. } else { 1. },
+                if corner & 4 == 0 { -1. } else { 1. },
+                1.,
+            );
+            let corner = inverse * corner;
+            if corner.w <= 0. {
+                return None;
+            }
+            let corner = corner.xyz() / corner.w;
+            min = min.inf(&corner);
+            max = max.sup(&corner);
+        }
+        min.iter()
+            .chain(max.iter())
+            .all(|c| c.is_finite())
+            .then_some((min, max))
+    }
+}
+
+// The particles of an object that are fetched.
+enum Selection {
+    All(Range<usize>),
+    // ascending, so every attribute of a region lines up
+    InRegion(Vec<usize>),
+}
+
+impl Selection {
+    fn map<T>(&self, f: impl FnMut(usize) -> T) -> Vec<T> {
+        match self {
+            Self::All(range) => range.clone().map(f).collect(),
+            Self::InRegion(particles) => particles.iter().copied().map(f).collect(),
+        }
+    }
+}
+
+fn select_particles(
+    input_ranges: &InputRanges,
+    frame: &CachedState,
+    name: &str,
+    region: &Option<Region>,
+    scale: f32,
+) -> Result<Selection, AttributeError> {
+    let particle_range = input_ranges.get_particle_range(name)?;
+    let Some(region) = region else {
+        return Ok(Selection::All(particle_range));
+    };
+
+    let matrix = region.matrix();
+    let positions = &frame.particles.positions;
+    let in_region = |&particle: &usize| {
+        particle_range.contains(&particle)
+            && Region::contains(&matrix, Vector3::from(positions[particle]) * scale)
+    };
+    let mut particles: Vec<usize> = match Region::bounding_box(&matrix) {
+        Some((min, max)) => frame
+            .particle_index()
+            .candidates((min / scale).into(), (max / scale).into())
+            .filter(in_region)
+            .collect(),
+        None => particle_range.clone().filter(in_region).collect(),
+    };
+    particles.sort_unstable();
+    Ok(Selection::InRegion(particles))
+}
+
 pub fn fetch_flat_attribute_f32(
     input_header: &InputHeader,
     input_ranges: &InputRanges,
-    io_state: &IoState,
+    frame: &CachedState,
     attribute: &Attribute,
 ) -> Result<Vec<f32>, AttributeError> {
     let scale = input_header.consts.simulation_scale;
@@ -97,78 +193,69 @@ pub fn fetch_flat_attribute_f32(
             AttributeConst::DomainMax => input_header.consts.domain_max.to_vec(),
             _ => Err(AttributeError::NotFloatAttribute(format!("{attribute:?}")))?,
         },
-        Attribute::Object { name, attribute } => {
-            let particle_range = input_ranges.get_particle_range(name)?;
+        Attribute::Object {
+            name,
+            attribute,
+            region,
+        } => {
+            let selection = select_particles(input_ranges, frame, name, region, scale)?;
+            let particles = &frame.particles;
 
             match attribute {
-                AttributeParticles::Masses => io_state.particles.parameters.as_slice()
-                    [particle_range]
-                    .iter()
-                    .map(|parameters| parameters.mass)
-                    .collect(),
-                AttributeParticles::InitialVolumes => io_state.particles.parameters.as_slice()
-                    [particle_range]
-                    .iter()
-                    .map(|parameters| parameters.initial_volume * scale.powi(3))
-                    .collect(),
-                AttributeParticles::Positions => bytemuck::cast_slice::<_, f32>(
-                    &io_state.particles.positions.as_slice()[particle_range],
-                )
-                .iter()
-                .map(|&p| p * scale)
-                .collect(),
-                AttributeParticles::InitialPositions => bytemuck::cast_slice(
-                    &io_state.particles.initial_positions.as_slice()[particle_range],
-                )
-                .to_vec(),
-                AttributeParticles::Velocities => {
-                    bytemuck::cast_slice(&io_state.particles.velocities.as_slice()[particle_range])
-                        .to_vec()
+                AttributeParticles::Masses => {
+                    selection.map(|particle| particles.parameters[particle].mass)
                 }
-                AttributeParticles::PositionGradients => bytemuck::cast_slice(
-                    &io_state.particles.position_gradients.as_slice()[particle_range],
-                )
-                .to_vec(),
+                AttributeParticles::InitialVolumes => selection
+                    .map(|particle| particles.parameters[particle].initial_volume * scale.powi(3)),
+                AttributeParticles::Positions => selection
+                    .map(|particle| particles.positions[particle].map(|p| p * scale))
+                    .into_flattened(),
+                AttributeParticles::InitialPositions => selection
+                    .map(|particle| particles.initial_positions[particle])
+                    .into_flattened(),
+                AttributeParticles::Velocities => selection
+                    .map(|particle| particles.velocities[particle])
+                    .into_flattened(),
+                AttributeParticles::PositionGradients => selection
+                    .map(|particle| particles.position_gradients[particle])
+                    .into_flattened()
+                    .into_flattened(),
                 AttributeParticles::ElasticEnergies => {
-                    io_state.particles.elastic_energies.as_slice()[particle_range].to_vec()
+                    selection.map(|particle| particles.elastic_energies[particle])
                 }
-                AttributeParticles::Sizes => io_state.particles.parameters.as_slice()
-                    [particle_range]
-                    .iter()
-                    .map(|parameters| parameters.initial_volume.powf(1. / 3.) * scale)
-                    .collect(),
-                AttributeParticles::Transformations => io_state.particles.positions.as_slice()
-                    [particle_range.clone()]
-                .iter()
-                .zip(io_state.particles.position_gradients.as_slice()[particle_range].iter())
-                .flat_map(|(position, position_gradient)| {
-                    let [[m00, m01, m02], [m10, m11, m12], [m20, m21, m22]] = *position_gradient;
-                    let [m30, m31, m32] = *position;
-                    [
-                        m00,
-                        m01,
-                        m02,
-                        0.,
-                        m10,
-                        m11,
-                        m12,
-                        0.,
-                        m20,
-                        m21,
-                        m22,
-                        0.,
-                        scale * m30,
-                        scale * m31,
-                        scale * m32,
-                        1.,
-                    ]
-                })
-                .collect(),
+                AttributeParticles::Sizes => selection.map(|particle| {
+                    particles.parameters[particle].initial_volume.powf(1. / 3.) * scale
+                }),
+                AttributeParticles::Transformations => selection
+                    .map(|particle| {
+                        let [[m00, m01, m02], [m10, m11, m12], [m20, m21, m22]] =
+                            particles.position_gradients[particle];
+                        let [m30, m31, m32] = particles.positions[particle];
+                        [
+                            m00,
+                            m01,
+                            m02,
+                            0.,
+                            m10,
+                            m11,
+                            m12,
+                            0.,
+                            m20,
+                            m21,
+                            m22,
+                            0.,
+                            scale * m30,
+                            scale * m31,
+                            scale * m32,
+                            1.,
+                        ]
+                    })
+                    .into_flattened(),
                 _ => Err(AttributeError::NotFloatAttribute(format!("{attribute:?}")))?,
             }
         }
         Attribute::Grid(attribute) => {
-            let grid_nodes = io_state
+            let grid_nodes = frame
                 .grid_nodes
                 .as_ref()
                 .ok_or(AttributeError::NoGridStored)?;
@@ -193,7 +280,7 @@ pub fn fetch_flat_attribute_f32(
 pub fn fetch_flat_attribute_i32(
     input_header: &InputHeader,
     input_ranges: &InputRanges,
-    io_state: &IoState,
+    frame: &CachedState,
     attribute: &Attribute,
 ) -> Result<Vec<i32>, AttributeError> {
     Ok(match attribute {
@@ -201,23 +288,27 @@ pub fn fetch_flat_attribute_i32(
             AttributeConst::FramesPerSecond => vec![input_header.consts.frames_per_second as i32],
             _ => Err(AttributeError::NotIntAttribute(format!("{attribute:?}")))?,
         },
-        Attribute::Object { name, attribute } => {
-            let particle_range = input_ranges.get_particle_range(name)?;
+        Attribute::Object {
+            name,
+            attribute,
+            region,
+        } => {
+            let scale = input_header.consts.simulation_scale;
+            let selection = select_particles(input_ranges, frame, name, region, scale)?;
+            let particles = &frame.particles;
 
             match attribute {
                 AttributeParticles::Flags => {
-                    bytemuck::cast_slice(&io_state.particles.flags.as_slice()[particle_range])
-                        .to_vec()
+                    selection.map(|particle| bytemuck::cast(particles.flags[particle]))
+                }
+                AttributeParticles::ColliderBits => {
+                    selection.map(|particle| particles.collider_bits[particle] as i32)
                 }
-                AttributeParticles::ColliderBits => bytemuck::cast_slice(
-                    &io_state.particles.collider_bits.as_slice()[particle_range],
-                )
-                .to_vec(),
                 _ => Err(AttributeError::NotIntAttribute(format!("{attribute:?}")))?,
             }
         }
         Attribute::Grid(attribute) => {
-            let grid_nodes = io_state
+            let grid_nodes = frame
                 .grid_nodes
                 .as_ref()
                 .ok_or(AttributeError::NoGridStored)?;
@@ -0,0 +1,200 @@
+// SPDX-License-Identifier: MIT
+//
+// Copyright 2025  Algebraic UG (haftungsbeschränkt)
+//
+// Use of this source code is governed by an MIT-style
+// license that can be found in the LICENSE_MIT file or at
+// https://opensource.org/licenses/MIT.
+
+use std::{
+    collections::BTreeMap,
+    num::NonZero,
+    sync::{Arc, Mutex},
+};
+
+use serde::{Deserialize, Serialize};
+use tracing::warn;
+
+use crate::Error;
+
+#[derive(Clone, Copy, Debug, Default, PartialEq, Eq, Serialize, Deserialize)]
+pub enum BakeQueueOrder {
+    /// First come, first served.
+    #[default]
+    Fifo,
+    /// Higher priority first, first come, first served otherwise.
+    Priority,
+}
+
+#[derive(Clone, Debug, Serialize, Deserialize)]
+pub struct BakeQueueSettings {
+    pub order: BakeQueueOrder,
+    pub max_concurrent: NonZero<usize>,
+}
+
+impl Default for BakeQueueSettings {
+    fn default() -> Self {
+        Self {
+            order: Default::default(),
+            max_concurrent: NonZero::new(1).unwrap(),
+        }
+    }
+}
+
+#[derive(Clone, Debug, PartialEq, Eq, Serialize, Deserialize)]
+#[serde(tag = "state")]
+pub enum BakeState {
+    Idle,
+    Queued { position: usize },
+    Running,
+}
+
+#[derive(Clone, Debug, Serialize, Deserialize)]
+pub struct BakeQueueEntry {
+    pub uuid: String,
+    pub priority: NonZero<u32>,
+    pub running: bool,
+}
+
+#[derive(Default)]
+struct BakeQueueState {
+    settings: BakeQueueSettings,
+    queued: Vec<(String, NonZero<u32>)>,
+    running: BTreeMap<String, NonZero<u32>>,
+}
+
+/// Decides which of the simulations that want to compute may do so.
+#[derive(Clone, Default)]
+pub struct BakeQueue {
+    state: Arc<Mutex<BakeQueueState>>,
+}
+
+/// Occupies one of the concurrent slots until dropped.
+pub struct BakeSlot {
+    queue: BakeQueue,
+    uuid: String,
+}
+
+impl BakeQueueState {
+    fn insert(&mut self, uuid: String, priority: NonZero<u32>) {
+        let index = match self.settings.order {
+            BakeQueueOrder::Fifo => self.queued.len(),
+            BakeQueueOrder::Priority => self
+                .queued
+                .iter()
+                .position(|(_, other)| *other < priority)
+                .unwrap_or(self.queued.len()),
+        };
+        self.queued.insert(index, (uuid, priority));
+    }
+
+    fn position(&self, uuid: &str) -> Option<usize> {
+        self.queued.iter().position(|(other, _)| other == uuid)
+    }
+}
+
+impl BakeQueue {
+    fn lock(&self) -> Result<std::sync::MutexGuard<'_, BakeQueueState>, Error> {
+        self.state.lock().map_err(|_| Error::BakeQueueMutexPoisoned)
+    }
+
+    pub fn configure(&self, settings: BakeQueueSettings) -> Result<(), Error> {
+        let mut state = self.lock()?;
+        let reorder = settings.order != state.settings.order;
+        state.settings = settings;
+        if reorder {
+            for (uuid, priority) in std::mem::take(&mut state.queued) {
+                state.insert(uuid, priority);
+            }
+        }
+        Ok(())
+    }
+
+    pub fn enqueue(&self, uuid: String, priority: NonZero<u32>) -> Result<(), Error> {
+        let mut state = self.lock()?;
+        if let Some(position) = state.position(&uuid) {
+            warn!(uuid, "already queued");
+            state.queued.remove(position);
+        }
+        state.insert(uuid, priority);
+        Ok(())
+    }
+
+    pub fn dequeue(&self, uuid: &str) -> Result<(), Error> {
+        let mut state = self.lock()?;
+        if let Some(position) = state.position(uuid) {
+            state.queued.remove(position);
+        }
+        Ok(())
+    }
+
+    /// Moves a queued entry by `offset` places, negative is towards the front.
+    pub fn move_entry(&self, uuid: &str, offset: i64) -> Result<(), Error> {
+        let mut state = self.lock()?;
+        let Some(position) = state.position(uuid) else {
+            return Err(Error::NotQueued(uuid.to_string()));
+        };
+        let entry = state.queued.remove(position);
+        let target = (position as i64 + offset).clamp(0, state.queued.len() as i64) as usize;
+        state.queued.insert(target, entry);
+        Ok(())
+    }
+
+    /// Hands out a slot if the entry is far enough at the front.
+    pub fn try_start(&self, uuid: &str) -> Result<Option<BakeSlot>, Error> {
+        let mut state = self.lock()?;
+        let Some(position) = state.position(uuid) else {
+            return Ok(None);
+        };
+        let free = state
+            .settings
+            .max_concurrent
+            .get()
+            .saturating_sub(state.running.len());
+        if position >= free {
+            return Ok(None);
+        }
+        let (uuid, priority) = state.queued.remove(position);
+        state.running.insert(uuid.clone(), priority);
+        Ok(Some(BakeSlot {
+            queue: self.clone(),
+            uuid,
+        }))
+    }
+
+    pub fn position(&self, uuid: &str) -> Result<Option<usize>, Error> {
+        Ok(self.lock()?.position(uuid))
+    }
+
+    /// Running entries first, then the queued ones in order.
+    pub fn entries(&self) -> Result<Vec<BakeQueueEntry>, Error> {
+        let state = self.lock()?;
+        Ok(state
+            .running
+            .iter()
+            .map(|(uuid, priority)| (uuid, priority, true))
+            .chain(
+                state
+                    .queued
+                    .iter()
+                    .map(|(uuid, priority)| (uuid, priority, false)),
+            )
+            .map(|(uuid, priority, running)| BakeQueueEntry {
+                uuid: uuid.clone(),
+                priority: *priority,
+                running,
+            })
+            .collect())
+    }
+}
+
+impl Drop for BakeSlot {
+    fn drop(&mut self) {
+        match self.queue.lock() {
+            Ok(mut state) => {
+                state.running.remove(&self.uuid);
+            }
+            Err(e) => tracing::error!("{e}"),
+        }
+    }
+}
@@ -15,18 +15,19 @@ use std::{
 };
 
 use squishy_volumes_cache::Cache;
-use squishy_volumes_cpu::{CpuRunParameters, CpuState};
+use squishy_volumes_cpu::{CpuRunParameters, CpuState, FrameStats, MultiRateState};
 use squishy_volumes_file_input::InputReader;
 use squishy_volumes_gpu::{GpuRunParameters, GpuState};
 use squishy_volumes_util::panic_payload_to_string;
 use squishy_volumes_xpu::{FrameInput, Harness, ReportInfo};
-use tracing::info;
+use tracing::{debug_span, info};
 
 #[cfg(feature = "profile")]
 use squishy_volumes_util::coarse_prof;
 
 use crate::{
-    Error, initialization::initialize_io_state, simulation_input_path, stats::ComputeStats,
+    BakeSlot, CoreClaim, Error, MaterialOverrides, initialization::initialize_io_state,
+    simulation_input_path, start_trace, stats::ComputeStats,
 };
 
 pub struct ComputeThread {
@@ -46,6 +47,13 @@ pub struct ComputeThreadSettings {
 
     pub gpu: Option<String>,
     pub adaptive_time_steps: bool,
+    pub particle_centric_scatter: bool,
+    pub multi_rate: bool,
+    pub trace: bool,
+    pub material_overrides: MaterialOverrides,
+
+    pub core_claim: CoreClaim,
+    pub bake_slot: BakeSlot,
 }
 
 impl ComputeThread {
@@ -56,7 +64,13 @@ impl ComputeThread {
             number_of_frames,
             mut next_frame,
             adaptive_time_steps,
+            particle_centric_scatter,
+            multi_rate,
+            trace,
             gpu,
+            material_overrides,
+            core_claim,
+            bake_slot,
         }: ComputeThreadSettings,
     ) -> Result<Self, Error> {
         info!("starting compute thread");
@@ -76,10 +90,23 @@ impl ComputeThread {
             let stats = stats.clone();
             let harness = harness.clone();
             Some(spawn(move || -> Result<(), Error> {
+                // frees the slot for the next queued simulation when done
+                let _bake_slot = bake_slot;
+                let _trace_guard = trace
+                    .then(|| start_trace(&cache.directory().join("trace.json")))
+                    .transpose()
+                    .map_err(Error::StartTrace)?;
+
                 info!("compute thread started");
+                let mut allotment = core_claim.allotment()?;
+                let mut pool = allotment.build_pool()?;
+                info!(?allotment, "compute pool built");
+
                 let io_state = if next_frame == 0 {
                     info!("creating initial state");
-                    let io_state = initialize_io_state(&harness, &mut input_reader)?;
+                    let io_state = pool.install(|| {
+                        initialize_io_state(&harness, &mut input_reader, &material_overrides)
+                    })?;
                     cache
                         .store_frame(io_state.clone())
                         .map_err(Error::StoreError)?;
@@ -95,11 +122,13 @@ impl ComputeThread {
                 };
                 harness.check()?;
 
-                let mut frame_input = FrameInput::new(input_reader, next_frame - 1)?;
+                let mut frame_input =
+                    pool.install(|| FrameInput::new(input_reader, next_frame - 1))?;
 
                 #[allow(clippy::large_enum_variant)]
                 enum ComputeState {
                     Cpu(CpuState),
+                    MultiRate(MultiRateState),
                     Gpu(GpuState),
                 }
 
@@ -112,6 +141,10 @@ impl ComputeThread {
                         io_state,
                         Some(cache.directory().join("gpu_profile.csv")),
                     )?)
+                } else if multi_rate && adaptive_time_steps {
+                    ComputeState::MultiRate(
+                        pool.install(|| MultiRateState::from_io_state(io_state, &frame_input))?,
+                    )
                 } else {
                     ComputeState::Cpu(CpuState::from_io_state(io_state)?)
                 };
@@ -127,25 +160,57 @@ impl ComputeThread {
                     harness.check()?;
 
                     let start_compute_frame = Instant::now();
+                    let _frame_span = debug_span!("compute_frame", frame = next_frame).entered();
+
+                    // other simulations might have started or stopped
+                    let current_allotment = core_claim.allotment()?;
+                    if current_allotment != allotment {
+                        allotment = current_allotment;
+                        pool = allotment.build_pool()?;
+                        info!(?allotment, "compute pool rebuilt");
+                    }
 
-                    frame_input.load(next_frame - 1)?;
+                    pool.install(|| frame_input.load(next_frame - 1))?;
 
                     let target_time = next_frame as f64 / consts.frames_per_second as f64;
 
                     let result: Result<(), Error>;
+                    let mut frame_stats = FrameStats::default();
                     let io_state = match &mut compute_state {
                         ComputeState::Cpu(cpu_state) => {
-                            let (io_state, cpu_result) = cpu_state.produce_next_state(
-                                &harness,
-                                &frame_input,
-                                CpuRunParameters {
-                                    target_time,
-                                    max_time_step,
-                                    adaptive_time_steps,
-                                    store_grid: true,
-                                },
-                            )?;
+                            let (io_state, cpu_result) = pool.install(|| {
+                                cpu_state.produce_next_state(
+                                    &harness,
+                                    &frame_input,
+                                    CpuRunParameters {
+                                        target_time,
+                                        max_time_step,
+                                        adaptive_time_steps,
+                                        particle_centric_scatter,
+                                        store_grid: true,
+                                    },
+                                )
+                            })?;
+                            result = cpu_result.map_err(Error::CpuCompute);
+                            frame_stats = cpu_state.frame_stats().clone();
+                            io_state
+                        }
+                        ComputeState::MultiRate(multi_rate_state) => {
+                            let (io_state, cpu_result) = pool.install(|| {
+                                multi_rate_state.produce_next_state(
+                                    &harness,
+                                    &frame_input,
+                                    CpuRunParameters {
+                                        target_time,
+                                        max_time_step,
+                                        adaptive_time_steps,
+                                        particle_centric_scatter,
+                                        store_grid: true,
+                                    },
+                                )
+                            })?;
                             result = cpu_result.map_err(Error::CpuCompute);
+                            frame_stats = multi_rate_state.frame_stats().clone();
                             io_state
                         }
                         ComputeState::Gpu(gpu_state) => {
@@ -158,12 +223,15 @@ impl ComputeThread {
                                 },
                             )?;
                             result = gpu_result.map_err(Error::GpuError);
+                            frame_stats.substeps = gpu_state.last_frame_substeps();
                             io_state
                         }
                     };
 
                     // store state even if error occured
-                    cache.store_frame(io_state).map_err(Error::StoreError)?;
+                    debug_span!("store_frame", frame = next_frame)
+                        .in_scope(|| cache.store_frame(io_state))
+                        .map_err(Error::StoreError)?;
 
                     // now check for errors
                     result?;
@@ -184,11 +252,11 @@ impl ComputeThread {
                         frame_times.iter().sum::<f32>() / frame_times.len() as f32;
                     let remaining_time_sec = approx_frame_time * remaining_frames as f32;
 
-                    *stats.lock().unwrap() = Some(ComputeStats {
+                    *stats.lock().unwrap() = Some(ComputeStats::new(
                         remaining_time_sec,
                         last_frame_time_sec,
-                        last_frame_substeps: 0, // TODO
-                    });
+                        &frame_stats,
+                    ));
                 }
 
                 #[cfg(feature = "profile")]
@@ -218,6 +286,10 @@ impl ComputeThread {
             .is_some_and(|thread| !thread.is_finished())
     }
 
+    pub fn changes(&self) -> u64 {
+        self.harness.changes()
+    }
+
     pub fn poll(&mut self) -> Result<Vec<ReportInfo>, Error> {
         let Some(thread) = self.thread.take() else {
             return Ok(Default::default());
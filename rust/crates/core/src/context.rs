@@ -6,23 +6,33 @@
 // license that can be found in the LICENSE_MIT file or at
 // https://opensource.org/licenses/MIT.
 
-use std::{collections::BTreeMap, path::PathBuf};
-
-use serde_json::{Value, from_value};
-use squishy_volumes_api::{Simulation, SimulationInput};
+use std::{
+    collections::BTreeMap,
+    path::PathBuf,
+    sync::{Arc, Mutex, MutexGuard, PoisonError, RwLock, RwLockReadGuard, RwLockWriteGuard},
+};
+
+use serde_json::{Value, from_value, to_value};
+use squishy_volumes_api::{SharedSimulation, SharedSimulationInput};
 use tracing::{info, subscriber::set_global_default, warn};
-use tracing_subscriber::FmtSubscriber;
+use tracing_subscriber::{Layer as _, filter::LevelFilter, fmt, layer::SubscriberExt as _};
 
-use super::{Error, SimulationImpl, SimulationInputImpl};
+use super::{BakeQueue, CoreScheduler, Error, SimulationImpl, SimulationInputImpl, trace_layer};
 
+// Each simulation has its own lock, the maps are only locked to look them up or change them.
 pub struct ContextImpl {
-    simulation_input: Option<SimulationInputImpl>,
-    simulations: BTreeMap<String, SimulationImpl>,
+    simulation_input: Mutex<Option<Arc<Mutex<SimulationInputImpl>>>>,
+    simulations: RwLock<BTreeMap<String, Arc<RwLock<SimulationImpl>>>>,
+    core_scheduler: CoreScheduler,
+    bake_queue: BakeQueue,
 }
 
 impl Default for ContextImpl {
     fn default() -> Self {
-        if let Err(e) = set_global_default(FmtSubscriber::default()) {
+        let subscriber = tracing_subscriber::registry()
+            .with(fmt::layer().with_filter(LevelFilter::INFO))
+            .with(trace_layer());
+        if let Err(e) = set_global_default(subscriber) {
             eprintln!("{e:?}");
         } else {
             info!("initialized");
@@ -30,13 +40,46 @@ impl Default for ContextImpl {
         Self {
             simulation_input: Default::default(),
             simulations: Default::default(),
+            core_scheduler: Default::default(),
+            bake_queue: Default::default(),
         }
     }
 }
 
 impl ContextImpl {
+    // Nothing panics while these are locked, so a poisoned lock is still consistent.
+    fn simulation_input(&self) -> MutexGuard<'_, Option<Arc<Mutex<SimulationInputImpl>>>> {
+        self.simulation_input
+            .lock()
+            .unwrap_or_else(PoisonError::into_inner)
+    }
+
+    fn simulations(&self) -> RwLockReadGuard<'_, BTreeMap<String, Arc<RwLock<SimulationImpl>>>> {
+        self.simulations
+            .read()
+            .unwrap_or_else(PoisonError::into_inner)
+    }
+
+    fn simulations_mut(
+        &self,
+    ) -> RwLockWriteGuard<'_, BTreeMap<String, Arc<RwLock<SimulationImpl>>>> {
+        self.simulations
+            .write()
+            .unwrap_or_else(PoisonError::into_inner)
+    }
+
+    fn insert_simulation(&self, uuid: String, simulation: SimulationImpl) {
+        if self
+            .simulations_mut()
+            .insert(uuid, Arc::new(RwLock::new(simulation)))
+            .is_some()
+        {
+            warn!("Overwriting old simulation");
+        }
+    }
+
     pub fn new_simulation_input_impl(
-        &mut self,
+        &self,
         uuid: String,
         directory: PathBuf,
         input_header: Value,
@@ -44,72 +87,120 @@ impl ContextImpl {
     ) -> Result<(), Error> {
         let input_header = from_value(input_header).map_err(Error::ParsingInputHeader)?;
 
-        if self.simulation_input.is_some() {
+        let simulation_input =
+            SimulationInputImpl::new(uuid, directory, input_header, max_bytes_on_disk)?;
+        if self
+            .simulation_input()
+            .replace(Arc::new(Mutex::new(simulation_input)))
+            .is_some()
+        {
             warn!("Overwriting old input.");
         }
 
-        self.simulation_input = Some(SimulationInputImpl::new(
-            uuid,
-            directory,
-            input_header,
-            max_bytes_on_disk,
-        )?);
-
         Ok(())
     }
 
-    pub fn get_simulation_input_impl(&mut self) -> Option<&mut dyn SimulationInput> {
-        self.simulation_input
-            .as_mut()
-            .map(|r| r as &mut dyn SimulationInput)
+    pub fn get_simulation_input_impl(&self) -> Option<SharedSimulationInput> {
+        self.simulation_input()
+            .clone()
+            .map(|r| r as SharedSimulationInput)
     }
 
-    pub fn drop_simulation_input_impl(&mut self) {
-        let Some(simulation_input) = self.simulation_input.take() else {
+    pub fn drop_simulation_input_impl(&self) {
+        let Some(simulation_input) = self.simulation_input().take() else {
             warn!("No simulation input");
             return;
         };
-        simulation_input.clean_up();
+        match Arc::into_inner(simulation_input) {
+            Some(simulation_input) => simulation_input
+                .into_inner()
+                .unwrap_or_else(PoisonError::into_inner)
+                .clean_up(),
+            None => warn!("Simulation input still in use, not cleaning up"),
+        }
     }
 
-    pub fn new_simulation_impl(&mut self) -> Result<String, Error> {
-        let Some(simulation_input) = self.simulation_input.take() else {
+    pub fn new_simulation_impl(&self) -> Result<String, Error> {
+        let Some(simulation_input) = self.simulation_input().take() else {
             return Err(Error::MissingInput)?;
         };
+        let simulation_input = Arc::into_inner(simulation_input)
+            .ok_or(Error::InputInUse)?
+            .into_inner()
+            .unwrap_or_else(PoisonError::into_inner);
 
         let uuid = simulation_input.directory_lock.uuid().to_string();
-        let simulation = SimulationImpl::new(simulation_input)?;
-
-        if self.simulations.insert(uuid.clone(), simulation).is_some() {
-            warn!("Overwriting old simulation");
-        }
+        let simulation = SimulationImpl::new(
+            simulation_input,
+            self.core_scheduler.clone(),
+            self.bake_queue.clone(),
+        )?;
+        self.insert_simulation(uuid.clone(), simulation);
 
         Ok(uuid)
     }
 
-    pub fn load_simulation_impl(&mut self, uuid: String, directory: PathBuf) -> Result<(), Error> {
-        let simulation = SimulationImpl::load(uuid.clone(), directory)?;
-
-        if self.simulations.insert(uuid, simulation).is_some() {
-            warn!("Overwriting old simulation");
-        }
+    pub fn load_simulation_impl(&self, uuid: String, directory: PathBuf) -> Result<(), Error> {
+        let simulation = SimulationImpl::load(
+            uuid.clone(),
+            directory,
+            self.core_scheduler.clone(),
+            self.bake_queue.clone(),
+        )?;
+        self.insert_simulation(uuid, simulation);
 
         Ok(())
     }
 
-    pub fn get_simulation_impl(&self, uuid: &str) -> Option<&dyn Simulation> {
-        self.simulations.get(uuid).map(|r| r as &dyn Simulation)
+    pub fn fork_simulation_impl(
+        &self,
+        source_uuid: &str,
+        uuid: String,
+        directory: PathBuf,
+        frame: usize,
+    ) -> Result<(), Error> {
+        let source = self
+            .simulations()
+            .get(source_uuid)
+            .cloned()
+            .ok_or_else(|| Error::SimulationMissing(source_uuid.to_string()))?;
+        let simulation = source
+            .read()
+            .map_err(|_| Error::SimulationLockPoisoned(source_uuid.to_string()))?
+            .fork_impl(uuid.clone(), directory, frame)?;
+        self.insert_simulation(uuid, simulation);
+
+        Ok(())
     }
 
-    pub fn get_simulation_mut_impl(&mut self, uuid: &str) -> Option<&mut dyn Simulation> {
-        self.simulations
-            .get_mut(uuid)
-            .map(|r| r as &mut dyn Simulation)
+    pub fn get_simulation_impl(&self, uuid: &str) -> Option<SharedSimulation> {
+        self.simulations()
+            .get(uuid)
+            .cloned()
+            .map(|r| r as SharedSimulation)
     }
 
-    pub fn drop_simulation_impl(&mut self, uuid: &str) {
-        if self.simulations.remove(uuid).is_none() {
+    pub fn drop_simulation_impl(&self, uuid: &str) {
+        // the simulation itself is dropped once the last call using it returns
+        if self.simulations_mut().remove(uuid).is_none() {
             warn!("No simulation with {uuid}")
         }
     }
+
+    /// Applies the settings, starts whatever fits and reports the queue.
+    pub fn update_bake_queue_impl(&self, settings: Value) -> Result<Value, Error> {
+        self.bake_queue
+            .configure(from_value(settings).map_err(Error::ParsingBakeQueueSettings)?)?;
+        let simulations: Vec<_> = self.simulations().values().cloned().collect();
+        for simulation in simulations {
+            if let Ok(mut simulation) = simulation.write() {
+                simulation.start_queued_deferred_impl();
+            }
+        }
+        to_value(self.bake_queue.entries()?).map_err(Error::EncodingBakeQueue)
+    }
+
+    pub fn move_in_bake_queue_impl(&self, uuid: &str, offset: i64) -> Result<(), Error> {
+        self.bake_queue.move_entry(uuid, offset)
+    }
 }
@@ -0,0 +1,190 @@
+// SPDX-License-Identifier: MIT
+//
+// Copyright 2025  Algebraic UG (haftungsbeschränkt)
+//
+// Use of this source code is governed by an MIT-style
+// license that can be found in the LICENSE_MIT file or at
+// https://opensource.org/licenses/MIT.
+
+use std::{
+    collections::{BTreeMap, BTreeSet},
+    num::NonZero,
+    sync::{Arc, Mutex},
+    thread::available_parallelism,
+};
+
+use rayon::{ThreadPool, ThreadPoolBuilder};
+use tracing::warn;
+
+use crate::Error;
+
+/// What a computing simulation asks for.
+#[derive(Clone, Debug)]
+pub struct CoreRequest {
+    /// Upper limit for the number of threads, `None` means no limit.
+    pub threads: Option<NonZero<usize>>,
+    /// Cores the threads are pinned to, `None` means unpinned.
+    pub cores: Option<Vec<usize>>,
+    /// Relative weight when sharing the unpinned cores.
+    pub priority: NonZero<u32>,
+}
+
+/// What a computing simulation currently gets.
+#[derive(Clone, Debug, PartialEq, Eq)]
+pub struct CoreAllotment {
+    pub threads: NonZero<usize>,
+    pub cores: Option<Vec<usize>>,
+}
+
+/// Splits the cores between concurrently computing simulations.
+///
+/// Simulations with an explicit core set keep it,
+/// all others share the remaining cores proportionally to their priority.
+#[derive(Clone, Default)]
+pub struct CoreScheduler {
+    budget: Option<NonZero<usize>>,
+    requests: Arc<Mutex<BTreeMap<String, CoreRequest>>>,
+}
+
+/// Keeps the request registered until dropped.
+pub struct CoreClaim {
+    scheduler: CoreScheduler,
+    uuid: String,
+}
+
+impl CoreScheduler {
+    /// Shares at most `budget` cores instead of all available ones.
+    pub fn with_budget(budget: NonZero<usize>) -> Self {
+        Self {
+            budget: Some(budget),
+            ..Default::default()
+        }
+    }
+
+    pub fn claim(&self, uuid: String, request: CoreRequest) -> Result<CoreClaim, Error> {
+        if self
+            .requests
+            .lock()
+            .map_err(|_| Error::CoreSchedulerMutexPoisoned)?
+            .insert(uuid.clone(), request)
+            .is_some()
+        {
+            warn!(uuid, "overwriting core request");
+        }
+        Ok(CoreClaim {
+            scheduler: self.clone(),
+            uuid,
+        })
+    }
+
+    pub fn allotment(&self, uuid: &str) -> Result<CoreAllotment, Error> {
+        let available = available_parallelism().map_or(1, NonZero::get);
+        let total = self
+            .budget
+            .map_or(available, |budget| budget.get().min(available));
+        let requests = self
+            .requests
+            .lock()
+            .map_err(|_| Error::CoreSchedulerMutexPoisoned)?;
+        let request = requests
+            .get(uuid)
+            .ok_or_else(|| Error::CoreRequestMissing(uuid.to_string()))?;
+
+        let valid_cores = |request: &CoreRequest| {
+            request
+                .cores
+                .as_ref()
+                .map(|cores| {
+                    cores
+                        .iter()
+                        .copied()
+                        .filter(|core| *core < available)
+                        .collect::<BTreeSet<_>>()
+                })
+                .filter(|cores| !cores.is_empty())
+        };
+
+        if let Some(cores) = valid_cores(request) {
+            let threads = request
+                .threads
+                .unwrap_or(NonZero::new(cores.len()).unwrap());
+            return Ok(CoreAllotment {
+                threads,
+                cores: Some(cores.into_iter().collect()),
+            });
+        }
+
+        let pinned = requests
+            .values()
+            .filter_map(valid_cores)
+            .flatten()
+            .collect::<BTreeSet<_>>()
+            .len();
+        let free = total.saturating_sub(pinned).max(1) as u64;
+        let priority_sum: u64 = requests
+            .values()
+            .filter(|request| valid_cores(request).is_none())
+            .map(|request| request.priority.get() as u64)
+            .sum();
+        let share = (free * request.priority.get() as u64 / priority_sum).max(1) as usize;
+        let threads = request
+            .threads
+            .map_or(share, |threads| threads.get().min(share));
+
+        Ok(CoreAllotment {
+            threads: NonZero::new(threads).unwrap(),
+            cores: None,
+        })
+    }
+}
+
+impl CoreClaim {
+    pub fn allotment(&self) -> Result<CoreAllotment, Error> {
+        self.scheduler.allotment(&self.uuid)
+    }
+}
+
+impl Drop for CoreClaim {
+    fn drop(&mut self) {
+        match self.scheduler.requests.lock() {
+            Ok(mut requests) => {
+                requests.remove(&self.uuid);
+            }
+            Err(_) => tracing::error!("core scheduler mutex poisoned"),
+        }
+    }
+}
+
+impl CoreAllotment {
+    pub fn build_pool(&self) -> Result<ThreadPool, Error> {
+        let cores = self.cores.clone();
+        ThreadPoolBuilder::new()
+            .num_threads(self.threads.get())
+            .thread_name(|index| format!("squishy-volumes-compute-{index}"))
+            .start_handler(move |index| {
+                if let Some(cores) = &cores {
+                    pin_current_thread(cores[index % cores.len()]);
+                }
+            })
+            .build()
+            .map_err(Error::ThreadPoolBuild)
+    }
+}
+
+#[cfg(target_os = "linux")]
+fn pin_current_thread(core: usize) {
+    // SAFETY: the set is plain data and only read by the call
+    let result = unsafe {
+        let mut set: libc::cpu_set_t = std::mem::zeroed();
+        libc::CPU_SET(core, &mut set);
+        libc::sched_setaffinity(0, size_of::<libc::cpu_set_t>(), &set)
+    };
+    if result != 0 {
+        warn!(core, "failed to pin compute thread");
+    }
+}
+
+#[cfg(not(target_os = "linux"))]
+fn pin_current_thread(core: usize) {
+    warn!(core, "pinning compute threads is only supported on linux");
+}
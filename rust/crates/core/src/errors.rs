@@ -35,6 +35,8 @@ pub enum Error {
 
     #[error("Cannot create a new simulation without recorded input ready")]
     MissingInput,
+    #[error("The recorded input is still in use")]
+    InputInUse,
     #[error("No frame has started for recording")]
     NoFrameStarted,
     #[error("Failed to lock directory")]
@@ -68,8 +70,6 @@ pub enum Error {
     CacheCheck(#[source] squishy_volumes_cache::CacheError),
     #[error("Failed to fetch frame")]
     CacheFetch(#[source] squishy_volumes_cache::CacheReadingError),
-    #[error("Failed to fetch node count")]
-    CacheNodeCount(#[source] squishy_volumes_cache::CacheError),
     #[error("Failed to drop frame")]
     CacheDropFrames(#[source] squishy_volumes_cache::CacheError),
 
@@ -92,11 +92,40 @@ pub enum Error {
 
     #[error("Something went really wrong and the compute stats mutex is poisoned")]
     ComputeStatsMutexPoisoned,
+    #[error("Something went really wrong and the core scheduler mutex is poisoned")]
+    CoreSchedulerMutexPoisoned,
+    #[error("No core request registered for {0}")]
+    CoreRequestMissing(String),
+    #[error("Something went really wrong and the bake queue mutex is poisoned")]
+    BakeQueueMutexPoisoned,
+    #[error("{0} is not queued")]
+    NotQueued(String),
+    #[error("Failed to parse bake queue settings")]
+    ParsingBakeQueueSettings(#[source] serde_json::Error),
+    #[error("Failed to encode bake queue")]
+    EncodingBakeQueue(#[source] serde_json::Error),
+    #[error("Failed to build compute thread pool")]
+    ThreadPoolBuild(#[source] rayon::ThreadPoolBuildError),
+
+    #[error("No simulation with {0}")]
+    SimulationMissing(String),
+    #[error("Simulation {0} is poisoned")]
+    SimulationLockPoisoned(String),
+    #[error("Cannot fork at frame {requested}, only {available} are available")]
+    ForkFrameUnavailable { requested: usize, available: usize },
+    #[error("Failed to share files with the fork")]
+    ForkIo(#[source] std::io::Error),
+    #[error("Failed to clean up the frames of the fork")]
+    ForkCleanup(#[source] squishy_volumes_cache::CacheCleanupError),
+    #[error("Failed to rewrite sweep variant input")]
+    SweepRewrite(#[source] squishy_volumes_file_input::InputError),
 
     #[error("Failed to create initial state")]
     InitializationError(#[from] StateInitializationError),
     #[error("Failed to store frame")]
     StoreError(#[source] squishy_volumes_cache::CacheError),
+    #[error("Failed to start trace")]
+    StartTrace(#[source] std::io::Error),
 
     #[error("Something went really wrong and the compute thread paniced: {0}")]
     ComputePanic(String),
@@ -0,0 +1,57 @@
+// SPDX-License-Identifier: MIT
+//
+// Copyright 2025  Algebraic UG (haftungsbeschränkt)
+//
+// Use of this source code is governed by an MIT-style
+// license that can be found in the LICENSE_MIT file or at
+// https://opensource.org/licenses/MIT.
+
+use std::{
+    fs::{copy, hard_link, remove_file},
+    io::ErrorKind,
+    path::Path,
+};
+
+use squishy_volumes_cache::{clean_up_frames, frame_path};
+use squishy_volumes_directory_lock::DirectoryLock;
+use tracing::{info, warn};
+
+use crate::{Error, simulation_input_path};
+
+/// Locks `target` and shares the input and the frames `0..frames` of `source` with it.
+///
+/// Frames are written to a temporary file and renamed afterwards,
+/// so hard links are never written through and both caches can continue independently.
+pub fn fork_cache(
+    uuid: String,
+    source: &Path,
+    target: &Path,
+    frames: usize,
+) -> Result<DirectoryLock, Error> {
+    info!(?source, ?target, frames, "Forking cache");
+    let directory_lock = DirectoryLock::new(target.to_path_buf(), uuid)?;
+    let directory = directory_lock.directory();
+
+    clean_up_frames(directory, 0).map_err(Error::ForkCleanup)?;
+    link_or_copy(
+        &simulation_input_path(source),
+        &simulation_input_path(directory),
+    )?;
+    for frame in 0..frames {
+        link_or_copy(&frame_path(source, frame), &frame_path(directory, frame))?;
+    }
+
+    Ok(directory_lock)
+}
+
+pub(crate) fn link_or_copy(source: &Path, target: &Path) -> Result<(), Error> {
+    match remove_file(target) {
+        Err(e) if e.kind() != ErrorKind::NotFound => return Err(Error::ForkIo(e)),
+        _ => {}
+    }
+    if let Err(e) = hard_link(source, target) {
+        warn!(?source, "Failed to link, copying instead: {e}");
+        copy(source, target).map_err(Error::ForkIo)?;
+    }
+    Ok(())
+}
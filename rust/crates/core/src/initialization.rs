@@ -7,6 +7,7 @@
 // https://opensource.org/licenses/MIT.
 
 use nalgebra::Matrix3;
+use serde::{Deserialize, Serialize};
 use squishy_volumes_file_frame::{
     IoState, ParticleFlags, SpecificParticleParameters, ViscosityParameters,
 };
@@ -65,6 +66,25 @@ pub enum ParticleInvalid {
     EnergyError(#[from] squishy_volumes_util::EnergyError),
 }
 
+/// Scales the captured material parameters, variants can be tried without capturing again.
+#[derive(Clone, Debug, PartialEq, Serialize, Deserialize)]
+#[serde(default)]
+pub struct MaterialOverrides {
+    pub youngs_modulus_scale: f32,
+    pub bulk_modulus_scale: f32,
+    pub viscosity_scale: f32,
+}
+
+impl Default for MaterialOverrides {
+    fn default() -> Self {
+        Self {
+            youngs_modulus_scale: 1.,
+            bulk_modulus_scale: 1.,
+            viscosity_scale: 1.,
+        }
+    }
+}
+
 macro_rules! object_missing_input {
     ($name:expr, $attribute:expr) => {
         $attribute.ok_or(StateInitializationError::MissingInput {
@@ -84,6 +104,11 @@ macro_rules! particle_missing_input {
 pub fn initialize_io_state(
     harness: &Harness,
     input_reader: &mut InputReader,
+    MaterialOverrides {
+        youngs_modulus_scale,
+        bulk_modulus_scale,
+        viscosity_scale,
+    }: &MaterialOverrides,
 ) -> Result<IoState, StateInitializationError> {
     let (input_header, input_frame) = {
         let _scope = harness.scope("Input reading".to_string(), 1.try_into().unwrap())?;
@@ -205,14 +230,15 @@ pub fn initialize_io_state(
                     .contains(ParticleFlags::USE_VISCOSITY)
                     .then(|| {
                         Ok::<ViscosityParameters, ParticleInvalid>(ViscosityParameters {
-                            dynamic: input_viscosities_dynamic?[particle_index],
-                            bulk: input_viscosities_bulk?[particle_index],
+                            dynamic: input_viscosities_dynamic?[particle_index] * viscosity_scale,
+                            bulk: input_viscosities_bulk?[particle_index] * viscosity_scale,
                         })
                     })
                     .transpose()?;
 
                 parameters.specific = if flags.contains(ParticleFlags::IS_SOLID) {
-                    let youngs_modulus = input_youngs_moduluses?[particle_index];
+                    let youngs_modulus =
+                        input_youngs_moduluses?[particle_index] * youngs_modulus_scale;
                     let poisson_ratio = input_poissons_ratios?[particle_index];
                     SpecificParticleParameters::Solid {
                         mu: mu(youngs_modulus, poisson_ratio)?,
@@ -224,7 +250,7 @@ pub fn initialize_io_state(
                     }
                 } else {
                     let exponent = input_exponents?[particle_index] as i32;
-                    let bulk_modulus = input_bulk_moduluses?[particle_index];
+                    let bulk_modulus = input_bulk_moduluses?[particle_index] * bulk_modulus_scale;
                     exponent_in_bounds(exponent)?;
                     bulk_modulus_in_bounds(bulk_modulus)?;
                     SpecificParticleParameters::Fluid {
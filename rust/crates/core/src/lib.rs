@@ -8,17 +8,31 @@
 
 mod api_impl;
 mod attributes;
+mod bake_queue;
 mod compute_thread;
 mod context;
+mod core_scheduler;
 mod errors;
+mod fork;
 mod initialization;
 mod input_bulk;
 mod simulation;
 mod simulation_input;
 mod stats;
+mod sweep;
+mod trace_sink;
 
+#[cfg(test)]
+mod tests;
+
+pub use bake_queue::*;
 pub use context::*;
+pub use core_scheduler::*;
 pub use errors::*;
+pub use fork::fork_cache;
+pub use initialization::{MaterialOverrides, StateInitializationError, initialize_io_state};
 pub use input_bulk::*;
 pub use simulation::*;
 pub use simulation_input::*;
+pub use sweep::*;
+pub use trace_sink::*;
@@ -6,32 +6,59 @@
 // license that can be found in the LICENSE_MIT file or at
 // https://opensource.org/licenses/MIT.
 
-use std::{collections::BTreeMap, num::NonZero, path::PathBuf, sync::Arc};
+use std::{
+    hash::{DefaultHasher, Hash, Hasher},
+    num::NonZero,
+    path::PathBuf,
+    sync::Arc,
+};
 
 use serde::{Deserialize, Serialize};
 use serde_json::{Value, from_value, to_value};
 use squishy_volumes_cache::Cache;
 use squishy_volumes_directory_lock::DirectoryLock;
 use squishy_volumes_file_input::{InputHeader, InputObject, InputRanges, InputReader};
-use tracing::{info, warn};
+use squishy_volumes_xpu::ReportInfo;
+use tracing::{debug_span, info, warn};
 
 use crate::{
-    Error, SimulationInputImpl,
+    BakeQueue, BakeState, CoreRequest, CoreScheduler, Error, MaterialOverrides,
+    SimulationInputImpl,
     attributes::{available_attributes, fetch_flat_attribute_f32, fetch_flat_attribute_i32},
     compute_thread::{ComputeThread, ComputeThreadSettings},
-    simulation_input_path,
+    fork_cache, simulation_input_path,
     stats::{ComputeStats, StateStats, Stats},
 };
 
 pub struct SimulationImpl {
+    uuid: String,
     input_header: InputHeader,
     input_ranges: InputRanges,
+    // the particle counts don't change, only the grid nodes are filled in
+    particle_stats: StateStats,
 
+    core_scheduler: CoreScheduler,
+    bake_queue: BakeQueue,
     cache: Arc<Cache>,
+    queued_compute: Option<QueuedCompute>,
+    deferred_error: Option<Error>,
     compute_thread: Option<ComputeThread>,
     cached_compute_stats: Option<ComputeStats>,
 }
 
+struct QueuedCompute {
+    max_time_step: f32,
+    gpu: Option<String>,
+    adaptive_time_steps: bool,
+    particle_centric_scatter: bool,
+    multi_rate: bool,
+    trace: bool,
+    next_frame: usize,
+    number_of_frames: NonZero<usize>,
+    material_overrides: MaterialOverrides,
+    core_request: CoreRequest,
+}
+
 impl SimulationImpl {
     pub fn new(
         SimulationInputImpl {
@@ -41,6 +68,8 @@ impl SimulationImpl {
             current_frame,
             ..
         }: SimulationInputImpl,
+        core_scheduler: CoreScheduler,
+        bake_queue: BakeQueue,
     ) -> Result<Self, Error> {
         info!("Creating new simulation");
         if current_frame.is_some() {
@@ -50,25 +79,61 @@ impl SimulationImpl {
         info!("Finalizing input");
         input_writer.flush().map_err(Error::FinalizingInput)?;
 
-        Self::load_with_lock(directory_lock, max_bytes_on_disk, true)
+        Self::load_with_lock(
+            directory_lock,
+            max_bytes_on_disk,
+            true,
+            core_scheduler,
+            bake_queue,
+        )
     }
 
-    pub fn load(uuid: String, directory: PathBuf) -> Result<Self, Error> {
+    pub fn load(
+        uuid: String,
+        directory: PathBuf,
+        core_scheduler: CoreScheduler,
+        bake_queue: BakeQueue,
+    ) -> Result<Self, Error> {
         info!("Loading old simulation");
         let directory_lock = DirectoryLock::new(directory.clone(), uuid)?;
-        Self::load_with_lock(directory_lock, u64::MAX, false)
+        Self::load_with_lock(directory_lock, u64::MAX, false, core_scheduler, bake_queue)
+    }
+
+    /// Creates a simulation in `directory` sharing the input and the frames before `frame`,
+    /// it continues from there with its own compute settings.
+    pub fn fork_impl(&self, uuid: String, directory: PathBuf, frame: usize) -> Result<Self, Error> {
+        info!("Forking simulation");
+        let available = self.available_frames_impl();
+        if frame > available {
+            return Err(Error::ForkFrameUnavailable {
+                requested: frame,
+                available,
+            });
+        }
+        let directory_lock = fork_cache(uuid, self.cache.directory(), &directory, frame)?;
+        Self::load_with_lock(
+            directory_lock,
+            u64::MAX,
+            false,
+            self.core_scheduler.clone(),
+            self.bake_queue.clone(),
+        )
     }
 
     fn load_with_lock(
         directory_lock: DirectoryLock,
         max_bytes_on_disk: u64,
         clean_up: bool,
+        core_scheduler: CoreScheduler,
+        bake_queue: BakeQueue,
     ) -> Result<Self, Error> {
+        let uuid = directory_lock.uuid().to_string();
         let mut input_reader = InputReader::new(simulation_input_path(directory_lock.directory()))
             .map_err(Error::StartInputReading)?;
         let input_header = input_reader.read_header().map_err(Error::ReadHeader)?;
         let input_ranges = InputRanges::new(&input_header.objects);
         info!(?input_ranges);
+        let particle_stats = particle_stats(&input_header);
 
         let cache = Arc::new(
             Cache::new(directory_lock, input_reader.size(), max_bytes_on_disk)
@@ -80,9 +145,15 @@ impl SimulationImpl {
         }
 
         Ok(Self {
+            uuid,
             input_header,
             input_ranges,
+            particle_stats,
+            core_scheduler,
+            bake_queue,
             cache,
+            queued_compute: None,
+            deferred_error: None,
             compute_thread: None,
             cached_compute_stats: None,
         })
@@ -94,33 +165,81 @@ impl SimulationImpl {
         to_value(&self.input_header).map_err(Error::EncodingInputHeader)
     }
 
+    /// Queued counts as computing, it only waits for a free slot.
     pub fn computing_impl(&self) -> bool {
-        self.compute_thread
+        self.queued_compute.is_some()
+            || self
+                .compute_thread
+                .as_ref()
+                .is_some_and(ComputeThread::running)
+    }
+
+    pub fn bake_state_impl(&self) -> Result<BakeState, Error> {
+        if self
+            .compute_thread
             .as_ref()
             .is_some_and(ComputeThread::running)
+        {
+            return Ok(BakeState::Running);
+        }
+        Ok(match self.bake_queue.position(&self.uuid)? {
+            Some(position) => BakeState::Queued { position },
+            None => BakeState::Idle,
+        })
     }
 
-    pub fn poll_impl(&mut self) -> Result<Value, Error> {
-        self.cache.check().map_err(Error::CacheCheck)?;
-        serde_json::to_value(
+    /// Differs from the previous value if polling might report something new,
+    /// without looking at the directory or the progress reports.
+    pub fn changes_impl(&self) -> u64 {
+        let mut hasher = DefaultHasher::new();
+        (
+            self.available_frames_impl(),
             self.compute_thread
-                .as_mut()
-                .map(ComputeThread::poll)
-                .transpose()?
-                .unwrap_or(Default::default()),
+                .as_ref()
+                .map(|compute_thread| (compute_thread.changes(), compute_thread.running())),
+            self.queued_compute.is_some(),
+            self.bake_queue.position(&self.uuid).ok().flatten(),
+            self.deferred_error.is_some(),
         )
+            .hash(&mut hasher);
+        hasher.finish()
+    }
+
+    pub fn poll_impl(&mut self) -> Result<Value, Error> {
+        if let Some(e) = self.deferred_error.take() {
+            return Err(e);
+        }
+        self.cache.check().map_err(Error::CacheCheck)?;
+        self.start_queued_impl()?;
+        let progress = self
+            .compute_thread
+            .as_mut()
+            .map(ComputeThread::poll)
+            .transpose()?
+            .unwrap_or_default();
+        serde_json::to_value(PollReport {
+            bake_state: self.bake_state_impl()?,
+            progress,
+        })
         .map_err(Error::EncodingReport)
     }
 
     pub fn start_compute_impl(&mut self, compute_settings: Value) -> Result<(), Error> {
-        info!("starting compute");
+        info!("queueing compute");
         let ComputeSettings {
             time_step,
             gpu,
             adaptive_time_steps,
+            particle_centric_scatter,
+            multi_rate,
+            trace,
             next_frame,
             number_of_frames,
             max_bytes_on_disk,
+            threads,
+            cores,
+            priority,
+            material_overrides,
         } = from_value(compute_settings).map_err(Error::ParsingComputeSettings)?;
         self.cache.set_max_bytes_on_disk(max_bytes_on_disk);
 
@@ -136,20 +255,83 @@ impl SimulationImpl {
             .drop_frames(next_frame)
             .map_err(Error::CacheDropFrames)?;
 
+        self.bake_queue.enqueue(self.uuid.clone(), priority)?;
+        self.queued_compute = Some(QueuedCompute {
+            max_time_step: time_step,
+            gpu,
+            adaptive_time_steps,
+            particle_centric_scatter,
+            multi_rate,
+            trace,
+            next_frame,
+            number_of_frames,
+            material_overrides,
+            core_request: CoreRequest {
+                threads,
+                cores,
+                priority,
+            },
+        });
+
+        self.start_queued_impl()?;
+        Ok(())
+    }
+
+    /// Starts the queued compute if the bake queue has a slot for it.
+    pub fn start_queued_impl(&mut self) -> Result<bool, Error> {
+        let Some(queued_compute) = self.queued_compute.take() else {
+            return Ok(false);
+        };
+        let Some(bake_slot) = self.bake_queue.try_start(&self.uuid)? else {
+            self.queued_compute = Some(queued_compute);
+            return Ok(false);
+        };
+        let QueuedCompute {
+            max_time_step,
+            gpu,
+            adaptive_time_steps,
+            particle_centric_scatter,
+            multi_rate,
+            trace,
+            next_frame,
+            number_of_frames,
+            material_overrides,
+            core_request,
+        } = queued_compute;
+
+        let core_claim = self.core_scheduler.claim(self.uuid.clone(), core_request)?;
+
         info!("starting thread");
         self.compute_thread = Some(ComputeThread::new(ComputeThreadSettings {
             cache: self.cache.clone(),
-            max_time_step: time_step,
+            max_time_step,
             number_of_frames,
             next_frame,
             adaptive_time_steps,
+            particle_centric_scatter,
+            multi_rate,
+            trace,
             gpu,
+            material_overrides,
+            core_claim,
+            bake_slot,
         })?);
 
-        Ok(())
+        Ok(true)
+    }
+
+    /// Like `start_queued_impl`, but the error is reported by the next poll.
+    pub fn start_queued_deferred_impl(&mut self) {
+        if let Err(e) = self.start_queued_impl() {
+            warn!("failed to start queued compute: {e}");
+            self.deferred_error = Some(e);
+        }
     }
 
     pub fn pause_compute_impl(&mut self) -> Result<(), Error> {
+        self.queued_compute = None;
+        self.bake_queue.dequeue(&self.uuid)?;
+
         self.cached_compute_stats = None;
         if let Some(compute_thread) = self.compute_thread.take() {
             self.cached_compute_stats = compute_thread.stats()?;
@@ -172,10 +354,11 @@ impl SimulationImpl {
         frame: usize,
         attribute: Value,
     ) -> Result<Vec<f32>, Error> {
+        let _span = debug_span!("fetch_attribute", frame).entered();
         Ok(fetch_flat_attribute_f32(
             &self.input_header,
             &self.input_ranges,
-            &*self.cache.fetch_frame(frame).map_err(Error::CacheFetch)?,
+            &self.cache.fetch_frame(frame).map_err(Error::CacheFetch)?,
             &from_value(attribute).map_err(Error::ParseAttribute)?,
         )?)
     }
@@ -185,40 +368,19 @@ impl SimulationImpl {
         frame: usize,
         attribute: Value,
     ) -> Result<Vec<i32>, Error> {
+        let _span = debug_span!("fetch_attribute", frame).entered();
         Ok(fetch_flat_attribute_i32(
             &self.input_header,
             &self.input_ranges,
-            &*self.cache.fetch_frame(frame).map_err(Error::CacheFetch)?,
+            &self.cache.fetch_frame(frame).map_err(Error::CacheFetch)?,
             &from_value(attribute).map_err(Error::ParseAttribute)?,
         )?)
     }
 
-    pub fn stats_impl(&self) -> Result<Value, Error> {
-        let state = {
-            let mut total_particle_count = 0;
-            let per_object_count: BTreeMap<String, usize> = self
-                .input_header
-                .objects
-                .iter()
-                .filter_map(|(name, object)| {
-                    if let InputObject::Particles { num_particles } = object {
-                        total_particle_count += num_particles;
-                        Some((name.clone(), *num_particles))
-                    } else {
-                        None
-                    }
-                })
-                .collect();
-            let grid_node_count = self
-                .cache
-                .grid_node_count()
-                .map_err(Error::CacheNodeCount)?;
-
-            StateStats {
-                total_particle_count,
-                per_object_count,
-                grid_node_count,
-            }
+    pub fn stats_impl(&self, frame: Option<usize>) -> Result<Value, Error> {
+        let state = StateStats {
+            grid_node_count: frame.and_then(|frame| self.cache.grid_node_count(frame)),
+            ..self.particle_stats.clone()
         };
 
         let compute = self
@@ -239,6 +401,20 @@ impl SimulationImpl {
     }
 }
 
+impl Drop for SimulationImpl {
+    fn drop(&mut self) {
+        if let Err(e) = self.bake_queue.dequeue(&self.uuid) {
+            tracing::error!("{e}");
+        }
+    }
+}
+
+#[derive(Serialize)]
+pub struct PollReport {
+    pub bake_state: BakeState,
+    pub progress: Vec<ReportInfo>,
+}
+
 #[derive(Serialize, Deserialize)]
 pub struct ComputeSettings {
     pub time_step: f32,
@@ -247,4 +423,52 @@ pub struct ComputeSettings {
     pub next_frame: usize,
     pub number_of_frames: usize,
     pub max_bytes_on_disk: u64,
+
+    /// Limits the CPU threads, all available cores are used otherwise.
+    #[serde(default)]
+    pub threads: Option<NonZero<usize>>,
+    /// Pins the CPU threads to these cores.
+    #[serde(default)]
+    pub cores: Option<Vec<usize>>,
+    /// Weight when sharing cores with other computing simulations.
+    #[serde(default = "default_priority")]
+    pub priority: NonZero<u32>,
+    /// Only applies when starting from the first frame.
+    #[serde(default)]
+    pub material_overrides: MaterialOverrides,
+    /// Scatters per block of particles instead of per grid node, CPU only.
+    #[serde(default)]
+    pub particle_centric_scatter: bool,
+    /// Lets groups of particles that stay apart within a frame step independently,
+    /// CPU with adaptive time steps only.
+    #[serde(default)]
+    pub multi_rate: bool,
+    /// Records a timeline of the bake into `trace.json` in the cache directory.
+    #[serde(default)]
+    pub trace: bool,
+}
+
+fn default_priority() -> NonZero<u32> {
+    NonZero::new(1).unwrap()
+}
+
+fn particle_stats(input_header: &InputHeader) -> StateStats {
+    let mut total_particle_count = 0;
+    let per_object_count = input_header
+        .objects
+        .iter()
+        .filter_map(|(name, object)| {
+            if let InputObject::Particles { num_particles } = object {
+                total_particle_count += num_particles;
+                Some((name.clone(), *num_particles))
+            } else {
+                None
+            }
+        })
+        .collect();
+    StateStats {
+        total_particle_count,
+        per_object_count,
+        grid_node_count: None,
+    }
 }
@@ -9,6 +9,7 @@
 use std::collections::BTreeMap;
 
 use serde::{Deserialize, Serialize};
+use squishy_volumes_cpu::FrameStats;
 
 #[derive(Clone, Serialize, Deserialize)]
 pub struct Stats {
@@ -29,4 +30,34 @@ pub struct ComputeStats {
     pub remaining_time_sec: f32,
     pub last_frame_time_sec: f32,
     pub last_frame_substeps: usize,
+    // in the order the phases run, empty on the GPU
+    #[serde(default)]
+    pub last_frame_phase_times_sec: Vec<(String, f32)>,
+    // substeps per binding time step limit, empty on the GPU
+    #[serde(default)]
+    pub last_frame_time_step_limits: Vec<(String, usize)>,
+}
+
+impl ComputeStats {
+    pub fn new(
+        remaining_time_sec: f32,
+        last_frame_time_sec: f32,
+        frame_stats: &FrameStats,
+    ) -> Self {
+        Self {
+            remaining_time_sec,
+            last_frame_time_sec,
+            last_frame_substeps: frame_stats.substeps,
+            last_frame_phase_times_sec: frame_stats
+                .phase_durations
+                .iter()
+                .map(|(phase, duration)| (phase.to_string(), duration.as_secs_f32()))
+                .collect(),
+            last_frame_time_step_limits: frame_stats
+                .time_step_limits
+                .iter()
+                .map(|(limit, substeps)| (limit.to_string(), *substeps))
+                .collect(),
+        }
+    }
 }
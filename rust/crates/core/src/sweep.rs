@@ -0,0 +1,57 @@
+// SPDX-License-Identifier: MIT
+//
+// Copyright 2025  Algebraic UG (haftungsbeschränkt)
+//
+// Use of this source code is governed by an MIT-style
+// license that can be found in the LICENSE_MIT file or at
+// https://opensource.org/licenses/MIT.
+
+use std::path::Path;
+
+use squishy_volumes_cache::clean_up_frames;
+use squishy_volumes_directory_lock::DirectoryLock;
+use squishy_volumes_file_input::{InputReader, InputWriter};
+use tracing::info;
+
+use crate::{Error, fork_cache, simulation_input_path};
+
+/// Prepares `target` to simulate the input captured in `source` again.
+///
+/// The input is shared like for a fork without frames,
+/// a different grid node size needs a rewritten header though.
+/// Frames left over from an earlier variant are removed.
+pub fn prepare_sweep_variant(
+    uuid: String,
+    source: &Path,
+    target: &Path,
+    grid_node_size: Option<f32>,
+) -> Result<(), Error> {
+    let Some(grid_node_size) = grid_node_size else {
+        fork_cache(uuid, source, target, 0)?;
+        return Ok(());
+    };
+
+    info!(?source, ?target, grid_node_size, "Preparing sweep variant");
+    let directory_lock = DirectoryLock::new(target.to_path_buf(), uuid)?;
+    let directory = directory_lock.directory();
+    clean_up_frames(directory, 0).map_err(Error::ForkCleanup)?;
+
+    let mut input_reader =
+        InputReader::new(simulation_input_path(source)).map_err(Error::StartInputReading)?;
+    let mut input_header = input_reader.read_header().map_err(Error::ReadHeader)?;
+    input_header
+        .consts
+        .set_unscaled_grid_node_size(grid_node_size);
+    let mut input_writer = InputWriter::new(simulation_input_path(directory), input_header)
+        .map_err(Error::StartInputWriting)?;
+    for frame in 0..input_reader.len() {
+        let input_frame = input_reader
+            .read_frame(frame)
+            .map_err(Error::SweepRewrite)?;
+        input_writer
+            .record_frame(&input_frame)
+            .map_err(Error::RecordFrame)?;
+    }
+    input_writer.flush().map_err(Error::FinalizingInput)?;
+    Ok(())
+}
@@ -0,0 +1,185 @@
+// SPDX-License-Identifier: MIT
+//
+// Copyright 2025  Algebraic UG (haftungsbeschränkt)
+//
+// Use of this source code is governed by an MIT-style
+// license that can be found in the LICENSE_MIT file or at
+// https://opensource.org/licenses/MIT.
+
+use std::{collections::BTreeMap, num::NonZero, path::Path};
+
+use serde_json::{from_value, json};
+use squishy_volumes_cpu::{CpuRunParameters, CpuState, MultiRateState};
+use squishy_volumes_file_frame::{IoState, ParticleFlags};
+use squishy_volumes_file_input::{
+    InputFrame, InputHeader, InputObject, InputReader, InputWriter, ParticlesInput,
+};
+use squishy_volumes_xpu::{FrameInput, Harness};
+
+use crate::{MaterialOverrides, initialize_io_state};
+
+const FRAMES_PER_SECOND: u32 = 24;
+const FRAMES: usize = 3;
+const GRAVITY: f32 = 9.81;
+const PARTICLES_PER_SIDE: usize = 10;
+const PARTICLE_SPACING: f32 = 0.25;
+// the fast block needs smaller time steps than the maximum the slow one uses
+const MAX_TIME_STEP: f32 = 0.01;
+const FAST_VELOCITY: f32 = 40.;
+// far enough apart that they become separate islands
+const BLOCK_OFFSET: f32 = 20.;
+
+fn block(min_x: f32, velocity_x: f32) -> ParticlesInput {
+    let n = PARTICLES_PER_SIDE.pow(3);
+    let transforms = (0..n)
+        .map(|i| {
+            let lattice = [
+                i / PARTICLES_PER_SIDE / PARTICLES_PER_SIDE,
+                i / PARTICLES_PER_SIDE % PARTICLES_PER_SIDE,
+                i % PARTICLES_PER_SIDE,
+            ]
+            .map(|c| c as f32 * PARTICLE_SPACING);
+            [
+                [1., 0., 0., 0.],
+                [0., 1., 0., 0.],
+                [0., 0., 1., 0.],
+                [min_x + lattice[0], lattice[1], lattice[2], 1.],
+            ]
+        })
+        .collect();
+    ParticlesInput {
+        flags: vec![ParticleFlags::IS_SOLID.bits(); n],
+        transforms: Some(transforms),
+        sizes: Some(vec![PARTICLE_SPACING; n]),
+        densities: Some(vec![1000.; n]),
+        youngs_moduluses: Some(vec![1e5; n]),
+        poissons_ratios: Some(vec![0.3; n]),
+        initial_velocities: Some(vec![[velocity_x, 0., 0.]; n]),
+        exponents: Some(vec![7; n]),
+        bulk_moduluses: Some(vec![1e5; n]),
+        ..Default::default()
+    }
+}
+
+fn write_two_blocks(path: &Path) {
+    let header: InputHeader = from_value(json!({
+        "consts": {
+            "grid_node_size": 0.5,
+            "leaf_size": 1.,
+            "leaf_threshold": 16,
+            "simulation_scale": 1.,
+            "frames_per_second": FRAMES_PER_SECOND,
+            "domain_min": [-100., -100., -100.],
+            "domain_max": [100., 100., 100.],
+        },
+        "objects": {},
+    }))
+    .unwrap();
+    let num_particles = PARTICLES_PER_SIDE.pow(3);
+    let header = InputHeader {
+        objects: ["fast", "slow"]
+            .into_iter()
+            .map(|name| (name.to_string(), InputObject::Particles { num_particles }))
+            .collect(),
+        ..header
+    };
+
+    let mut input_writer = InputWriter::new(path, header).unwrap();
+    // the last frame is only interpolated towards
+    for frame in 0..=FRAMES {
+        let particles_inputs = if frame == 0 {
+            BTreeMap::from([
+                ("fast".to_string(), block(BLOCK_OFFSET, FAST_VELOCITY)),
+                ("slow".to_string(), block(-BLOCK_OFFSET, 0.)),
+            ])
+        } else {
+            Default::default()
+        };
+        input_writer
+            .record_frame(&InputFrame {
+                gravity: [0., 0., -GRAVITY],
+                particles_inputs,
+                collider_inputs: Default::default(),
+            })
+            .unwrap();
+    }
+    input_writer.flush().unwrap();
+}
+
+fn simulate(path: &Path, multi_rate: bool) -> IoState {
+    let harness = Harness::new("Test".to_string(), NonZero::new(FRAMES + 1).unwrap());
+    let mut input_reader = InputReader::new(path).unwrap();
+    let io_state =
+        initialize_io_state(&harness, &mut input_reader, &MaterialOverrides::default()).unwrap();
+    let mut frame_input = FrameInput::new(input_reader, 0).unwrap();
+
+    enum State {
+        Cpu(CpuState),
+        MultiRate(MultiRateState),
+    }
+    let mut state = if multi_rate {
+        State::MultiRate(MultiRateState::from_io_state(io_state.clone(), &frame_input).unwrap())
+    } else {
+        State::Cpu(CpuState::from_io_state(io_state.clone()).unwrap())
+    };
+
+    let mut io_state = io_state;
+    for frame in 1..=FRAMES {
+        frame_input.load(frame - 1).unwrap();
+        let parameters = CpuRunParameters {
+            target_time: frame as f64 / FRAMES_PER_SECOND as f64,
+            max_time_step: MAX_TIME_STEP,
+            adaptive_time_steps: true,
+            particle_centric_scatter: false,
+            store_grid: false,
+        };
+        let (next_io_state, result) = match &mut state {
+            State::Cpu(cpu_state) => {
+                cpu_state.produce_next_state(&harness, &frame_input, parameters)
+            }
+            State::MultiRate(multi_rate_state) => {
+                multi_rate_state.produce_next_state(&harness, &frame_input, parameters)
+            }
+        }
+        .unwrap();
+        result.unwrap();
+        io_state = next_io_state;
+    }
+    io_state
+}
+
+// Both blocks fall freely, so their velocities only depend on the time that was simulated.
+// Each island has to be simulated as long as the whole state claims.
+#[test]
+fn multi_rate_islands_keep_up_with_single_rate() {
+    let directory = tempfile::Builder::new()
+        .prefix("SquishyVolumesTestDir")
+        .tempdir()
+        .unwrap();
+    let path = directory.path().join("input.bin");
+    write_two_blocks(&path);
+
+    let single_rate = simulate(&path, false);
+    let multi_rate = simulate(&path, true);
+
+    let target_time = FRAMES as f64 / FRAMES_PER_SECOND as f64;
+    assert!((multi_rate.time - target_time).abs() < 1e-9);
+    assert!(single_rate.time >= target_time);
+
+    // the fast block comes first, the objects are sorted by name
+    let num_particles = PARTICLES_PER_SIDE.pow(3);
+    let mean_velocity = |io_state: &IoState, block: usize| {
+        let velocities = &io_state.particles.velocities[block * num_particles..][..num_particles];
+        [0, 2].map(|axis| velocities.iter().map(|v| v[axis]).sum::<f32>() / num_particles as f32)
+    };
+    for block in 0..2 {
+        let [single_x, single_z] = mean_velocity(&single_rate, block);
+        let [multi_x, multi_z] = mean_velocity(&multi_rate, block);
+        assert!((single_x - multi_x).abs() < 1e-2);
+
+        let single_acceleration = single_z / single_rate.time as f32;
+        let multi_acceleration = multi_z / multi_rate.time as f32;
+        assert!((single_acceleration + GRAVITY).abs() < 1e-2);
+        assert!((multi_acceleration + GRAVITY).abs() < 1e-2);
+    }
+}
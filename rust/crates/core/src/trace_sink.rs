@@ -0,0 +1,259 @@
+// SPDX-License-Identifier: MIT
+//
+// Copyright 2025  Algebraic UG (haftungsbeschränkt)
+//
+// Use of this source code is governed by an MIT-style
+// license that can be found in the LICENSE_MIT file or at
+// https://opensource.org/licenses/MIT.
+
+use std::{
+    collections::BTreeSet,
+    fs::File,
+    io::{BufWriter, Write},
+    path::Path,
+    sync::{
+        LazyLock, Mutex,
+        atomic::{AtomicU64, AtomicUsize, Ordering},
+    },
+    time::Instant,
+};
+
+use serde_json::{Map, Value, json};
+use tracing::{
+    Metadata, Subscriber,
+    field::{Field, Visit},
+    span::{Attributes, Id},
+};
+use tracing_subscriber::{
+    Layer,
+    filter::{LevelFilter, filter_fn},
+    layer::Context,
+    registry::{LookupSpan, SpanRef},
+};
+
+// Writes the spans into a Chrome trace, which can be opened in Perfetto or chrome://tracing.
+// All computing simulations that asked for a trace share the file of the first one,
+// so their compute, store and fetch spans end up on one timeline.
+// Nothing is recorded while no trace is running.
+
+// The name of the trace event, the span name otherwise.
+const LABEL_FIELD: &str = "label";
+
+static TRACE_FILE: Mutex<Option<TraceFile>> = Mutex::new(None);
+static RUNNING_TRACES: AtomicUsize = AtomicUsize::new(0);
+static START: LazyLock<Instant> = LazyLock::new(Instant::now);
+
+static NEXT_THREAD_ID: AtomicU64 = AtomicU64::new(1);
+thread_local! {
+    static THREAD_ID: u64 = NEXT_THREAD_ID.fetch_add(1, Ordering::Relaxed);
+}
+
+struct TraceFile {
+    writer: BufWriter<File>,
+    named_threads: BTreeSet<u64>,
+    empty: bool,
+}
+
+impl TraceFile {
+    fn write_event(&mut self, event: Value) -> std::io::Result<()> {
+        if !std::mem::take(&mut self.empty) {
+            self.writer.write_all(b",")?;
+        }
+        self.writer.write_all(b"\n")?;
+        serde_json::to_writer(&mut self.writer, &event)?;
+        Ok(())
+    }
+}
+
+/// Stops the trace when the last guard is dropped.
+pub struct TraceGuard(());
+
+/// Starts writing spans to `path`, unless a trace is running already.
+pub fn start_trace(path: &Path) -> std::io::Result<TraceGuard> {
+    let mut trace_file = TRACE_FILE.lock().unwrap();
+    if trace_file.is_none() {
+        let mut writer = BufWriter::new(File::create(path)?);
+        // the array format tolerates a missing `]`, in case the trace doesn't finish
+        writer.write_all(b"[")?;
+        *trace_file = Some(TraceFile {
+            writer,
+            named_threads: Default::default(),
+            empty: true,
+        });
+        LazyLock::force(&START);
+        tracing::info!(?path, "trace started");
+    }
+    RUNNING_TRACES.fetch_add(1, Ordering::Relaxed);
+    Ok(TraceGuard(()))
+}
+
+impl Drop for TraceGuard {
+    fn drop(&mut self) {
+        let mut trace_file = TRACE_FILE.lock().unwrap();
+        if RUNNING_TRACES.fetch_sub(1, Ordering::Relaxed) > 1 {
+            return;
+        }
+        let Some(mut trace_file) = trace_file.take() else {
+            return;
+        };
+        if let Err(e) = trace_file
+            .writer
+            .write_all(b"\n]\n")
+            .and_then(|_| trace_file.writer.flush())
+        {
+            tracing::warn!("failed to finish trace: {e}");
+        }
+    }
+}
+
+/// Has to be part of the global subscriber for `start_trace` to record anything.
+pub fn trace_layer<S>() -> impl Layer<S>
+where
+    S: Subscriber + for<'a> LookupSpan<'a>,
+{
+    TraceLayer.with_filter(
+        filter_fn(|metadata: &Metadata<'_>| {
+            metadata.is_span() && RUNNING_TRACES.load(Ordering::Relaxed) > 0
+        })
+        // the spans for the trace are all on this level
+        .with_max_level_hint(LevelFilter::DEBUG),
+    )
+}
+
+struct TraceLayer;
+
+struct SpanRecord {
+    args: Map<String, Value>,
+    entered: Option<Instant>,
+}
+
+struct ArgsVisitor<'a>(&'a mut Map<String, Value>);
+
+impl Visit for ArgsVisitor<'_> {
+    fn record_str(&mut self, field: &Field, value: &str) {
+        self.0.insert(field.name().to_string(), value.into());
+    }
+
+    fn record_u64(&mut self, field: &Field, value: u64) {
+        self.0.insert(field.name().to_string(), value.into());
+    }
+
+    fn record_i64(&mut self, field: &Field, value: i64) {
+        self.0.insert(field.name().to_string(), value.into());
+    }
+
+    fn record_f64(&mut self, field: &Field, value: f64) {
+        self.0.insert(field.name().to_string(), value.into());
+    }
+
+    fn record_bool(&mut self, field: &Field, value: bool) {
+        self.0.insert(field.name().to_string(), value.into());
+    }
+
+    fn record_debug(&mut self, field: &Field, value: &dyn std::fmt::Debug) {
+        self.0
+            .insert(field.name().to_string(), format!("{value:?}").into());
+    }
+}
+
+fn micros_since_start(instant: Instant) -> f64 {
+    instant.saturating_duration_since(*START).as_secs_f64() * 1e6
+}
+
+impl<S> Layer<S> for TraceLayer
+where
+    S: Subscriber + for<'a> LookupSpan<'a>,
+{
+    fn on_new_span(&self, attributes: &Attributes<'_>, id: &Id, ctx: Context<'_, S>) {
+        let Some(span) = ctx.span(id) else {
+            return;
+        };
+        let mut args = Map::new();
+        attributes.record(&mut ArgsVisitor(&mut args));
+        span.extensions_mut().insert(SpanRecord {
+            args,
+            entered: None,
+        });
+    }
+
+    fn on_record(&self, id: &Id, values: &tracing::span::Record<'_>, ctx: Context<'_, S>) {
+        let Some(span) = ctx.span(id) else {
+            return;
+        };
+        if let Some(record) = span.extensions_mut().get_mut::<SpanRecord>() {
+            values.record(&mut ArgsVisitor(&mut record.args));
+        }
+    }
+
+    fn on_enter(&self, id: &Id, ctx: Context<'_, S>) {
+        let Some(span) = ctx.span(id) else {
+            return;
+        };
+        if let Some(record) = span.extensions_mut().get_mut::<SpanRecord>() {
+            record.entered = Some(Instant::now());
+        }
+    }
+
+    fn on_exit(&self, id: &Id, ctx: Context<'_, S>) {
+        let exited = Instant::now();
+        let Some(span) = ctx.span(id) else {
+            return;
+        };
+        write_span(&span, exited);
+    }
+}
+
+fn write_span<S>(span: &SpanRef<'_, S>, exited: Instant)
+where
+    S: Subscriber + for<'a> LookupSpan<'a>,
+{
+    let extensions = span.extensions();
+    // spans created before the trace started have no record
+    let Some(SpanRecord {
+        args,
+        entered: Some(entered),
+    }) = extensions.get::<SpanRecord>()
+    else {
+        return;
+    };
+    let name = args
+        .get(LABEL_FIELD)
+        .and_then(Value::as_str)
+        .unwrap_or(span.name());
+    let thread_id = THREAD_ID.with(|thread_id| *thread_id);
+    let process_id = std::process::id();
+
+    let Ok(mut trace_file) = TRACE_FILE.lock() else {
+        return;
+    };
+    let Some(trace_file) = trace_file.as_mut() else {
+        return;
+    };
+    let mut result = Ok(());
+    if trace_file.named_threads.insert(thread_id) {
+        let thread = std::thread::current();
+        result = trace_file.write_event(json!({
+            "name": "thread_name",
+            "ph": "M",
+            "pid": process_id,
+            "tid": thread_id,
+            "args": { "name": thread.name().unwrap_or("unnamed") },
+        }));
+    }
+    result = result.and_then(|_| {
+        trace_file.write_event(json!({
+            "name": name,
+            "cat": span.metadata().target(),
+            "ph": "X",
+            "ts": micros_since_start(*entered),
+            "dur": exited.saturating_duration_since(*entered).as_secs_f64() * 1e6,
+            "pid": process_id,
+            "tid": thread_id,
+            "args": args,
+        }))
+    });
+    if let Err(e) = result {
+        // tracing from within the layer would end up here again
+        eprintln!("failed to write trace event: {e}");
+    }
+}
@@ -8,6 +8,8 @@
 
 use std::iter::once;
 
+use strum::IntoStaticStr;
+
 const TIME_STEP_HISTORY_LENGTH: usize = 10;
 
 pub struct AdaptiveTimeStepState {
@@ -17,6 +19,20 @@ pub struct AdaptiveTimeStepState {
     pub time_step_by_isolated: Option<f32>,
     pub time_step_by_sound: Option<f32>,
     pub time_step_prior: std::collections::VecDeque<f32>,
+    // Until the next frame, if the substeps have to end exactly there.
+    // It doesn't go into the history, a short last substep shouldn't slow down the next frame.
+    pub remaining_time: Option<f32>,
+}
+
+#[derive(Debug, Clone, Copy, PartialEq, Eq, IntoStaticStr)]
+pub enum TimeStepLimit {
+    Max,
+    Velocity,
+    Deformation,
+    Sound,
+    Isolated,
+    Prior,
+    Frame,
 }
 
 impl Default for AdaptiveTimeStepState {
@@ -28,6 +44,7 @@ impl Default for AdaptiveTimeStepState {
             time_step_by_isolated: Default::default(),
             time_step_by_sound: Default::default(),
             time_step_prior: Default::default(),
+            remaining_time: Default::default(),
         }
     }
 }
@@ -49,10 +66,48 @@ impl AdaptiveTimeStepState {
     pub fn allowed_time_step(&self) -> f32 {
         once(self.allowed_time_step_without_prior())
             .chain(self.time_step_prior.iter().cloned())
+            .chain(self.remaining_time)
             .min_by(f32::total_cmp)
             .unwrap()
     }
 
+    // Whether the allowed time step ends exactly at the next frame.
+    pub fn reaches_frame(&self) -> bool {
+        self.remaining_time == Some(self.allowed_time_step())
+    }
+
+    // Which of the limits is the allowed time step, ties go to the first.
+    pub fn binding_limit(&self) -> TimeStepLimit {
+        let without_prior = self.allowed_time_step_without_prior();
+        if self.remaining_time.is_some_and(|remaining_time| {
+            remaining_time < without_prior
+                && self
+                    .time_step_prior
+                    .iter()
+                    .all(|&prior| remaining_time < prior)
+        }) {
+            return TimeStepLimit::Frame;
+        }
+        if self
+            .time_step_prior
+            .iter()
+            .any(|&prior| prior < without_prior)
+        {
+            return TimeStepLimit::Prior;
+        }
+        [
+            (TimeStepLimit::Velocity, self.time_step_by_velocity),
+            (TimeStepLimit::Deformation, self.time_step_by_deformation),
+            (TimeStepLimit::Sound, self.time_step_by_sound),
+            (TimeStepLimit::Isolated, self.time_step_by_isolated),
+        ]
+        .into_iter()
+        .find(|&(_, time_step)| {
+            time_step == Some(without_prior) && without_prior < self.max_time_step
+        })
+        .map_or(TimeStepLimit::Max, |(limit, _)| limit)
+    }
+
     pub fn push_current_limit(&mut self) {
         if self.time_step_prior.len() > TIME_STEP_HISTORY_LENGTH {
             self.time_step_prior.pop_front();
@@ -62,3 +117,79 @@ impl AdaptiveTimeStepState {
             .push_back(self.allowed_time_step_without_prior());
     }
 }
+
+#[cfg(test)]
+mod test {
+    use super::*;
+
+    fn state(max_time_step: f32) -> AdaptiveTimeStepState {
+        AdaptiveTimeStepState {
+            max_time_step,
+            ..Default::default()
+        }
+    }
+
+    #[test]
+    fn nothing_below_max() {
+        let mut state = state(0.01);
+        assert_eq!(state.binding_limit(), TimeStepLimit::Max);
+
+        state.time_step_by_velocity = Some(0.01);
+        assert_eq!(state.binding_limit(), TimeStepLimit::Max);
+    }
+
+    #[test]
+    fn ties_go_to_the_first() {
+        let mut state = state(0.01);
+        state.time_step_by_sound = Some(0.005);
+        state.time_step_by_isolated = Some(0.005);
+        assert_eq!(state.binding_limit(), TimeStepLimit::Sound);
+
+        state.time_step_by_deformation = Some(0.005);
+        assert_eq!(state.binding_limit(), TimeStepLimit::Deformation);
+
+        state.time_step_by_velocity = Some(0.005);
+        assert_eq!(state.binding_limit(), TimeStepLimit::Velocity);
+
+        state.time_step_by_velocity = Some(0.004);
+        assert_eq!(state.binding_limit(), TimeStepLimit::Velocity);
+        assert_eq!(state.allowed_time_step(), 0.004);
+    }
+
+    #[test]
+    fn prior_only_when_smaller() {
+        let mut state = state(0.01);
+        state.time_step_by_velocity = Some(0.005);
+        state.time_step_prior.push_back(0.005);
+        assert_eq!(state.binding_limit(), TimeStepLimit::Velocity);
+
+        state.time_step_prior.push_back(0.002);
+        assert_eq!(state.binding_limit(), TimeStepLimit::Prior);
+        assert_eq!(state.allowed_time_step(), 0.002);
+    }
+
+    #[test]
+    fn frame_only_when_smaller() {
+        let mut state = state(0.01);
+        state.time_step_prior.push_back(0.005);
+        state.remaining_time = Some(0.005);
+        assert_eq!(state.binding_limit(), TimeStepLimit::Prior);
+        assert!(state.reaches_frame());
+
+        state.remaining_time = Some(0.001);
+        assert_eq!(state.binding_limit(), TimeStepLimit::Frame);
+        assert!(state.reaches_frame());
+
+        state.remaining_time = Some(0.02);
+        assert_eq!(state.binding_limit(), TimeStepLimit::Prior);
+        assert!(!state.reaches_frame());
+    }
+
+    #[test]
+    fn history_leaves_out_the_frame() {
+        let mut state = state(0.01);
+        state.remaining_time = Some(0.001);
+        state.push_current_limit();
+        assert_eq!(state.time_step_prior, [0.01]);
+    }
+}
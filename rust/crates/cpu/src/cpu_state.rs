@@ -6,7 +6,7 @@
 // license that can be found in the LICENSE_MIT file or at
 // https://opensource.org/licenses/MIT.
 
-use std::num::NonZero;
+use std::{num::NonZero, time::Instant};
 
 use squishy_volumes_file_frame::{IoState, ParticleFlags};
 
@@ -16,8 +16,17 @@ pub struct CpuState {
     pub(crate) time: f64,
     pub(crate) adaptive_time_step_state: AdaptiveTimeStepState,
     pub(crate) phase: Phase,
+    pub(crate) particle_centric_scatter: bool,
     pub(crate) particles: Particles,
     pub(crate) grid_nodes: GridNodes,
+    pub(crate) stencils: Stencils,
+    pub(crate) collider_cells_frame: Option<usize>,
+    // Where the particles are in the input, if this is only part of the simulation.
+    pub(crate) input_indices: Option<Vec<u32>>,
+    // Instead of overshooting the target time by less than a substep,
+    // the last substep is cut short to end exactly there.
+    pub(crate) land_on_target_time: bool,
+    pub(crate) frame_stats: FrameStats,
 
     pub(crate) interpolated_input: Option<InterpolatedInput>,
 }
@@ -55,6 +64,8 @@ impl CpuState {
             velocity_gradients,
             elastic_energies,
             collider_bits,
+            position_gradient_singular_values: Default::default(),
+            collider_cells: Default::default(),
         };
 
         Ok(Self {
@@ -62,12 +73,33 @@ impl CpuState {
             particles,
 
             phase: Default::default(),
+            particle_centric_scatter: false,
             adaptive_time_step_state: Default::default(),
             grid_nodes: Default::default(),
+            stencils: Default::default(),
+            collider_cells_frame: None,
+            input_indices: None,
+            land_on_target_time: false,
+            frame_stats: Default::default(),
             interpolated_input: Default::default(),
         })
     }
 
+    pub(crate) fn with_input_indices(mut self, input_indices: Vec<u32>) -> Self {
+        self.input_indices = Some(input_indices);
+        self
+    }
+
+    pub(crate) fn landing_on_target_time(mut self) -> Self {
+        self.land_on_target_time = true;
+        self
+    }
+
+    // Of the last call to `produce_next_state`.
+    pub fn frame_stats(&self) -> &FrameStats {
+        &self.frame_stats
+    }
+
     pub fn to_io_state(&self, store_grid: bool) -> Result<IoState, Error> {
         let time = self.time;
 
@@ -135,10 +167,12 @@ impl CpuState {
     }
 }
 
+#[derive(Clone)]
 pub struct CpuRunParameters {
     pub target_time: f64,
     pub max_time_step: f32,
     pub adaptive_time_steps: bool,
+    pub particle_centric_scatter: bool,
     pub store_grid: bool,
 }
 
@@ -151,6 +185,7 @@ impl CpuState {
             target_time,
             max_time_step,
             adaptive_time_steps,
+            particle_centric_scatter,
             store_grid,
         }: CpuRunParameters,
     ) -> Result<(squishy_volumes_file_frame::IoState, Result<(), Error>), Error> {
@@ -163,10 +198,17 @@ impl CpuState {
         )?;
 
         self.adaptive_time_step_state.max_time_step = max_time_step;
+        self.particle_centric_scatter = particle_centric_scatter;
+        self.frame_stats = Default::default();
 
         while self.time < target_time {
             harness.check()?;
 
+            if self.land_on_target_time {
+                self.adaptive_time_step_state.remaining_time =
+                    Some((target_time - self.time) as f32);
+            }
+
             if self.adaptive_time_step_state.allowed_time_step() == 0. {
                 return Err(Error::ZeroTimeStep);
             }
@@ -175,7 +217,13 @@ impl CpuState {
                 || (self.phase != Phase::LimitTimeStepBeforeForce
                     && self.phase != Phase::LimitTimeStepBeforeIntegrate);
             if run_phase {
-                match self.run_phase(frame_input) {
+                let phase_name: &'static str = self.phase.into();
+                let _span = tracing::debug_span!("phase", label = phase_name).entered();
+                let start_phase = Instant::now();
+                let phase_result = self.run_phase(frame_input);
+                self.frame_stats
+                    .add_phase_duration(phase_name, start_phase.elapsed());
+                match phase_result {
                     error @ Err(Error::EnergyError(energy_error)) => {
                         tracing::warn!(?energy_error, "Encountered an energy error.");
                         return Ok((self.to_io_state(store_grid)?, error));
@@ -186,13 +234,22 @@ impl CpuState {
 
             self.phase = self.phase.cycle();
             if self.phase == Default::default() {
-                self.time += self.adaptive_time_step_state.allowed_time_step() as f64;
+                self.frame_stats.substeps += 1;
+                self.frame_stats
+                    .add_time_step_limit(self.adaptive_time_step_state.binding_limit().into(), 1);
+                // rounding must not leave a tiny substep behind
+                self.time = if self.adaptive_time_step_state.reaches_frame() {
+                    target_time
+                } else {
+                    self.time + self.adaptive_time_step_state.allowed_time_step() as f64
+                };
             }
             harness.step_to(
                 ((self.time % frame_input.consts().seconds_per_frame()) * 1000.) as usize,
             )?;
         }
 
+        self.adaptive_time_step_state.remaining_time = None;
         Ok((self.to_io_state(store_grid)?, Ok(())))
     }
 }
@@ -0,0 +1,102 @@
+// SPDX-License-Identifier: MIT
+//
+// Copyright 2025  Algebraic UG (haftungsbeschränkt)
+//
+// Use of this source code is governed by an MIT-style
+// license that can be found in the LICENSE_MIT file or at
+// https://opensource.org/licenses/MIT.
+
+use std::time::Duration;
+
+// Unlike `profile!`, this is always recorded, so it's kept to a few counters per phase.
+#[derive(Clone, Debug, Default)]
+pub struct FrameStats {
+    pub substeps: usize,
+    // wall-clock time in the order the phases ran first, skipped phases are missing
+    pub phase_durations: Vec<(&'static str, Duration)>,
+    // how many substeps each limit was the binding one
+    pub time_step_limits: Vec<(&'static str, usize)>,
+}
+
+impl FrameStats {
+    pub(crate) fn add_phase_duration(&mut self, phase: &'static str, duration: Duration) {
+        match self.phase_durations.iter_mut().find(|(p, _)| *p == phase) {
+            Some((_, total)) => *total += duration,
+            None => self.phase_durations.push((phase, duration)),
+        }
+    }
+
+    pub(crate) fn add_time_step_limit(&mut self, limit: &'static str, substeps: usize) {
+        match self.time_step_limits.iter_mut().find(|(l, _)| *l == limit) {
+            Some((_, total)) => *total += substeps,
+            None => self.time_step_limits.push((limit, substeps)),
+        }
+    }
+
+    // Of parts of the simulation that step independently,
+    // the substeps are those of the finest part, everything else adds up.
+    pub(crate) fn combine(&mut self, other: &Self) {
+        self.substeps = self.substeps.max(other.substeps);
+        for &(phase, duration) in &other.phase_durations {
+            self.add_phase_duration(phase, duration);
+        }
+        for &(limit, substeps) in &other.time_step_limits {
+            self.add_time_step_limit(limit, substeps);
+        }
+    }
+}
+
+#[cfg(test)]
+mod test {
+    use super::*;
+
+    fn island(
+        substeps: usize,
+        phases: &[(&'static str, u64)],
+        limits: &[(&'static str, usize)],
+    ) -> FrameStats {
+        let mut frame_stats = FrameStats {
+            substeps,
+            ..Default::default()
+        };
+        for &(phase, millis) in phases {
+            frame_stats.add_phase_duration(phase, Duration::from_millis(millis));
+        }
+        for &(limit, substeps) in limits {
+            frame_stats.add_time_step_limit(limit, substeps);
+        }
+        frame_stats
+    }
+
+    #[test]
+    fn combine_two_islands() {
+        let mut combined = island(3, &[("scatter", 5), ("gather", 2)], &[("Max", 3)]);
+        combined.combine(&island(
+            7,
+            &[("gather", 4), ("collide", 1)],
+            &[("Velocity", 6), ("Max", 1)],
+        ));
+
+        assert_eq!(combined.substeps, 7);
+        assert_eq!(
+            combined.phase_durations,
+            [
+                ("scatter", Duration::from_millis(5)),
+                ("gather", Duration::from_millis(6)),
+                ("collide", Duration::from_millis(1)),
+            ]
+        );
+        assert_eq!(combined.time_step_limits, [("Max", 4), ("Velocity", 6)]);
+    }
+
+    #[test]
+    fn combine_into_empty() {
+        let other = island(2, &[("scatter", 1)], &[("Sound", 2)]);
+        let mut combined = FrameStats::default();
+        combined.combine(&other);
+
+        assert_eq!(combined.substeps, other.substeps);
+        assert_eq!(combined.phase_durations, other.phase_durations);
+        assert_eq!(combined.time_step_limits, other.time_step_limits);
+    }
+}
@@ -9,11 +9,14 @@
 mod adaptive_time_step_state;
 mod cpu_state;
 mod errors;
+mod frame_stats;
 mod grid_nodes;
 mod interpolated_input;
 mod kernels;
+mod multi_rate;
 mod particles;
 mod phase;
+mod stencils;
 
 use adaptive_time_step_state::*;
 use grid_nodes::*;
@@ -21,6 +24,9 @@ use interpolated_input::*;
 pub use kernels::*;
 use particles::*;
 use phase::*;
+use stencils::*;
 
 pub use cpu_state::{CpuRunParameters, CpuState};
 pub use errors::*;
+pub use frame_stats::FrameStats;
+pub use multi_rate::MultiRateState;
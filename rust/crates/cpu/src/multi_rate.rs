@@ -0,0 +1,292 @@
+// SPDX-License-Identifier: MIT
+//
+// Copyright 2025  Algebraic UG (haftungsbeschränkt)
+//
+// Use of this source code is governed by an MIT-style
+// license that can be found in the LICENSE_MIT file or at
+// https://opensource.org/licenses/MIT.
+
+use nalgebra::Vector3;
+use rustc_hash::FxHashMap;
+use squishy_volumes_file_frame::{GridNodes, IoState, ParticleFlags, Particles};
+use squishy_volumes_util::profile;
+use squishy_volumes_xpu::{FrameInput, Harness};
+use tracing::info;
+
+use super::*;
+
+// A particle only touches grid nodes within 1.5 grid nodes,
+// so particles further apart than this can't share a grid node.
+const INTERACTION_DISTANCE_IN_GRID_NODES: f32 = 3.;
+// The distance a group can travel within a frame is only estimated.
+const REACH_SAFETY_FACTOR: f32 = 2.;
+// Beyond this, finding the islands costs more than it saves.
+const MAX_GROUPS: usize = 256;
+// Smaller islands are stepped together, they are cheap anyway.
+const MIN_ISLAND_PARTICLES: usize = 1000;
+
+// Groups of particles that can't share grid nodes until the next frame
+// don't interact at all, so each of these islands steps with its own adaptive time step.
+// They are synchronized at every frame, where the islands are found again,
+// so each of them cuts its last substep short to end exactly at the frame.
+pub struct MultiRateState {
+    num_particles: usize,
+    islands: Vec<Island>,
+    frame_stats: FrameStats,
+}
+
+struct Island {
+    // into the particles of the whole simulation
+    indices: Vec<u32>,
+    state: CpuState,
+}
+
+impl MultiRateState {
+    pub fn from_io_state(io_state: IoState, frame_input: &FrameInput) -> Result<Self, Error> {
+        profile!("find_islands");
+        let num_particles = io_state.particles.flags.len();
+        let islands = find_islands(&io_state, frame_input)
+            .into_iter()
+            .map(|indices| {
+                let state = CpuState::from_io_state(IoState {
+                    time: io_state.time,
+                    particles: select_particles(&io_state.particles, &indices),
+                    grid_nodes: None,
+                })?
+                .with_input_indices(indices.clone())
+                .landing_on_target_time();
+                Ok(Island { indices, state })
+            })
+            .collect::<Result<Vec<_>, Error>>()?;
+        info!(
+            islands = ?islands.iter().map(|island| island.indices.len()).collect::<Vec<_>>(),
+            "multi-rate islands"
+        );
+        Ok(Self {
+            num_particles,
+            islands,
+            frame_stats: Default::default(),
+        })
+    }
+
+    pub fn produce_next_state(
+        &mut self,
+        harness: &Harness,
+        frame_input: &FrameInput,
+        parameters: CpuRunParameters,
+    ) -> Result<(IoState, Result<(), Error>), Error> {
+        let mut result = Ok(());
+        let mut io_states = Vec::with_capacity(self.islands.len());
+        let mut frame_stats = FrameStats::default();
+        for island in &mut self.islands {
+            let (io_state, island_result) =
+                island
+                    .state
+                    .produce_next_state(harness, frame_input, parameters.clone())?;
+            frame_stats.combine(island.state.frame_stats());
+            if result.is_ok() {
+                result = island_result;
+            }
+            io_states.push(io_state);
+        }
+
+        let io_state = self.merge(io_states, parameters.store_grid);
+        // the islands might have come closer
+        *self = Self::from_io_state(io_state.clone(), frame_input)?;
+        self.frame_stats = frame_stats;
+        Ok((io_state, result))
+    }
+
+    // Of the last call to `produce_next_state`, summed over the islands.
+    pub fn frame_stats(&self) -> &FrameStats {
+        &self.frame_stats
+    }
+
+    fn merge(&self, io_states: Vec<IoState>, store_grid: bool) -> IoState {
+        let mut particles = Particles::default();
+        let mut grid_nodes = store_grid.then(GridNodes::default);
+        let mut time: f64 = 0.;
+
+        let (islands, num_particles) = (&self.islands, self.num_particles);
+        macro_rules! scatter {
+            ($($field:ident),*) => {
+                $(particles.$field = vec![Default::default(); num_particles];)*
+                for (island, io_state) in islands.iter().zip(&io_states) {
+                    for (local, &index) in island.indices.iter().enumerate() {
+                        $(particles.$field[index as usize] = io_state.particles.$field[local];)*
+                    }
+                }
+            };
+        }
+        scatter!(
+            flags,
+            parameters,
+            elastic_energies,
+            collider_bits,
+            positions,
+            position_gradients,
+            velocities,
+            velocity_gradients,
+            initial_positions
+        );
+
+        for io_state in io_states {
+            // the islands all land on the frame, unless one stopped early with an error
+            time = time.max(io_state.time);
+            if let (Some(grid_nodes), Some(island_grid_nodes)) =
+                (grid_nodes.as_mut(), io_state.grid_nodes)
+            {
+                grid_nodes.node_ids.extend(island_grid_nodes.node_ids);
+                grid_nodes
+                    .collider_bits
+                    .extend(island_grid_nodes.collider_bits);
+                grid_nodes.masses.extend(island_grid_nodes.masses);
+                grid_nodes.velocites.extend(island_grid_nodes.velocites);
+            }
+        }
+
+        IoState {
+            time,
+            particles,
+            grid_nodes,
+        }
+    }
+}
+
+fn select_particles(particles: &Particles, indices: &[u32]) -> Particles {
+    macro_rules! select {
+        ($($field:ident),*) => {
+            Particles {
+                $($field: indices.iter().map(|&i| particles.$field[i as usize]).collect(),)*
+            }
+        };
+    }
+    select!(
+        flags,
+        parameters,
+        elastic_energies,
+        collider_bits,
+        positions,
+        position_gradients,
+        velocities,
+        velocity_gradients,
+        initial_positions
+    )
+}
+
+struct Group {
+    indices: Vec<u32>,
+    min: Vector3<f32>,
+    max: Vector3<f32>,
+    // how far it could get until the next frame, including half the interaction distance
+    reach: f32,
+}
+
+impl Group {
+    fn overlaps(&self, other: &Self) -> bool {
+        let margin = self.reach + other.reach;
+        (0..3).all(|i| self.min[i] - margin <= other.max[i] && other.min[i] - margin <= self.max[i])
+    }
+
+    fn absorb(&mut self, other: Self) {
+        self.indices.extend(other.indices);
+        self.min = self.min.inf(&other.min);
+        self.max = self.max.sup(&other.max);
+        self.reach = self.reach.max(other.reach);
+    }
+}
+
+fn find_islands(io_state: &IoState, frame_input: &FrameInput) -> Vec<Vec<u32>> {
+    let particles = &io_state.particles;
+    let everything = || vec![(0..particles.flags.len() as u32).collect()];
+
+    let grid_node_size = frame_input.consts().scaled_grid_node_size();
+    let interaction_distance = INTERACTION_DISTANCE_IN_GRID_NODES * grid_node_size;
+    let frame_time = frame_input.consts().seconds_per_frame() as f32;
+    let gravity = frame_input.a().gravity().norm();
+
+    let (alive, tombstoned): (Vec<u32>, Vec<u32>) = (0..particles.flags.len() as u32)
+        .partition(|&i| !particles.flags[i as usize].contains(ParticleFlags::TOMBSTONED));
+
+    // particles in the same or neighboring cells could interact right away
+    let cell_of = |i: u32| {
+        Vector3::from(particles.positions[i as usize])
+            .map(|c| (c / interaction_distance).floor() as i32)
+    };
+    let mut cells: FxHashMap<Vector3<i32>, usize> = Default::default();
+    for &i in &alive {
+        let next = cells.len();
+        cells.entry(cell_of(i)).or_insert(next);
+    }
+    let mut parents: Vec<usize> = (0..cells.len()).collect();
+    fn root(parents: &mut [usize], mut i: usize) -> usize {
+        while parents[i] != i {
+            parents[i] = parents[parents[i]];
+            i = parents[i];
+        }
+        i
+    }
+    for (cell, &index) in &cells {
+        for offset in (0..27).map(|n| Vector3::new(n / 9 - 1, n / 3 % 3 - 1, n % 3 - 1)) {
+            if let Some(&neighbor) = cells.get(&(cell + offset)) {
+                let (a, b) = (root(&mut parents, index), root(&mut parents, neighbor));
+                parents[a] = b;
+            }
+        }
+    }
+
+    let mut groups: FxHashMap<usize, Group> = Default::default();
+    for &i in &alive {
+        let group_root = root(&mut parents, cells[&cell_of(i)]);
+        let position = Vector3::from(particles.positions[i as usize]);
+        let speed = Vector3::from(particles.velocities[i as usize]).norm();
+        let reach = REACH_SAFETY_FACTOR * (speed * frame_time + gravity * frame_time.powi(2) / 2.)
+            + interaction_distance / 2.;
+        let group = groups.entry(group_root).or_insert_with(|| Group {
+            indices: Vec::new(),
+            min: position,
+            max: position,
+            reach,
+        });
+        group.indices.push(i);
+        group.min = group.min.inf(&position);
+        group.max = group.max.sup(&position);
+        group.reach = group.reach.max(reach);
+    }
+    if groups.len() <= 1 || groups.len() > MAX_GROUPS {
+        return everything();
+    }
+
+    // groups that might meet before the next frame are stepped together
+    let mut groups: Vec<Group> = groups.into_values().collect();
+    let mut merged = true;
+    while merged {
+        merged = false;
+        let mut i = 0;
+        while i < groups.len() {
+            if let Some(j) = (i + 1..groups.len()).find(|&j| groups[i].overlaps(&groups[j])) {
+                let other = groups.swap_remove(j);
+                groups[i].absorb(other);
+                merged = true;
+            } else {
+                i += 1;
+            }
+        }
+    }
+
+    // merging never hurts correctness, only the time steps
+    let (mut islands, small): (Vec<Vec<u32>>, Vec<Vec<u32>>) = groups
+        .into_iter()
+        .map(|group| group.indices)
+        .partition(|indices| indices.len() >= MIN_ISLAND_PARTICLES);
+    let small: Vec<u32> = small.into_iter().flatten().collect();
+    if !small.is_empty() {
+        islands.push(small);
+    }
+    if islands.len() <= 1 {
+        return everything();
+    }
+    // tombstoned particles don't do anything, any island will do
+    islands[0].extend(tombstoned);
+    islands
+}
@@ -28,4 +28,13 @@ pub struct Particles {
 
     pub elastic_energies: Vec<f32>,
     pub collider_bits: Vec<u32>,
+
+    // The singular values of the position gradients as left by `advance_particles`,
+    // `None` where it did not need a decomposition. Empty until the first advance.
+    pub position_gradient_singular_values: Vec<Option<Vector3<f32>>>,
+
+    // The leaf each particle was in during the last collision
+    // and its cell in the narrow band, `u32::MAX` if outside.
+    // Only valid for the frame in `CpuState::collider_cells_frame`.
+    pub collider_cells: Vec<(Vector3<i32>, u32)>,
 }
@@ -9,7 +9,9 @@
 use nalgebra::Vector3;
 use rayon::iter::{IndexedParallelIterator, IntoParallelRefMutIterator, ParallelIterator};
 use squishy_volumes_file_frame::{ParticleFlags, SpecificParticleParameters};
-use squishy_volumes_util::{elastic_energy_inviscid, profile, try_elastic_energy_neo_hookean};
+use squishy_volumes_util::{
+    elastic_energy_inviscid, profile, svd3, try_elastic_energy_neo_hookean,
+};
 
 use super::*;
 
@@ -18,6 +20,9 @@ impl CpuState {
         profile!("advance_particles");
 
         let time_step = self.adaptive_time_step_state.allowed_time_step();
+        self.particles
+            .position_gradient_singular_values
+            .resize(self.particles.position_gradients.len(), None);
         self.particles
             .elastic_energies
             .par_iter_mut()
@@ -27,18 +32,26 @@ impl CpuState {
             .zip(&self.particles.velocities)
             .zip(&self.particles.velocity_gradients)
             .zip(&mut self.particles.flags)
-            .filter(|(_, flags)| !flags.contains(ParticleFlags::TOMBSTONED))
+            .zip(&mut self.particles.position_gradient_singular_values)
+            .filter(|((_, flags), _)| !flags.contains(ParticleFlags::TOMBSTONED))
             .try_for_each(
                 |(
                     (
-                        ((((elastic_energy, parameters), position), position_gradient), velocity),
-                        velocity_gradient,
+                        (
+                            (
+                                (((elastic_energy, parameters), position), position_gradient),
+                                velocity,
+                            ),
+                            velocity_gradient,
+                        ),
+                        flags,
                     ),
-                    flags,
+                    cached_singular_values,
                 )|
                  -> Result<(), Error> {
                     *position += velocity * time_step;
                     *position_gradient += velocity_gradient * *position_gradient * time_step;
+                    *cached_singular_values = None;
 
                     *elastic_energy = match parameters.specific {
                         SpecificParticleParameters::Solid {
@@ -48,7 +61,7 @@ impl CpuState {
                             ..
                         } => {
                             if let Some(alpha) = sand_alpha {
-                                let mut svd = position_gradient.svd(true, true);
+                                let mut svd = svd3(position_gradient);
                                 let e = svd.singular_values.map(f32::ln);
                                 let e_tr = e.sum();
                                 let e_hat = e - Vector3::repeat(e_tr / 3.);
@@ -62,12 +75,14 @@ impl CpuState {
                                             let big_h = e - delta_gamma / e_hat_norm * e_hat;
                                             svd.singular_values = big_h.map(f32::exp);
 
-                                            *position_gradient = svd.recompose().unwrap();
+                                            *position_gradient = svd.recompose();
                                         }
                                     }
                                 } else {
-                                    *position_gradient = svd.u.unwrap() * svd.v_t.unwrap();
+                                    svd.singular_values = Vector3::repeat(1.);
+                                    *position_gradient = svd.u * svd.v_t;
                                 }
+                                *cached_singular_values = Some(svd.singular_values);
                             }
 
                             try_elastic_energy_neo_hookean(mu, lambda, position_gradient)
@@ -78,10 +93,11 @@ impl CpuState {
                             bulk_modulus,
                             ..
                         } => {
-                            let mut svd = position_gradient.svd(true, true);
+                            let mut svd = svd3(position_gradient);
                             svd.singular_values
                                 .fill(svd.singular_values.product().powf(1. / 3.));
-                            *position_gradient = svd.recompose().unwrap();
+                            *position_gradient = svd.recompose();
+                            *cached_singular_values = Some(svd.singular_values);
                             elastic_energy_inviscid(bulk_modulus, exponent, position_gradient)
                         }
                     };
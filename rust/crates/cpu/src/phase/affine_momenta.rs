@@ -0,0 +1,148 @@
+// SPDX-License-Identifier: MIT
+//
+// Copyright 2025  Algebraic UG (haftungsbeschränkt)
+//
+// Use of this source code is governed by an MIT-style
+// license that can be found in the LICENSE_MIT file or at
+// https://opensource.org/licenses/MIT.
+
+use std::array::from_fn;
+
+use nalgebra::Matrix3;
+use rayon::{
+    iter::{IndexedParallelIterator, ParallelIterator},
+    slice::ParallelSliceMut as _,
+};
+use squishy_volumes_file_frame::{ParticleFlags, SpecificParticleParameters, ViscosityParameters};
+use squishy_volumes_util::{
+    LANES, Matrix3Lanes, cauchy_stress_general_viscosity_lanes, first_piola_stress_inviscid_lanes,
+    first_piola_stress_neo_hookean_lanes, profile,
+};
+
+use super::*;
+
+// The particles are sorted by cell, not by material,
+// so each chunk groups its particles by material before evaluating them in lanes.
+const PARTICLES_PER_CHUNK: usize = 1024;
+
+impl CpuState {
+    // The momentum a particle imparts on a grid node is
+    // `(velocity * mass + affine_momentum * to_grid_node) * weight`,
+    // where the affine momentum contains the APIC term and the stresses.
+    // This doesn't depend on the grid node, so it's evaluated once per particle.
+    pub(super) fn affine_momenta(&self, scaling: f32) -> Vec<Matrix3<f32>> {
+        profile!("affine_momenta");
+        let particles = &self.particles;
+        let mut affine_momenta = vec![Matrix3::zeros(); particles.positions.len()];
+        affine_momenta
+            .par_chunks_mut(PARTICLES_PER_CHUNK)
+            .enumerate()
+            .for_each(|(chunk, affine_momenta)| {
+                let offset = chunk * PARTICLES_PER_CHUNK;
+
+                let mut solids = Vec::new();
+                let mut fluids = Vec::new();
+                let mut viscous = Vec::new();
+                for (particle_idx, affine_momentum) in affine_momenta
+                    .iter_mut()
+                    .enumerate()
+                    .map(|(i, affine_momentum)| (offset + i, affine_momentum))
+                {
+                    if particles.flags[particle_idx].contains(ParticleFlags::TOMBSTONED) {
+                        continue;
+                    }
+                    let parameters = &particles.parameters[particle_idx];
+                    *affine_momentum = particles.velocity_gradients[particle_idx] * parameters.mass;
+                    match parameters.specific {
+                        SpecificParticleParameters::Solid { .. } => solids.push(particle_idx),
+                        SpecificParticleParameters::Fluid { .. } => fluids.push(particle_idx),
+                    }
+                    if parameters.viscosity.is_some() {
+                        viscous.push(particle_idx);
+                    }
+                }
+
+                // the unused lanes are filled with the last particle, their results are dropped
+                let position_gradients = |batch: &[usize]| {
+                    Matrix3Lanes::from_fn(|l| {
+                        particles.position_gradients[batch[l.min(batch.len() - 1)]]
+                    })
+                };
+                let parameters = |batch: &[usize], l: usize| {
+                    &particles.parameters[batch[l.min(batch.len() - 1)]]
+                };
+                let mut subtract_stresses = |batch: &[usize], stresses: Matrix3Lanes| {
+                    for (l, &particle_idx) in batch.iter().enumerate() {
+                        let position_gradient = &particles.position_gradients[particle_idx];
+                        affine_momenta[particle_idx - offset] -= stresses.lane(l)
+                            * position_gradient.transpose()
+                            * (scaling * particles.parameters[particle_idx].initial_volume);
+                    }
+                };
+
+                for batch in solids.chunks(LANES) {
+                    let (mu, lambda) = (
+                        from_fn(|l| match parameters(batch, l).specific {
+                            SpecificParticleParameters::Solid { mu, .. } => mu,
+                            SpecificParticleParameters::Fluid { .. } => unreachable!(),
+                        }),
+                        from_fn(|l| match parameters(batch, l).specific {
+                            SpecificParticleParameters::Solid { lambda, .. } => lambda,
+                            SpecificParticleParameters::Fluid { .. } => unreachable!(),
+                        }),
+                    );
+                    let stresses = first_piola_stress_neo_hookean_lanes(
+                        &mu,
+                        &lambda,
+                        &position_gradients(batch),
+                    );
+                    subtract_stresses(batch, stresses);
+                }
+
+                for batch in fluids.chunks(LANES) {
+                    let (bulk_modulus, exponent) = (
+                        from_fn(|l| match parameters(batch, l).specific {
+                            SpecificParticleParameters::Fluid { bulk_modulus, .. } => bulk_modulus,
+                            SpecificParticleParameters::Solid { .. } => unreachable!(),
+                        }),
+                        from_fn(|l| match parameters(batch, l).specific {
+                            SpecificParticleParameters::Fluid { exponent, .. } => exponent,
+                            SpecificParticleParameters::Solid { .. } => unreachable!(),
+                        }),
+                    );
+                    let stresses = first_piola_stress_inviscid_lanes(
+                        &bulk_modulus,
+                        &exponent,
+                        &position_gradients(batch),
+                    );
+                    subtract_stresses(batch, stresses);
+                }
+
+                for batch in viscous.chunks(LANES) {
+                    let viscosities = |l| {
+                        let Some(ViscosityParameters { dynamic, bulk }) =
+                            parameters(batch, l).viscosity
+                        else {
+                            unreachable!()
+                        };
+                        [dynamic, bulk]
+                    };
+                    let cauchy_stresses = cauchy_stress_general_viscosity_lanes(
+                        &from_fn(|l| viscosities(l)[0]),
+                        &from_fn(|l| viscosities(l)[1]),
+                        &Matrix3Lanes::from_fn(|l| {
+                            particles.velocity_gradients[batch[l.min(batch.len() - 1)]]
+                        }),
+                    );
+                    for (l, &particle_idx) in batch.iter().enumerate() {
+                        let parameters = &particles.parameters[particle_idx];
+                        affine_momenta[particle_idx - offset] -= cauchy_stresses.lane(l)
+                            * (scaling
+                                * particles.position_gradients[particle_idx].determinant()
+                                * parameters.initial_volume);
+                    }
+                }
+            });
+        affine_momenta
+    }
+}
@@ -42,166 +42,191 @@ impl CpuState {
             .as_ref()
             .expect("no input interpolated");
 
+        // the narrow band is rebuilt when a new frame is loaded
+        if self.collider_cells_frame != Some(frame_input.frame())
+            || self.particles.collider_cells.len() != self.particles.positions.len()
+        {
+            self.collider_cells_frame = Some(frame_input.frame());
+            self.particles.collider_cells =
+                vec![(Vector3::repeat(i32::MIN), u32::MAX); self.particles.positions.len()];
+        }
+
+        let narrow_band = frame_input.narrow_band();
         self.particles
             .positions
             .par_iter()
             .zip(&mut self.particles.velocities)
             .zip(&mut self.particles.collider_bits)
+            .zip(&mut self.particles.collider_cells)
             .zip(&self.particles.flags)
             .filter_map(|(e, flags)| (!flags.contains(ParticleFlags::TOMBSTONED)).then_some(e))
-            .for_each(|((p, velocity), collider_bits)| {
-                let leaf = p.map(|c| (c / frame_input.consts().leaf_size).floor() as i32);
-                let triangles_to_check = frame_input.bvh().query(&leaf);
-                if triangles_to_check.is_empty() {
-                    *collider_bits = 0;
-                    return;
-                }
-
-                let mut closest_triangle_per_collider: [u32; 16] = [u32::MAX; 16];
-                let mut min_distance_per_collider: [f32; 16] = [f32::MAX; 16];
-
-                for triangle_index in triangles_to_check {
-                    let n = &triangle_normals[*triangle_index as usize];
-                    if *n == Vector3::zeros() {
-                        continue;
+            .for_each(
+                |(((p, velocity), collider_bits), (cached_leaf, cell_index))| {
+                    // particles rarely leave their leaf between substeps
+                    let leaf = p.map(|c| (c / frame_input.consts().leaf_size).floor() as i32);
+                    if *cached_leaf != leaf {
+                        *cached_leaf = leaf;
+                        *cell_index = narrow_band.cell_index(&leaf).unwrap_or(u32::MAX);
                     }
+                    if *cell_index == u32::MAX {
+                        *collider_bits = 0;
+                        return;
+                    }
+                    let (triangles_to_check, lower_bounds) = narrow_band.cell(*cell_index);
 
-                    let Triangle { a, b, c } = &triangle_indices[*triangle_index as usize];
+                    let mut closest_triangle_per_collider: [u32; 16] = [u32::MAX; 16];
+                    let mut min_distance_per_collider: [f32; 16] = [f32::MAX; 16];
 
-                    let distance = distance_to_triangle(
-                        p,
-                        &vertex_positions[*a as usize],
-                        &vertex_positions[*b as usize],
-                        &vertex_positions[*c as usize],
-                        n,
-                    );
+                    for (triangle_index, lower_bound) in triangles_to_check.iter().zip(lower_bounds)
+                    {
+                        let collider = triangle_collider[*triangle_index as usize] as usize;
+                        // can't be closer than what we already have
+                        if *lower_bound >= min_distance_per_collider[collider] {
+                            continue;
+                        }
 
-                    if distance >= frame_input.consts().forget_distance() {
-                        continue;
-                    }
+                        let n = &triangle_normals[*triangle_index as usize];
+                        if *n == Vector3::zeros() {
+                            continue;
+                        }
 
-                    let collider = triangle_collider[*triangle_index as usize] as usize;
-                    if distance < min_distance_per_collider[collider] {
-                        min_distance_per_collider[collider] = distance;
-                        closest_triangle_per_collider[collider] = *triangle_index;
-                    }
-                }
-
-                for (collider, closest_triangle) in
-                    closest_triangle_per_collider.into_iter().enumerate()
-                {
-                    if closest_triangle == u32::MAX {
-                        collider_bits::set(collider_bits, collider, None);
-                        continue;
-                    }
-                    let closest_triangle = closest_triangle as usize;
-
-                    let triangle = &triangle_indices[closest_triangle];
-
-                    let opps = &triangle_opposites[closest_triangle];
-                    let n = &triangle_normals[closest_triangle];
-                    let a = &vertex_positions[triangle.a as usize];
-                    let b = &vertex_positions[triangle.b as usize];
-                    let c = &vertex_positions[triangle.c as usize];
-                    let a_v = &vertex_velocities[triangle.a as usize];
-                    let b_v = &vertex_velocities[triangle.b as usize];
-                    let c_v = &vertex_velocities[triangle.c as usize];
-                    let a_n = &vertex_normals[triangle.a as usize];
-                    let b_n = &vertex_normals[triangle.b as usize];
-                    let c_n = &vertex_normals[triangle.c as usize];
-                    let ab_n = if opps.ab != u32::MAX {
-                        n + triangle_normals[opps.ab as usize]
-                    } else {
-                        Vector3::zeros()
-                    };
-                    let bc_n = if opps.bc != u32::MAX {
-                        n + triangle_normals[opps.bc as usize]
-                    } else {
-                        Vector3::zeros()
-                    };
-                    let ca_n = if opps.ca != u32::MAX {
-                        n + triangle_normals[opps.ca as usize]
-                    } else {
-                        Vector3::zeros()
-                    };
-
-                    let ab = a - b;
-                    let bc = b - c;
-                    let ca = c - a;
-
-                    let area2_abc = n.dot(&ca.cross(&ab));
-
-                    let a_bary = n.dot(&bc.cross(&(c - p))) / area2_abc;
-                    let b_bary = n.dot(&ca.cross(&(a - p))) / area2_abc;
-                    let c_bary = n.dot(&ab.cross(&(b - p))) / area2_abc;
-
-                    let sa = a_bary > 0.;
-                    let sb = b_bary > 0.;
-                    let sc = c_bary > 0.;
-
-                    let DistanceResult {
-                        distance,
-                        to_p,
-                        normal,
-                    } = if sa && sb && sc {
-                        DistanceResult {
-                            distance: (p - a).dot(n).abs(),
-                            to_p: n * (p - a).dot(n),
-                            normal: *n,
+                        let Triangle { a, b, c } = &triangle_indices[*triangle_index as usize];
+
+                        let distance = distance_to_triangle(
+                            p,
+                            &vertex_positions[*a as usize],
+                            &vertex_positions[*b as usize],
+                            &vertex_positions[*c as usize],
+                            n,
+                        );
+
+                        if distance >= frame_input.consts().forget_distance() {
+                            continue;
+                        }
+
+                        if distance < min_distance_per_collider[collider] {
+                            min_distance_per_collider[collider] = distance;
+                            closest_triangle_per_collider[collider] = *triangle_index;
                         }
-                    } else {
-                        [
-                            segment_distance_result(p, a, b, a_n, &ab_n, b_n),
-                            segment_distance_result(p, b, c, b_n, &bc_n, c_n),
-                            segment_distance_result(p, c, a, c_n, &ca_n, a_n),
-                        ]
-                        .into_iter()
-                        .min_by(|a, b| a.distance.total_cmp(&b.distance))
-                        .unwrap()
-                    };
-
-                    if normal == Vector3::zeros() {
-                        collider_bits::set(collider_bits, collider, None);
-                        continue;
                     }
 
-                    let new_side = 0. <= to_p.dot(&normal);
-                    let Some(prior_side) = collider_bits::get(*collider_bits, collider) else {
-                        if distance < frame_input.consts().accept_distance() {
-                            collider_bits::set(collider_bits, collider, Some(new_side));
+                    for (collider, closest_triangle) in
+                        closest_triangle_per_collider.into_iter().enumerate()
+                    {
+                        if closest_triangle == u32::MAX {
+                            collider_bits::set(collider_bits, collider, None);
+                            continue;
+                        }
+                        let closest_triangle = closest_triangle as usize;
+
+                        let triangle = &triangle_indices[closest_triangle];
+
+                        let opps = &triangle_opposites[closest_triangle];
+                        let n = &triangle_normals[closest_triangle];
+                        let a = &vertex_positions[triangle.a as usize];
+                        let b = &vertex_positions[triangle.b as usize];
+                        let c = &vertex_positions[triangle.c as usize];
+                        let a_v = &vertex_velocities[triangle.a as usize];
+                        let b_v = &vertex_velocities[triangle.b as usize];
+                        let c_v = &vertex_velocities[triangle.c as usize];
+                        let a_n = &vertex_normals[triangle.a as usize];
+                        let b_n = &vertex_normals[triangle.b as usize];
+                        let c_n = &vertex_normals[triangle.c as usize];
+                        let ab_n = if opps.ab != u32::MAX {
+                            n + triangle_normals[opps.ab as usize]
+                        } else {
+                            Vector3::zeros()
+                        };
+                        let bc_n = if opps.bc != u32::MAX {
+                            n + triangle_normals[opps.bc as usize]
+                        } else {
+                            Vector3::zeros()
+                        };
+                        let ca_n = if opps.ca != u32::MAX {
+                            n + triangle_normals[opps.ca as usize]
+                        } else {
+                            Vector3::zeros()
+                        };
+
+                        let ab = a - b;
+                        let bc = b - c;
+                        let ca = c - a;
+
+                        let area2_abc = n.dot(&ca.cross(&ab));
+
+                        let a_bary = n.dot(&bc.cross(&(c - p))) / area2_abc;
+                        let b_bary = n.dot(&ca.cross(&(a - p))) / area2_abc;
+                        let c_bary = n.dot(&ab.cross(&(b - p))) / area2_abc;
+
+                        let sa = a_bary > 0.;
+                        let sb = b_bary > 0.;
+                        let sc = c_bary > 0.;
+
+                        let DistanceResult {
+                            distance,
+                            to_p,
+                            normal,
+                        } = if sa && sb && sc {
+                            DistanceResult {
+                                distance: (p - a).dot(n).abs(),
+                                to_p: n * (p - a).dot(n),
+                                normal: *n,
+                            }
+                        } else {
+                            [
+                                segment_distance_result(p, a, b, a_n, &ab_n, b_n),
+                                segment_distance_result(p, b, c, b_n, &bc_n, c_n),
+                                segment_distance_result(p, c, a, c_n, &ca_n, a_n),
+                            ]
+                            .into_iter()
+                            .min_by(|a, b| a.distance.total_cmp(&b.distance))
+                            .unwrap()
+                        };
+
+                        if normal == Vector3::zeros() {
+                            collider_bits::set(collider_bits, collider, None);
+                            continue;
                         }
-                        continue;
-                    };
 
-                    if prior_side == new_side {
-                        continue;
-                    }
+                        let new_side = 0. <= to_p.dot(&normal);
+                        let Some(prior_side) = collider_bits::get(*collider_bits, collider) else {
+                            if distance < frame_input.consts().accept_distance() {
+                                collider_bits::set(collider_bits, collider, Some(new_side));
+                            }
+                            continue;
+                        };
 
-                    if distance > NORMALIZATION_EPS {
-                        let collider_velocity = a_v * a_bary + b_v * b_bary + c_v * c_bary;
-                        let relative_velocity = *velocity - collider_velocity;
+                        if prior_side == new_side {
+                            continue;
+                        }
+
+                        if distance > NORMALIZATION_EPS {
+                            let collider_velocity = a_v * a_bary + b_v * b_bary + c_v * c_bary;
+                            let relative_velocity = *velocity - collider_velocity;
 
-                        let contact_normal = to_p / distance;
+                            let contact_normal = to_p / distance;
 
-                        let normal_velocity =
-                            contact_normal * relative_velocity.dot(&contact_normal);
-                        let tangential_velocity = relative_velocity - normal_velocity;
-                        let tangential_velocity_norm = tangential_velocity.norm();
-                        if tangential_velocity_norm > NORMALIZATION_EPS {
-                            let tangent = tangential_velocity / tangential_velocity_norm;
+                            let normal_velocity =
+                                contact_normal * relative_velocity.dot(&contact_normal);
+                            let tangential_velocity = relative_velocity - normal_velocity;
+                            let tangential_velocity_norm = tangential_velocity.norm();
+                            if tangential_velocity_norm > NORMALIZATION_EPS {
+                                let tangent = tangential_velocity / tangential_velocity_norm;
 
-                            let friction_impulse = tangent
-                                * (triangle_frictions[closest_triangle] * distance / time_step)
-                                    .min(tangential_velocity_norm);
+                                let friction_impulse = tangent
+                                    * (triangle_frictions[closest_triangle] * distance / time_step)
+                                        .min(tangential_velocity_norm);
 
-                            *velocity -= friction_impulse;
+                                *velocity -= friction_impulse;
+                            }
+
+                            *velocity -=
+                                triangle_dampings[closest_triangle].min(1.) * normal_velocity;
                         }
 
-                        *velocity -= triangle_dampings[closest_triangle].min(1.) * normal_velocity;
+                        *velocity -= to_p / time_step;
                     }
-
-                    *velocity -= to_p / time_step;
-                }
-            });
+                },
+            );
     }
 }
@@ -35,7 +35,10 @@ impl CpuState {
             .zip(&self.particles.flags)
             .filter_map(|(e, flags)| (!flags.contains(ParticleFlags::TOMBSTONED)).then_some(e))
             .for_each(|(index, (position, velocity))| {
-                let index = self.particles.sort_map[index] as usize;
+                let mut index = self.particles.sort_map[index] as usize;
+                if let Some(input_indices) = &self.input_indices {
+                    index = input_indices[index] as usize;
+                }
                 if input_flags_a[index].contains(ParticleFlags::HAS_GOAL)
                     && input_flags_b[index].contains(ParticleFlags::HAS_GOAL)
                 {
@@ -16,7 +16,7 @@ use squishy_volumes_util::{
     first_piola_stress_neo_hookean_svd_in_diagonal_space,
     partial_elastic_energy_inviscid_by_invariant_3, profile,
     second_derivative_inviscid_svd_in_diagonal_space,
-    second_derivative_neo_hookean_svd_in_diagonal_space,
+    second_derivative_neo_hookean_svd_in_diagonal_space, svd3,
 };
 
 use super::*;
@@ -40,9 +40,16 @@ impl CpuState {
             .par_iter()
             .zip(&self.particles.position_gradients)
             .zip(&self.particles.flags)
-            .filter_map(|(e, flags)| (!flags.contains(ParticleFlags::TOMBSTONED)).then_some(e))
-            .map(|(parameters, position_gradient)| {
-                let s = position_gradient.svd(false, false).singular_values;
+            .enumerate()
+            .filter_map(|(i, (e, flags))| {
+                (!flags.contains(ParticleFlags::TOMBSTONED)).then_some((i, e))
+            })
+            .map(|(i, (parameters, position_gradient))| {
+                // the order does not matter here, the cached ones might not be sorted
+                let s = match self.particles.position_gradient_singular_values.get(i) {
+                    Some(&Some(singular_values)) => singular_values,
+                    _ => svd3(position_gradient).singular_values,
+                };
 
                 let j = s.product();
 
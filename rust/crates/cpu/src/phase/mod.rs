@@ -6,11 +6,12 @@
 // license that can be found in the LICENSE_MIT file or at
 // https://opensource.org/licenses/MIT.
 
-use strum::{EnumIter, IntoEnumIterator as _};
+use strum::{EnumIter, IntoEnumIterator as _, IntoStaticStr};
 
 use super::*;
 
 mod advance_particles;
+mod affine_momenta;
 mod collect_velocity;
 mod collide;
 mod cull_particles;
@@ -19,11 +20,12 @@ mod interpolate_input;
 mod limit_time_step;
 mod meld_grid;
 mod scatter_momentum;
+mod scatter_momentum_particle_centric;
 mod sort;
 mod update_grid_nodes;
 
 // XXX: Order matters!
-#[derive(Debug, Default, Clone, Copy, PartialEq, Eq, EnumIter, PartialOrd)]
+#[derive(Debug, Default, Clone, Copy, PartialEq, Eq, EnumIter, PartialOrd, IntoStaticStr)]
 pub enum Phase {
     #[default]
     InterpolateInput,
@@ -8,17 +8,15 @@
 
 use nalgebra::Vector3;
 use rayon::iter::{IndexedParallelIterator, IntoParallelRefIterator as _, ParallelIterator};
-use squishy_volumes_file_frame::{SpecificParticleParameters, ViscosityParameters};
-use squishy_volumes_util::{
-    cauchy_stress_general_viscosity, first_piola_stress_inviscid, first_piola_stress_neo_hookean,
-    profile,
-};
+use squishy_volumes_util::profile;
 
 use super::*;
 
 impl CpuState {
     // Mass and velocity transported by particles is scattered to the grids.
     // In explicit time integration the forces can be applied at the same time.
+    // The kernel weights are taken from the stencils built in `update_grid_nodes`,
+    // the stresses are evaluated once per particle beforehand.
     pub fn scatter_momentum(&mut self, grid_node_size: f32) {
         profile!("scatter_momentum");
         let scaling =
@@ -26,6 +24,17 @@ impl CpuState {
 
         self.grid_nodes.masses = vec![0.; self.grid_nodes.map.len()];
         self.grid_nodes.velocities = vec![Vector3::zeros(); self.grid_nodes.map.len()];
+        if self.particle_centric_scatter {
+            self.scatter_momentum_particle_centric(grid_node_size, scaling);
+        } else {
+            self.scatter_momentum_node_centric(grid_node_size, scaling);
+        }
+    }
+
+    // Each grid node walks its contributors.
+    fn scatter_momentum_node_centric(&mut self, grid_node_size: f32, scaling: f32) {
+        profile!("scatter_momentum_node_centric");
+        let affine_momenta = self.affine_momenta(scaling);
         self.grid_nodes
             .keys
             .par_iter()
@@ -36,57 +45,19 @@ impl CpuState {
                 |(((GridKey { node_id, .. }, contributors), mass), velocity)| {
                     for &particle_idx in contributors.get_mut().unwrap().iter() {
                         let particle_idx = particle_idx as usize;
-                        let normalized = self.particles.positions[particle_idx] / grid_node_size;
-
-                        let to_grid_node_normalized = node_id.map(|x| x as f32) - normalized;
-                        let weight = to_grid_node_normalized.map(kernel_quadratic).product();
-
-                        let to_grid_node = to_grid_node_normalized * grid_node_size;
-
-                        let parameters = self.particles.parameters[particle_idx];
-                        let mut imparted_momentum = (self.particles.velocities[particle_idx]
-                            + self.particles.velocity_gradients[particle_idx] * to_grid_node)
-                            * parameters.mass;
-
-                        let position_gradient = &self.particles.position_gradients[particle_idx];
-                        let stress = match parameters.specific {
-                            SpecificParticleParameters::Solid {
-                                mu,
-                                lambda,
-                                sand_alpha: _,
-                            } => first_piola_stress_neo_hookean(mu, lambda, position_gradient),
-                            SpecificParticleParameters::Fluid {
-                                exponent,
-                                bulk_modulus,
-                            } => first_piola_stress_inviscid(
-                                bulk_modulus,
-                                exponent,
-                                position_gradient,
-                            ),
-                        };
-
-                        if let Some(ViscosityParameters { dynamic, bulk }) = parameters.viscosity {
-                            let cauchy_stress = cauchy_stress_general_viscosity(
-                                dynamic,
-                                bulk,
-                                &self.particles.velocity_gradients[particle_idx],
-                            );
-
-                            imparted_momentum -= cauchy_stress
-                                * (to_grid_node
-                                    * (scaling
-                                        * position_gradient.determinant()
-                                        * parameters.initial_volume));
-                        }
+                        let slot = stencil_slot(&(node_id - self.stencils.shifts[particle_idx]));
+                        let weight = self.stencils.weights[particle_idx][slot];
 
-                        imparted_momentum -= stress
-                            * (position_gradient.transpose()
-                                * (to_grid_node * (scaling * parameters.initial_volume)));
+                        let to_grid_node = node_id.map(|x| x as f32) * grid_node_size
+                            - self.particles.positions[particle_idx];
 
-                        imparted_momentum *= weight;
+                        let particle_mass = self.particles.parameters[particle_idx].mass;
+                        let imparted_momentum = self.particles.velocities[particle_idx]
+                            * particle_mass
+                            + affine_momenta[particle_idx] * to_grid_node;
 
-                        *mass += weight * parameters.mass;
-                        *velocity += imparted_momentum;
+                        *mass += weight * particle_mass;
+                        *velocity += imparted_momentum * weight;
                     }
                 },
             );
@@ -0,0 +1,107 @@
+// SPDX-License-Identifier: MIT
+//
+// Copyright 2025  Algebraic UG (haftungsbeschränkt)
+//
+// Use of this source code is governed by an MIT-style
+// license that can be found in the LICENSE_MIT file or at
+// https://opensource.org/licenses/MIT.
+
+use nalgebra::Vector3;
+use rayon::{
+    iter::{IndexedParallelIterator, ParallelIterator},
+    slice::{ParallelSlice as _, ParallelSliceMut as _},
+};
+use rustc_hash::FxHashMap;
+use squishy_volumes_file_frame::ParticleFlags;
+use squishy_volumes_util::profile;
+
+use super::*;
+
+// The particles are sorted by cell, so consecutive particles form a spatial block.
+const PARTICLES_PER_BLOCK: usize = 4096;
+const GRID_NODES_PER_MERGE: usize = 4096;
+
+// Grid index, mass and momentum, sorted by grid index.
+type BlockBuffer = Vec<(u32, f32, Vector3<f32>)>;
+
+impl CpuState {
+    // Each block of particles accumulates into its own buffer,
+    // the nodes on the block borders are then summed up from several buffers.
+    // Every particle is read once and the stress is evaluated once per particle.
+    pub(super) fn scatter_momentum_particle_centric(&mut self, grid_node_size: f32, scaling: f32) {
+        let offsets = stencil_offsets();
+        let affine_momenta = self.affine_momenta(scaling);
+
+        let blocks: Vec<BlockBuffer> = {
+            profile!("accumulate blocks");
+            self.particles
+                .positions
+                .par_chunks(PARTICLES_PER_BLOCK)
+                .enumerate()
+                .map(|(block, positions)| {
+                    let mut buffer: FxHashMap<u32, (f32, Vector3<f32>)> = Default::default();
+                    for (particle_idx, position) in positions
+                        .iter()
+                        .enumerate()
+                        .map(|(i, position)| (block * PARTICLES_PER_BLOCK + i, position))
+                    {
+                        if self.particles.flags[particle_idx].contains(ParticleFlags::TOMBSTONED) {
+                            continue;
+                        }
+                        let particle_mass = self.particles.parameters[particle_idx].mass;
+                        let momentum = self.particles.velocities[particle_idx] * particle_mass;
+                        let affine_momentum = &affine_momenta[particle_idx];
+
+                        let shift = self.stencils.shifts[particle_idx];
+                        for ((offset, grid_index), weight) in offsets
+                            .iter()
+                            .zip(&self.stencils.grid_indices[particle_idx])
+                            .zip(&self.stencils.weights[particle_idx])
+                        {
+                            let to_grid_node =
+                                (shift + offset).map(|x| x as f32) * grid_node_size - position;
+                            let (mass, imparted_momentum) =
+                                buffer.entry(*grid_index).or_insert((0., Vector3::zeros()));
+                            *mass += weight * particle_mass;
+                            *imparted_momentum +=
+                                (momentum + affine_momentum * to_grid_node) * *weight;
+                        }
+                    }
+
+                    let mut buffer: BlockBuffer = buffer
+                        .into_iter()
+                        .map(|(grid_index, (mass, momentum))| (grid_index, mass, momentum))
+                        .collect();
+                    buffer.sort_unstable_by_key(|(grid_index, _, _)| *grid_index);
+                    buffer
+                })
+                .collect()
+        };
+
+        profile!("merge blocks");
+        self.grid_nodes
+            .masses
+            .par_chunks_mut(GRID_NODES_PER_MERGE)
+            .zip(
+                self.grid_nodes
+                    .velocities
+                    .par_chunks_mut(GRID_NODES_PER_MERGE),
+            )
+            .enumerate()
+            .for_each(|(chunk, (masses, velocities))| {
+                let start = (chunk * GRID_NODES_PER_MERGE) as u32;
+                let end = start + masses.len() as u32;
+                for buffer in &blocks {
+                    let first = buffer.partition_point(|(grid_index, _, _)| *grid_index < start);
+                    for (grid_index, mass, momentum) in buffer[first..]
+                        .iter()
+                        .take_while(|(grid_index, _, _)| *grid_index < end)
+                    {
+                        let local = (grid_index - start) as usize;
+                        masses[local] += mass;
+                        velocities[local] += momentum;
+                    }
+                }
+            });
+    }
+}
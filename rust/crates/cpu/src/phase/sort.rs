@@ -68,6 +68,8 @@ impl CpuState {
                     velocities,
                     velocity_gradients,
                     collider_bits,
+                    position_gradient_singular_values,
+                    collider_cells,
 
                     // These will be overwritten anyway
                     reverse_sort_map: _,
@@ -98,6 +100,12 @@ impl CpuState {
                     permute(s, &permutation, velocities);
                     permute(s, &permutation, velocity_gradients);
                     permute(s, &permutation, collider_bits);
+                    if !position_gradient_singular_values.is_empty() {
+                        permute(s, &permutation, position_gradient_singular_values);
+                    }
+                    if !collider_cells.is_empty() {
+                        permute(s, &permutation, collider_cells);
+                    }
                 });
             }
 
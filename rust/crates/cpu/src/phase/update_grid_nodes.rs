@@ -28,6 +28,7 @@ use super::*;
 impl CpuState {
     // Update the hash map that allows to index into all the vectors of each momentum grid
     // with the node's 3d integer position. The data vectors are effectively invalidated.
+    // The particles' stencils are rebuilt on the way.
     pub fn update_grid_nodes(&mut self, grid_node_size: f32) {
         profile!("update_grid_nodes");
 
@@ -71,11 +72,13 @@ impl CpuState {
         // and when we access the new contributors, we need to subtract that offset
         let grid_index_offset = self.grid_nodes.map.len() as u32;
         let mut next_grid_index = grid_index_offset;
+        // the stencil slots of new entries are patched once their index is known
         let (tx, rx) = channel();
         let collector = spawn(move || {
             let mut map: FxHashMap<GridKey, u32> = Default::default();
             let mut contributors: Vec<Mutex<SmallVec<[u32; 16]>>> = Default::default();
-            while let Ok((grid_key, particle_index)) = rx.recv() {
+            let mut stencil_patches: Vec<(u32, usize, u32)> = Default::default();
+            while let Ok((grid_key, particle_index, slot)) = rx.recv() {
                 let grid_index = *map.entry(grid_key).or_insert_with(|| {
                     contributors.push(SmallVec::new().into());
                     let grid_index = next_grid_index;
@@ -86,48 +89,72 @@ impl CpuState {
                     .get_mut()
                     .unwrap()
                     .push(particle_index);
+                stencil_patches.push((particle_index, slot, grid_index));
             }
-            (map, contributors)
+            (map, contributors, stencil_patches)
         });
 
+        let particle_count = self.particles.positions.len();
+        let Stencils {
+            shifts,
+            grid_indices,
+            weights,
+        } = &mut self.stencils;
+        shifts.resize(particle_count, Vector3::zeros());
+        grid_indices.resize(particle_count, [u32::MAX; STENCIL_SIZE]);
+        weights.resize(particle_count, [0.; STENCIL_SIZE]);
+
         // generate grid from particles
         self.particles
             .positions
             .par_iter()
             .zip(&self.particles.collider_bits)
+            .zip(shifts)
+            .zip(grid_indices)
+            .zip(weights)
             .enumerate()
             .zip(&self.particles.flags)
             .filter_map(|(e, flags)| (!flags.contains(ParticleFlags::TOMBSTONED)).then_some(e))
-            .for_each(|(particle_index, (position, &collider_bits))| {
-                let shift = position_to_shift_quadratic(position, grid_node_size);
-                kernel_quadratic_unrolled!(|grid_id| {
-                    let node_id = grid_id + shift;
-                    let key = GridKey {
-                        node_id,
-                        collider_bits,
-                    };
+            .for_each(
+                |(
+                    particle_index,
+                    ((((position, &collider_bits), shift), grid_indices), weights),
+                )| {
+                    (*shift, *weights) = quadratic_stencil_weights(position, grid_node_size);
+                    *grid_indices = kernel_quadratic_unrolled!(|grid_id| {
+                        let node_id = grid_id + *shift;
+                        let key = GridKey {
+                            node_id,
+                            collider_bits,
+                        };
 
-                    if let Some(grid_index) = self.grid_nodes.map.get(&key) {
-                        // if the entry exists, we register
-                        self.grid_nodes.contributors[*grid_index as usize]
-                            .lock()
-                            .unwrap()
-                            .push(particle_index as u32);
-                    } else {
-                        // otherwise it's handled in the collector
-                        tx.send((key, particle_index as u32))
-                            .expect("collector died");
-                    }
-                });
-            });
+                        if let Some(&grid_index) = self.grid_nodes.map.get(&key) {
+                            // if the entry exists, we register
+                            self.grid_nodes.contributors[grid_index as usize]
+                                .lock()
+                                .unwrap()
+                                .push(particle_index as u32);
+                            grid_index
+                        } else {
+                            // otherwise it's handled in the collector
+                            tx.send((key, particle_index as u32, stencil_slot(&grid_id)))
+                                .expect("collector died");
+                            u32::MAX
+                        }
+                    });
+                },
+            );
 
         {
             // add the new entries
             profile!("collect");
             drop(tx);
-            let (map, mut contributors) = collector.join().unwrap();
+            let (map, mut contributors, stencil_patches) = collector.join().unwrap();
             self.grid_nodes.map.extend(map);
             self.grid_nodes.contributors.append(&mut contributors);
+            for (particle_index, slot, grid_index) in stencil_patches {
+                self.stencils.grid_indices[particle_index as usize][slot] = grid_index;
+            }
         }
 
         {
@@ -0,0 +1,54 @@
+// SPDX-License-Identifier: MIT
+//
+// Copyright 2025  Algebraic UG (haftungsbeschränkt)
+//
+// Use of this source code is governed by an MIT-style
+// license that can be found in the LICENSE_MIT file or at
+// https://opensource.org/licenses/MIT.
+
+use std::array::from_fn;
+
+use nalgebra::Vector3;
+
+use super::*;
+
+pub const STENCIL_SIZE: usize = KERNEL_QUADRATIC_LENGTH.pow(3);
+
+// The particle-to-node relations of the quadratic kernel, per particle.
+// They are built by `update_grid_nodes` and stay valid until the particles move.
+#[derive(Default)]
+pub struct Stencils {
+    pub shifts: Vec<Vector3<i32>>,
+    pub grid_indices: Vec<[u32; STENCIL_SIZE]>,
+    pub weights: Vec<[f32; STENCIL_SIZE]>,
+}
+
+pub fn stencil_slot(offset: &Vector3<i32>) -> usize {
+    let length = KERNEL_QUADRATIC_LENGTH as i32;
+    (offset.x * length * length + offset.y * length + offset.z) as usize
+}
+
+// Same order as `kernel_quadratic_unrolled`, so the slot is the array index.
+pub fn stencil_offsets() -> [Vector3<i32>; STENCIL_SIZE] {
+    kernel_quadratic_unrolled!(|offset| offset)
+}
+
+pub fn quadratic_stencil_weights(
+    position: &Vector3<f32>,
+    grid_node_size: f32,
+) -> (Vector3<i32>, [f32; STENCIL_SIZE]) {
+    let normalized = position / grid_node_size;
+    let shift = (normalized - Vector3::repeat(0.5)).map(f32::floor);
+    let shifted = normalized - shift;
+
+    let [x_weights, y_weights, z_weights]: [[f32; KERNEL_QUADRATIC_LENGTH]; 3] = [
+        from_fn(|i| kernel_quadratic(shifted.x - i as f32)),
+        from_fn(|i| kernel_quadratic(shifted.y - i as f32)),
+        from_fn(|i| kernel_quadratic(shifted.z - i as f32)),
+    ];
+
+    let weights = kernel_quadratic_unrolled!(|offset: Vector3<i32>| {
+        x_weights[offset.x as usize] * y_weights[offset.y as usize] * z_weights[offset.z as usize]
+    });
+    (shift.map(|x| x as i32), weights)
+}
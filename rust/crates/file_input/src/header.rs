@@ -41,6 +41,10 @@ impl InputConsts {
         self.grid_node_size
     }
 
+    pub fn set_unscaled_grid_node_size(&mut self, grid_node_size: f32) {
+        self.grid_node_size = grid_node_size;
+    }
+
     pub fn scaled_domain_min(&self) -> [f32; 3] {
         [
             self.domain_min[0] / self.simulation_scale,
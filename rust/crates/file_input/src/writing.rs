@@ -8,8 +8,8 @@
 
 use std::{
     fmt::Debug,
-    fs::File,
-    io::{BufWriter, Seek, Write},
+    fs::{File, remove_file},
+    io::{BufWriter, ErrorKind, Seek, Write},
     path::Path,
 };
 
@@ -27,6 +27,11 @@ pub struct InputWriter {
 impl InputWriter {
     pub fn new<P: AsRef<Path> + Debug>(path: P, header: InputHeader) -> Result<Self, InputError> {
         info!("Start writing input to {path:?}");
+        // forks share the old file via a hard link, so it must not be truncated in place
+        match remove_file(&path) {
+            Err(e) if e.kind() != ErrorKind::NotFound => return Err(e.into()),
+            _ => {}
+        }
         let mut writer = BufWriter::new(File::create(path)?);
         squishy_volumes_file_util::write_magic_and_version(magic_bytes, &mut writer)?;
         serialize_into(&mut writer, &header)?;
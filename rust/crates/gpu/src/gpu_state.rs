@@ -30,6 +30,7 @@ pub struct GpuState {
     max_num_grid_nodes: NonZeroU32,
     io_state: IoState,
     profile_data_csv_writer: Option<ProfileDataCsvWriter>,
+    last_frame_substeps: usize,
 }
 
 pub const BYTES_PER_GRID_NODE: u64 = 300;
@@ -186,6 +187,7 @@ impl GpuState {
             max_num_grid_nodes,
             io_state,
             profile_data_csv_writer,
+            last_frame_substeps: 0,
         })
     }
 }
@@ -598,6 +600,7 @@ impl GpuState {
             );
         }
 
+        self.last_frame_substeps = times.len();
         if let Some(profile_data_csv_writer) = self.profile_data_csv_writer.as_mut() {
             profile_data_csv_writer.write_frame(&self.gpu_context, &mut profiler, &times)?;
         }
@@ -673,4 +676,9 @@ impl GpuState {
 
         Ok((self.io_state.clone(), buffered_error))
     }
+
+    // The time step is fixed, there is no limiter to report.
+    pub fn last_frame_substeps(&self) -> usize {
+        self.last_frame_substeps
+    }
 }
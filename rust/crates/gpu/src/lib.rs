@@ -105,11 +105,10 @@ pub use test_svd::TestSvd;
 pub use update_flags::UpdateFlags;
 pub use viscosity::Viscosity;
 
-#[cfg(test)]
-mod cone;
+// Collider meshes for tests and benchmarks
+pub mod cone;
 #[cfg(test)]
 mod test_util;
-#[cfg(test)]
-mod torus;
+pub mod torus;
 #[cfg(test)]
 use test_util::*;
@@ -9,9 +9,11 @@
 mod bounding_volume_hierarchy;
 mod errors;
 mod mesh;
+mod narrow_band;
 mod triangle;
 
 pub use bounding_volume_hierarchy::*;
 pub use errors::*;
 pub use mesh::*;
+pub use narrow_band::*;
 pub use triangle::*;
@@ -0,0 +1,195 @@
+// SPDX-License-Identifier: MIT
+//
+// Copyright 2025  Algebraic UG (haftungsbeschränkt)
+//
+// Use of this source code is governed by an MIT-style
+// license that can be found in the LICENSE_MIT file or at
+// https://opensource.org/licenses/MIT.
+
+use nalgebra::Vector3;
+use rayon::{
+    iter::{IndexedParallelIterator, IntoParallelRefIterator, ParallelIterator},
+    slice::ParallelSliceMut,
+};
+use squishy_volumes_util::{Aabb, NORMALIZATION_EPS};
+
+use crate::{Triangle, distance_to_triangle};
+
+// Sparse cells at leaf resolution, each with the triangles that could be within
+// the band width of any point in that cell, at any time between the two frames.
+// Cells that are not stored have no triangle within the band width.
+#[derive(Default)]
+pub struct NarrowBand {
+    // sorted
+    cells: Vec<[i32; 3]>,
+    // the triangles of cell i are at starts[i]..starts[i + 1]
+    starts: Vec<u32>,
+    // sorted by lower bound per cell
+    triangles: Vec<u32>,
+    // of the distance between the triangle and any point in the cell
+    lower_bounds: Vec<f32>,
+}
+
+impl NarrowBand {
+    // The triangle vertices move linearly from `start_positions` to `end_positions`.
+    // The leaf AABBs of the triangles have to cover this motion and the band width.
+    pub fn new(
+        leaf_size: f32,
+        band_width: f32,
+        triangles: &[Triangle],
+        leaf_aabbs: &[Aabb<Vector3<i32>>],
+        start_positions: &[Vector3<f32>],
+        end_positions: Option<&[Vector3<f32>]>,
+    ) -> Self {
+        let half_diagonal = leaf_size * 3f32.sqrt() / 2.;
+
+        let mut entries: Vec<([i32; 3], u32, f32)> = triangles
+            .par_iter()
+            .zip(leaf_aabbs)
+            .enumerate()
+            .flat_map_iter(|(triangle_index, (triangle, leaf_aabb))| {
+                let [a, b, c] = [triangle.a, triangle.b, triangle.c]
+                    .map(|vertex_index| start_positions[vertex_index as usize]);
+                // any point of the moving triangle stays this close to its start
+                let max_displacement = end_positions.map_or(0., |end_positions| {
+                    triangle
+                        .iter()
+                        .map(|&vertex_index| {
+                            (end_positions[vertex_index as usize]
+                                - start_positions[vertex_index as usize])
+                                .norm()
+                        })
+                        .fold(0., f32::max)
+                });
+                let normal = (b - a).cross(&(c - a)).try_normalize(NORMALIZATION_EPS);
+
+                let Aabb { min, max } = *leaf_aabb;
+                (min.x..max.x)
+                    .flat_map(move |x| (min.y..max.y).map(move |y| (x, y)))
+                    .flat_map(move |(x, y)| (min.z..max.z).map(move |z| [x, y, z]))
+                    .filter_map(move |cell| {
+                        // degenerate at the start, but maybe not later on
+                        let Some(normal) = normal else {
+                            return Some((cell, triangle_index as u32, 0.));
+                        };
+                        let center = Vector3::from(cell).map(|c| (c as f32 + 0.5) * leaf_size);
+                        let lower_bound = (distance_to_triangle(&center, &a, &b, &c, &normal)
+                            - half_diagonal
+                            - max_displacement)
+                            .max(0.);
+                        (lower_bound < band_width).then_some((
+                            cell,
+                            triangle_index as u32,
+                            lower_bound,
+                        ))
+                    })
+            })
+            .collect();
+
+        entries.par_sort_unstable_by(|(cell_a, _, bound_a), (cell_b, _, bound_b)| {
+            cell_a.cmp(cell_b).then(bound_a.total_cmp(bound_b))
+        });
+
+        let mut narrow_band = Self::default();
+        for (cell, triangle_index, lower_bound) in entries {
+            if narrow_band.cells.last() != Some(&cell) {
+                narrow_band.cells.push(cell);
+                narrow_band.starts.push(narrow_band.triangles.len() as u32);
+            }
+            narrow_band.triangles.push(triangle_index);
+            narrow_band.lower_bounds.push(lower_bound);
+        }
+        narrow_band.starts.push(narrow_band.triangles.len() as u32);
+        narrow_band
+    }
+
+    // The candidate triangles with the lower bounds of their distance.
+    // Both are empty if the cell is outside of the band.
+    pub fn query(&self, leaf: &Vector3<i32>) -> (&[u32], &[f32]) {
+        self.cell_index(leaf)
+            .map(|cell_index| self.cell(cell_index))
+            .unwrap_or_default()
+    }
+
+    // Stays valid as long as this narrow band is used, `None` outside of the band.
+    pub fn cell_index(&self, leaf: &Vector3<i32>) -> Option<u32> {
+        self.cells
+            .binary_search(&[leaf.x, leaf.y, leaf.z])
+            .ok()
+            .map(|cell_index| cell_index as u32)
+    }
+
+    pub fn cell(&self, cell_index: u32) -> (&[u32], &[f32]) {
+        let cell_index = cell_index as usize;
+        let range = self.starts[cell_index] as usize..self.starts[cell_index + 1] as usize;
+        (&self.triangles[range.clone()], &self.lower_bounds[range])
+    }
+}
+
+#[cfg(test)]
+mod test {
+    use rand::prelude::*;
+    use rand::rngs::ChaCha8Rng;
+
+    use super::*;
+    use crate::triangles_to_leaf_aabbs;
+
+    #[test]
+    fn lower_bounds_hold() {
+        let mut rng = ChaCha8Rng::seed_from_u64(420);
+        let mut random_vector = |range: f32| {
+            Vector3::new(
+                rng.random_range(-range..range),
+                rng.random_range(-range..range),
+                rng.random_range(-range..range),
+            )
+        };
+
+        let n = 200;
+        let vertices: Vec<Vector3<f32>> = (0..n)
+            .flat_map(|_| {
+                let a = random_vector(10.);
+                [a, a + random_vector(2.), a + random_vector(2.)]
+            })
+            .collect();
+        let triangles: Vec<Triangle> = (0..n)
+            .map(|i| Triangle {
+                a: i * 3,
+                b: i * 3 + 1,
+                c: i * 3 + 2,
+            })
+            .collect();
+
+        let leaf_size = 1.;
+        let band_width = 0.5;
+        let leaf_aabbs = triangles_to_leaf_aabbs(leaf_size, band_width, &vertices, &triangles);
+        let narrow_band = NarrowBand::new(
+            leaf_size,
+            band_width,
+            &triangles,
+            &leaf_aabbs,
+            &vertices,
+            None,
+        );
+
+        for _ in 0..1000 {
+            let p = random_vector(12.);
+            let leaf = p.map(|c| (c / leaf_size).floor() as i32);
+            let (candidates, lower_bounds) = narrow_band.query(&leaf);
+            for (triangle_index, triangle) in triangles.iter().enumerate() {
+                let [a, b, c] = [triangle.a, triangle.b, triangle.c].map(|i| vertices[i as usize]);
+                let Some(normal) = (b - a).cross(&(c - a)).try_normalize(NORMALIZATION_EPS) else {
+                    continue;
+                };
+                let distance = distance_to_triangle(&p, &a, &b, &c, &normal);
+                let candidate = candidates
+                    .iter()
+                    .position(|&candidate| candidate == triangle_index as u32);
+                match candidate {
+                    Some(candidate) => assert!(lower_bounds[candidate] <= distance + 1e-4),
+                    None => assert!(distance >= band_width - 1e-4),
+                }
+            }
+        }
+    }
+}
@@ -0,0 +1,128 @@
+// SPDX-License-Identifier: MIT
+//
+// Copyright 2025  Algebraic UG (haftungsbeschränkt)
+//
+// Use of this source code is governed by an MIT-style
+// license that can be found in the LICENSE_MIT file or at
+// https://opensource.org/licenses/MIT.
+
+// Structure-of-arrays variants of some functions in `elastic`, evaluating `LANES` particles at once.
+// Every entry is a fixed-size array that the compiler can keep in vector registers.
+
+use std::array::from_fn;
+
+use nalgebra::Matrix3;
+
+use crate::{
+    T, partial_elastic_energy_inviscid_by_invariant_3,
+    partial_elastic_energy_neo_hookean_by_invariant_2,
+    partial_elastic_energy_neo_hookean_by_invariant_3,
+};
+
+pub const LANES: usize = 8;
+
+pub type Lanes<U = T> = [U; LANES];
+
+/// Column-major like nalgebra, entry `(row, column)` is at `column * 3 + row`.
+#[derive(Clone, Copy, Debug)]
+pub struct Matrix3Lanes(pub [Lanes; 9]);
+
+impl Matrix3Lanes {
+    pub fn from_fn(mut matrix: impl FnMut(usize) -> Matrix3<T>) -> Self {
+        let matrices: Lanes<Matrix3<T>> = from_fn(&mut matrix);
+        Self(from_fn(|entry| from_fn(|lane| matrices[lane][entry])))
+    }
+
+    pub fn lane(&self, lane: usize) -> Matrix3<T> {
+        Matrix3::from_fn(|row, column| self.0[column * 3 + row][lane])
+    }
+
+    fn get(&self, row: usize, column: usize) -> &Lanes {
+        &self.0[column * 3 + row]
+    }
+}
+
+fn lanes(value: impl Fn(usize) -> T) -> Lanes {
+    from_fn(value)
+}
+
+fn determinant_lanes(m: &Matrix3Lanes) -> Lanes {
+    let e = |row, column, lane| m.get(row, column)[lane];
+    lanes(|l| {
+        e(0, 0, l) * (e(1, 1, l) * e(2, 2, l) - e(2, 1, l) * e(1, 2, l))
+            - e(0, 1, l) * (e(1, 0, l) * e(2, 2, l) - e(2, 0, l) * e(1, 2, l))
+            + e(0, 2, l) * (e(1, 0, l) * e(2, 1, l) - e(2, 0, l) * e(1, 1, l))
+    })
+}
+
+// Same as `partial_invariant_3_by_position_gradient`, column i is the cross product of the other two.
+fn partial_invariant_3_lanes(m: &Matrix3Lanes) -> Matrix3Lanes {
+    let e = |row, column, lane| m.get(row, column)[lane];
+    let mut result = Matrix3Lanes([[0.; LANES]; 9]);
+    for (column, (a, b)) in [(1, 2), (2, 0), (0, 1)].into_iter().enumerate() {
+        for row in 0..3 {
+            let (y, z) = ((row + 1) % 3, (row + 2) % 3);
+            result.0[column * 3 + row] =
+                lanes(|l| e(y, a, l) * e(z, b, l) - e(z, a, l) * e(y, b, l));
+        }
+    }
+    result
+}
+
+/// Batched `first_piola_stress_neo_hookean`.
+pub fn first_piola_stress_neo_hookean_lanes(
+    mu: &Lanes,
+    lambda: &Lanes,
+    position_gradient: &Matrix3Lanes,
+) -> Matrix3Lanes {
+    let invariant_3 = determinant_lanes(position_gradient);
+    let by_invariant_2 = lanes(|l| 2. * partial_elastic_energy_neo_hookean_by_invariant_2(mu[l]));
+    let by_invariant_3 = lanes(|l| {
+        partial_elastic_energy_neo_hookean_by_invariant_3(mu[l], lambda[l], invariant_3[l])
+    });
+    let partial_invariant_3 = partial_invariant_3_lanes(position_gradient);
+    Matrix3Lanes(from_fn(|entry| {
+        lanes(|l| {
+            by_invariant_2[l] * position_gradient.0[entry][l]
+                + by_invariant_3[l] * partial_invariant_3.0[entry][l]
+        })
+    }))
+}
+
+/// Batched `first_piola_stress_inviscid`.
+pub fn first_piola_stress_inviscid_lanes(
+    bulk_modulus: &Lanes,
+    exponent: &Lanes<i32>,
+    position_gradient: &Matrix3Lanes,
+) -> Matrix3Lanes {
+    let invariant_3 = determinant_lanes(position_gradient);
+    let by_invariant_3 = lanes(|l| {
+        partial_elastic_energy_inviscid_by_invariant_3(bulk_modulus[l], exponent[l], invariant_3[l])
+    });
+    let partial_invariant_3 = partial_invariant_3_lanes(position_gradient);
+    Matrix3Lanes(from_fn(|entry| {
+        lanes(|l| by_invariant_3[l] * partial_invariant_3.0[entry][l])
+    }))
+}
+
+/// Batched `cauchy_stress_general_viscosity`.
+pub fn cauchy_stress_general_viscosity_lanes(
+    dynamic_viscosity: &Lanes,
+    bulk_viscosity: &Lanes,
+    velocity_gradient: &Matrix3Lanes,
+) -> Matrix3Lanes {
+    let e = |row, column, lane| velocity_gradient.get(row, column)[lane];
+    let divergence = lanes(|l| e(0, 0, l) + e(1, 1, l) + e(2, 2, l));
+    Matrix3Lanes(from_fn(|entry| {
+        let (row, column) = (entry % 3, entry / 3);
+        lanes(|l| {
+            let rate_of_strain = 0.5 * (e(row, column, l) + e(column, row, l));
+            let diagonal = if row == column {
+                bulk_viscosity[l] * divergence[l]
+            } else {
+                0.
+            };
+            2. * dynamic_viscosity[l] * rate_of_strain + diagonal
+        })
+    }))
+}
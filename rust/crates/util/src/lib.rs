@@ -10,18 +10,22 @@ mod aabb;
 pub mod collider_bits;
 mod consts;
 mod elastic;
+mod elastic_lanes;
 mod flat;
 mod panic_to_string;
 mod safe_inverse;
+mod svd3;
 mod typedefs;
 
 pub use aabb::*;
 
 pub use consts::*;
 pub use elastic::*;
+pub use elastic_lanes::*;
 pub use flat::*;
 pub use panic_to_string::*;
 pub use safe_inverse::*;
+pub use svd3::*;
 pub use typedefs::*;
 
 #[cfg(test)]
@@ -0,0 +1,106 @@
+// SPDX-License-Identifier: MIT
+//
+// Copyright 2025  Algebraic UG (haftungsbeschränkt)
+//
+// Use of this source code is governed by an MIT-style
+// license that can be found in the LICENSE_MIT file or at
+// https://opensource.org/licenses/MIT.
+
+use nalgebra::{Matrix3, Vector3};
+
+use crate::T;
+
+// The Jacobi iteration converges quadratically, this is plenty for f32.
+const JACOBI_SWEEPS: usize = 5;
+
+// The pairs of indices in the order they are rotated.
+const PAIRS: [(usize, usize); 3] = [(0, 1), (0, 2), (1, 2)];
+
+/// `matrix = u * diag(singular_values) * v_t`
+#[derive(Clone, Copy, Debug)]
+pub struct Svd3 {
+    pub u: Matrix3<T>,
+    pub singular_values: Vector3<T>,
+    pub v_t: Matrix3<T>,
+}
+
+impl Svd3 {
+    pub fn recompose(&self) -> Matrix3<T> {
+        self.u * Matrix3::from_diagonal(&self.singular_values) * self.v_t
+    }
+}
+
+/// A fixed number of Jacobi sweeps on `matrix^T * matrix` followed by a Givens QR decomposition.
+///
+/// This follows "Computing the Singular Value Decomposition of 3x3 matrices
+/// with minimal branching and elementary floating point operations" (McAdams et al.),
+/// but with exact rotations.
+/// Like nalgebra's SVD, the singular values are non-negative and sorted in descending order.
+pub fn svd3(matrix: &Matrix3<T>) -> Svd3 {
+    let mut symmetric = matrix.transpose() * matrix;
+    let mut v = Matrix3::identity();
+    for _ in 0..JACOBI_SWEEPS {
+        for (p, q) in PAIRS {
+            let off_diagonal = symmetric[(p, q)];
+            if off_diagonal == 0. {
+                continue;
+            }
+            let theta = (symmetric[(q, q)] - symmetric[(p, p)]) / (2. * off_diagonal);
+            let t = theta.signum() / (theta.abs() + (theta * theta + 1.).sqrt());
+            let cos = 1. / (t * t + 1.).sqrt();
+            let rotation = givens(p, q, cos, t * cos);
+            symmetric = rotation.transpose() * symmetric * rotation;
+            v *= rotation;
+        }
+    }
+
+    // sorting by column norm, flipping one of the swapped columns keeps v a rotation
+    let mut b = matrix * v;
+    for (i, j) in PAIRS {
+        if b.column(i).norm_squared() < b.column(j).norm_squared() {
+            b.swap_columns(i, j);
+            v.swap_columns(i, j);
+            let flipped = -b.column(j);
+            b.set_column(j, &flipped);
+            let flipped = -v.column(j);
+            v.set_column(j, &flipped);
+        }
+    }
+
+    // the columns of b are orthogonal, so r ends up diagonal
+    let mut u = Matrix3::identity();
+    for (p, q) in PAIRS {
+        let (a, b_qp) = (b[(p, p)], b[(q, p)]);
+        let r = a.hypot(b_qp);
+        let rotation = if r == 0. {
+            Matrix3::identity()
+        } else {
+            givens(p, q, a / r, b_qp / r)
+        };
+        b = rotation * b;
+        u *= rotation.transpose();
+    }
+
+    let mut singular_values = b.diagonal();
+    // only the last one can be negative, that is if the determinant is
+    if singular_values.z < 0. {
+        singular_values.z = -singular_values.z;
+        let flipped = -u.column(2);
+        u.set_column(2, &flipped);
+    }
+
+    Svd3 {
+        u,
+        singular_values,
+        v_t: v.transpose(),
+    }
+}
+
+fn givens(p: usize, q: usize, cos: T, sin: T) -> Matrix3<T> {
+    let mut rotation = Matrix3::identity();
+    rotation[(p, p)] = cos;
+    rotation[(q, q)] = cos;
+    rotation[(p, q)] = sin;
+    rotation[(q, p)] = -sin;
+    rotation
+}
@@ -6,6 +6,8 @@
 // license that can be found in the LICENSE_MIT file or at
 // https://opensource.org/licenses/MIT.
 
+use std::cell::RefCell;
+
 use crate::{T, test_inviscid_parameters, test_lame_parameters};
 use nalgebra::{Matrix3, SVD, Vector3};
 
@@ -26,7 +28,12 @@ use super::elastic::{
     second_derivative_neo_hookean_svd_in_diagonal_space,
 };
 
-use crate::{Matrix9, Vector9, safe_inverse::SafeInverse};
+use crate::{
+    LANES, Matrix3Lanes, Matrix9, Vector9, cauchy_stress_general_viscosity,
+    cauchy_stress_general_viscosity_lanes, first_piola_stress_inviscid_lanes,
+    first_piola_stress_neo_hookean_lanes, safe_inverse::SafeInverse, svd3,
+    test_viscosity_parameters,
+};
 
 fn test_scalar_from_scalar<Value, Gradient>(
     h: T,
@@ -681,6 +688,173 @@ fn test_first_piola_stress_inviscid_svd_in_diagonal_space() {
     }
 }
 
+#[test]
+fn test_svd3() {
+    run_with_random_position_gradients(1000, |position_gradient| {
+        let svd = svd3(&position_gradient);
+        check_iters(
+            [
+                (
+                    "nalgebra",
+                    position_gradient.svd(false, false).singular_values.iter(),
+                ),
+                ("svd3", svd.singular_values.iter()),
+            ],
+            1e-6,
+        );
+        check_iters(
+            [
+                ("position gradient", position_gradient.iter()),
+                ("recomposed", svd.recompose().iter()),
+            ],
+            1e-6,
+        );
+        for rotation in [svd.u, svd.v_t] {
+            check_iters(
+                [
+                    ("identity", Matrix3::identity().iter()),
+                    ("orthogonal", (rotation * rotation.transpose()).iter()),
+                ],
+                1e-6,
+            );
+        }
+    });
+}
+
+#[test]
+fn test_first_piola_stress_neo_hookean_svd3() {
+    for [mu, lambda] in test_lame_parameters() {
+        run_with_random_position_gradients(1000, |position_gradient| {
+            if position_gradient.safe_inverse().is_none() {
+                return;
+            }
+            let without_svd = first_piola_stress_neo_hookean(mu, lambda, &position_gradient);
+            let svd = svd3(&position_gradient);
+            let with_svd = first_piola_stress_neo_hookean_svd(
+                mu,
+                lambda,
+                &svd.u,
+                &svd.singular_values,
+                &svd.v_t,
+            );
+            check_iters(
+                [
+                    ("without svd", without_svd.iter()),
+                    ("with svd3", with_svd.iter()),
+                ],
+                1e-5,
+            )
+        });
+    }
+}
+
+#[test]
+fn test_first_piola_stress_inviscid_svd3() {
+    for (bulk_modulus, exponent) in test_inviscid_parameters() {
+        run_with_random_position_gradients(1000, |position_gradient| {
+            if position_gradient.safe_inverse().is_none() {
+                return;
+            }
+            let without_svd =
+                first_piola_stress_inviscid(bulk_modulus, exponent, &position_gradient);
+            let svd = svd3(&position_gradient);
+            let with_svd = first_piola_stress_inviscid_svd(
+                bulk_modulus,
+                exponent,
+                &svd.u,
+                &svd.singular_values,
+                &svd.v_t,
+            );
+            check_iters(
+                [
+                    ("without svd", without_svd.iter()),
+                    ("with svd3", with_svd.iter()),
+                ],
+                1e-5,
+            )
+        });
+    }
+}
+
+fn random_position_gradient_lanes() -> Vec<Matrix3<T>> {
+    let position_gradients = RefCell::new(Vec::new());
+    run_with_random_position_gradients(100, |position_gradient| {
+        position_gradients.borrow_mut().push(position_gradient)
+    });
+    position_gradients.into_inner()
+}
+
+#[test]
+fn test_first_piola_stress_neo_hookean_lanes() {
+    let position_gradients = random_position_gradient_lanes();
+    for [mu, lambda] in test_lame_parameters() {
+        for batch in position_gradients.chunks(LANES) {
+            let lanes = Matrix3Lanes::from_fn(|l| batch[l % batch.len()]);
+            let with_lanes =
+                first_piola_stress_neo_hookean_lanes(&[mu; LANES], &[lambda; LANES], &lanes);
+            for (l, position_gradient) in batch.iter().enumerate() {
+                let without_lanes = first_piola_stress_neo_hookean(mu, lambda, position_gradient);
+                check_iters(
+                    [
+                        ("without lanes", without_lanes.iter()),
+                        ("with lanes", with_lanes.lane(l).iter()),
+                    ],
+                    1e-8,
+                );
+            }
+        }
+    }
+}
+
+#[test]
+fn test_first_piola_stress_inviscid_lanes() {
+    let position_gradients = random_position_gradient_lanes();
+    for (bulk_modulus, exponent) in test_inviscid_parameters() {
+        for batch in position_gradients.chunks(LANES) {
+            let lanes = Matrix3Lanes::from_fn(|l| batch[l % batch.len()]);
+            let with_lanes = first_piola_stress_inviscid_lanes(
+                &[bulk_modulus; LANES],
+                &[exponent; LANES],
+                &lanes,
+            );
+            for (l, position_gradient) in batch.iter().enumerate() {
+                let without_lanes =
+                    first_piola_stress_inviscid(bulk_modulus, exponent, position_gradient);
+                check_iters(
+                    [
+                        ("without lanes", without_lanes.iter()),
+                        ("with lanes", with_lanes.lane(l).iter()),
+                    ],
+                    1e-8,
+                );
+            }
+        }
+    }
+}
+
+#[test]
+fn test_cauchy_stress_general_viscosity_lanes() {
+    let velocity_gradients: Vec<Matrix3<T>> = (0..100).map(|_| Matrix3::new_random()).collect();
+    for [dynamic, bulk] in test_viscosity_parameters() {
+        for batch in velocity_gradients.chunks(LANES) {
+            let lanes = Matrix3Lanes::from_fn(|l| batch[l % batch.len()]);
+            let with_lanes =
+                cauchy_stress_general_viscosity_lanes(&[dynamic; LANES], &[bulk; LANES], &lanes);
+            for (l, velocity_gradient) in batch.iter().enumerate() {
+                let without_lanes =
+                    cauchy_stress_general_viscosity(dynamic, bulk, velocity_gradient);
+                check_iters(
+                    [
+                        ("without lanes", without_lanes.iter()),
+                        ("with lanes", with_lanes.lane(l).iter()),
+                    ],
+                    1e-8,
+                );
+            }
+        }
+    }
+}
+
 fn check_iters<'a>(
     [(a_name, a_iter), (b_name, b_iter)]: [(&'static str, impl IntoIterator<Item = &'a T>); 2],
     eps: T,
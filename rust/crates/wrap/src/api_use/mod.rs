@@ -8,6 +8,7 @@
 
 use anyhow::Result;
 use pyo3::{prelude::*, types::PyList};
+use serde_json::{from_str, to_string};
 
 pub mod simulation;
 pub mod simulation_input;
@@ -18,3 +19,17 @@ pub fn available_gpus<'py>(py: Python<'py>) -> Result<Bound<'py, PyList>> {
         crate::hot_reloadable::with_context(|context| context.available_gpus())?;
     Ok(PyList::new(py, gpus)?)
 }
+
+#[pyfunction]
+#[pyo3(signature = (*, settings))]
+pub fn update_bake_queue(settings: &str) -> Result<String> {
+    crate::hot_reloadable::try_with_context(|context| {
+        Ok(to_string(&context.update_bake_queue(from_str(settings)?)?)?)
+    })
+}
+
+#[pyfunction]
+#[pyo3(signature = (*, uuid, offset))]
+pub fn move_in_bake_queue(uuid: &str, offset: i64) -> Result<()> {
+    crate::hot_reloadable::try_with_context(|context| context.move_in_bake_queue(uuid, offset))
+}
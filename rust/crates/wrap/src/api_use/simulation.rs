@@ -6,7 +6,7 @@
 // license that can be found in the LICENSE_MIT file or at
 // https://opensource.org/licenses/MIT.
 
-use anyhow::{Context, Result};
+use anyhow::{anyhow, Context, Result};
 use numpy::PyArray1;
 use pyo3::{prelude::*, types::PyList};
 use serde_json::{from_str, to_string};
@@ -35,82 +35,79 @@ impl Simulation {
         })
     }
 
+    /// Shares the input and the frames before `frame`, baking continues from there.
+    #[pyo3(signature = (*, uuid, directory, frame))]
+    pub fn fork(&self, uuid: String, directory: String, frame: usize) -> Result<Self> {
+        try_with_context(move |context| {
+            context.fork_simulation(&self.0, uuid.clone(), directory.into(), frame)?;
+            Ok(Self(uuid))
+        })
+    }
+
     pub fn uuid(&self) -> String {
         self.0.clone()
     }
 
     pub fn input_header(&self) -> Result<String> {
-        try_with_context(|context| {
-            Ok(to_string(
-                &context
-                    .get_simulation(&self.0)
-                    .with_context(|| format!("No simulation found for {}", self.0))?
-                    .input_header()?,
-            )
-            .unwrap())
+        self.with_simulation(|simulation| Ok(to_string(&simulation.input_header()?).unwrap()))
+    }
+
+    pub fn changes(&self) -> Result<u64> {
+        with_context(|context| {
+            context.get_simulation(&self.0).map_or(0, |simulation| {
+                simulation
+                    .read()
+                    .map_or(0, |simulation| simulation.changes())
+            })
         })
     }
 
     pub fn poll(&self) -> Result<String> {
-        try_with_context(|context| {
-            Ok(to_string(
-                &context
-                    .get_simulation_mut(&self.0)
-                    .with_context(|| format!("No simulation found for {}", self.0))?
-                    .poll()?,
-            )?)
-        })
+        self.with_simulation_mut(|simulation| Ok(to_string(&simulation.poll()?)?))
     }
 
     pub fn computing(&self) -> Result<bool> {
         with_context(|context| {
-            context
-                .get_simulation(&self.0)
-                .is_some_and(|simulation| simulation.computing())
+            context.get_simulation(&self.0).is_some_and(|simulation| {
+                simulation
+                    .read()
+                    .is_ok_and(|simulation| simulation.computing())
+            })
         })
     }
 
     #[pyo3(signature = (*, compute_settings))]
     pub fn start_compute(&self, compute_settings: &str) -> Result<()> {
-        try_with_context(|context| {
-            context
-                .get_simulation_mut(&self.0)
-                .with_context(|| format!("No simulation found for {}", self.0))?
-                .start_compute(
-                    from_str(compute_settings)
-                        .context("Compute settings string isn't valid json")?,
-                )
+        self.with_simulation_mut(|simulation| {
+            simulation.start_compute(
+                from_str(compute_settings).context("Compute settings string isn't valid json")?,
+            )
         })
     }
 
     pub fn pause_compute(&self) -> Result<()> {
-        try_with_context(|context| {
-            context
-                .get_simulation_mut(&self.0)
-                .with_context(|| format!("No simulation found for {}", self.0))?
-                .pause_compute()
-        })
+        self.with_simulation_mut(|simulation| simulation.pause_compute())
     }
 
     pub fn available_frames(&self) -> Result<usize> {
         with_context(|context| {
-            context
-                .get_simulation(&self.0)
-                .map_or(0, |simulation| simulation.available_frames())
+            context.get_simulation(&self.0).map_or(0, |simulation| {
+                simulation
+                    .read()
+                    .map_or(0, |simulation| simulation.available_frames())
+            })
         })
     }
 
     pub fn available_attributes<'py>(&self, py: Python<'py>) -> Result<Bound<'py, PyList>> {
-        try_with_context(|context| {
-            let attributes = context
-                .get_simulation(&self.0)
-                .with_context(|| format!("No simulation found for {}", self.0))?
+        let attributes = self.with_simulation(|simulation| {
+            simulation
                 .available_attributes()?
                 .into_iter()
                 .map(|attribute| Ok(to_string(&attribute)?))
-                .collect::<Result<Vec<_>>>()?;
-            Ok(PyList::new(py, attributes)?)
-        })
+                .collect::<Result<Vec<_>>>()
+        })?;
+        Ok(PyList::new(py, attributes)?)
     }
 
     #[pyo3(signature = (*, frame, attribute))]
@@ -120,16 +117,16 @@ impl Simulation {
         frame: usize,
         attribute: &str,
     ) -> Result<Bound<'py, PyArray1<f32>>> {
-        try_with_context(|context| {
-            let flat_attribute = context
-                .get_simulation(&self.0)
-                .with_context(|| format!("No simulation found for {}", self.0))?
-                .fetch_flat_attribute_f32(
+        // reading and copying doesn't need Python, so other threads can fetch meanwhile
+        let flat_attribute = py.detach(|| {
+            self.with_simulation(|simulation| {
+                simulation.fetch_flat_attribute_f32(
                     frame,
                     from_str(attribute).context("Attribute string isn't valid json")?,
-                )?;
-            Ok(PyArray1::from_vec(py, flat_attribute))
-        })
+                )
+            })
+        })?;
+        Ok(PyArray1::from_vec(py, flat_attribute))
     }
 
     #[pyo3(signature = (*, frame, attribute))]
@@ -139,30 +136,57 @@ impl Simulation {
         frame: usize,
         attribute: &str,
     ) -> Result<Bound<'py, PyArray1<i32>>> {
-        try_with_context(|context| {
-            let flat_attribute = context
-                .get_simulation(&self.0)
-                .with_context(|| format!("No simulation found for {}", self.0))?
-                .fetch_flat_attribute_i32(
+        // reading and copying doesn't need Python, so other threads can fetch meanwhile
+        let flat_attribute = py.detach(|| {
+            self.with_simulation(|simulation| {
+                simulation.fetch_flat_attribute_i32(
                     frame,
                     from_str(attribute).context("Attribute string isn't valid json")?,
-                )?;
-            Ok(PyArray1::from_vec(py, flat_attribute))
-        })
+                )
+            })
+        })?;
+        Ok(PyArray1::from_vec(py, flat_attribute))
     }
 
-    pub fn stats(&self) -> Result<String> {
-        try_with_context(|context| {
-            Ok(to_string(
-                &context
-                    .get_simulation(&self.0)
-                    .context("No simulation found for {self.0}")?
-                    .stats()?,
-            )?)
-        })
+    #[pyo3(signature = (*, frame))]
+    pub fn stats(&self, frame: Option<usize>) -> Result<String> {
+        self.with_simulation(|simulation| Ok(to_string(&simulation.stats(frame)?)?))
     }
 
     pub fn drop(&self) -> Result<()> {
         with_context(move |context| context.drop_simulation(&self.0))
     }
 }
+
+impl Simulation {
+    // Shares the simulation with other read-only calls, like fetching from another thread.
+    fn with_simulation<R>(
+        &self,
+        f: impl FnOnce(&dyn squishy_volumes_api::Simulation) -> Result<R>,
+    ) -> Result<R> {
+        try_with_context(|context| {
+            let simulation = context
+                .get_simulation(&self.0)
+                .with_context(|| format!("No simulation found for {}", self.0))?;
+            let simulation = simulation
+                .read()
+                .map_err(|_| anyhow!("Simulation {} is poisoned", self.0))?;
+            f(&*simulation)
+        })
+    }
+
+    fn with_simulation_mut<R>(
+        &self,
+        f: impl FnOnce(&mut dyn squishy_volumes_api::Simulation) -> Result<R>,
+    ) -> Result<R> {
+        try_with_context(|context| {
+            let simulation = context
+                .get_simulation(&self.0)
+                .with_context(|| format!("No simulation found for {}", self.0))?;
+            let mut simulation = simulation
+                .write()
+                .map_err(|_| anyhow!("Simulation {} is poisoned", self.0))?;
+            f(&mut *simulation)
+        })
+    }
+}
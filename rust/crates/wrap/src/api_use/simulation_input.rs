@@ -6,7 +6,7 @@
 // license that can be found in the LICENSE_MIT file or at
 // https://opensource.org/licenses/MIT.
 
-use anyhow::{Context, Result};
+use anyhow::{anyhow, Context, Result};
 use numpy::PyReadonlyArray1;
 use pyo3::prelude::*;
 use serde_json::from_str;
@@ -44,6 +44,8 @@ impl SimulationInput {
             context
                 .get_simulation_input()
                 .context("Not recording input")?
+                .lock()
+                .map_err(|_| anyhow!("Simulation input is poisoned"))?
                 .start_frame(from_str(frame_start).context("Frame start string isn't valid JSON")?)
         })
     }
@@ -58,6 +60,8 @@ impl SimulationInput {
             context
                 .get_simulation_input()
                 .context("Not recording input")?
+                .lock()
+                .map_err(|_| anyhow!("Simulation input is poisoned"))?
                 .record_input(
                     from_str(meta).context("Meta string isn't valid JSON")?,
                     InputBulk::Bool(bulk.as_slice()?),
@@ -75,6 +79,8 @@ impl SimulationInput {
             context
                 .get_simulation_input()
                 .context("Not recording input")?
+                .lock()
+                .map_err(|_| anyhow!("Simulation input is poisoned"))?
                 .record_input(
                     from_str(meta).context("Meta string isn't valid JSON")?,
                     InputBulk::Floats(bulk.as_slice()?),
@@ -92,6 +98,8 @@ impl SimulationInput {
             context
                 .get_simulation_input()
                 .context("Not recording input")?
+                .lock()
+                .map_err(|_| anyhow!("Simulation input is poisoned"))?
                 .record_input(
                     from_str(meta).context("Meta string isn't valid JSON")?,
                     InputBulk::Ints(bulk.as_slice()?),
@@ -104,6 +112,8 @@ impl SimulationInput {
             context
                 .get_simulation_input()
                 .context("Not recording input")?
+                .lock()
+                .map_err(|_| anyhow!("Simulation input is poisoned"))?
                 .finish_frame()
         })
     }
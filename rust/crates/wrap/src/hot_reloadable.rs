@@ -9,7 +9,7 @@
 use anyhow::{bail, Context, Result};
 use build_info::BuildInfo;
 use lazy_static::lazy_static;
-use std::sync::Mutex;
+use std::sync::RwLock;
 
 #[cfg(feature = "hot_reload")]
 use std::thread::spawn;
@@ -42,9 +42,11 @@ pub mod squishy_volumes_hot_reload {
     pub fn subscribe() -> hot_lib_reloader::LibReloadObserver {}
 }
 
+// Calls only share this, the context and its simulations lock themselves.
+// Reloading takes it exclusively, so no call is running in the old library.
 lazy_static! {
-    static ref LOCK: Mutex<Option<Box<dyn squishy_volumes_api::Context>>> =
-        Mutex::new(Default::default());
+    static ref LOCK: RwLock<Option<Box<dyn squishy_volumes_api::Context>>> =
+        RwLock::new(Default::default());
 }
 
 #[derive(serde::Serialize)]
@@ -68,23 +70,23 @@ It's unlikely that the process can recover.
 Please consider restarting the application.";
 
 pub fn initialize() {
-    if let Ok(mut guard) = LOCK.lock() {
+    if let Ok(mut guard) = LOCK.write() {
         *guard = Some(squishy_volumes_hot_reload::create_context());
     } else {
         eprintln!("{BUG}");
     }
 }
 
-pub fn try_with_context<R, F: FnOnce(&mut dyn squishy_volumes_api::Context) -> Result<R>>(
+pub fn try_with_context<R, F: FnOnce(&dyn squishy_volumes_api::Context) -> Result<R>>(
     f: F,
 ) -> Result<R> {
-    if let Ok(mut guard) = LOCK.lock() {
-        return f(guard.as_mut().context(BUG)?.as_mut());
+    if let Ok(guard) = LOCK.read() {
+        return f(guard.as_ref().context(BUG)?.as_ref());
     }
     bail!(BUG)
 }
 
-pub fn with_context<R, F: FnOnce(&mut dyn squishy_volumes_api::Context) -> R>(f: F) -> Result<R> {
+pub fn with_context<R, F: FnOnce(&dyn squishy_volumes_api::Context) -> R>(f: F) -> Result<R> {
     try_with_context(|c| Ok(f(c)))
 }
 
@@ -97,7 +99,7 @@ pub fn handle_reload() {
             let update_blocker = lib_observer.wait_for_about_to_reload();
 
             // wait for any library calls to finish and block further calls
-            let mut context_guard = LOCK.lock().unwrap();
+            let mut context_guard = LOCK.write().unwrap();
 
             // cleanup
             let context = context_guard.take();
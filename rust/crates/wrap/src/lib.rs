@@ -20,7 +20,10 @@ use hot_reloadable::{initialize, CombinedBuildInfo};
 use hot_reloadable::handle_reload;
 
 mod api_use;
-use crate::api_use::{available_gpus, simulation::Simulation, simulation_input::SimulationInput};
+use crate::api_use::{
+    available_gpus, move_in_bake_queue, simulation::Simulation, simulation_input::SimulationInput,
+    update_bake_queue,
+};
 
 fn squishy_volumes_wrap(m: &Bound<'_, PyModule>) -> PyResult<()> {
     initialize();
@@ -30,6 +33,8 @@ fn squishy_volumes_wrap(m: &Bound<'_, PyModule>) -> PyResult<()> {
 
     m.add_function(wrap_pyfunction!(build_info_as_json, m)?)?;
     m.add_function(wrap_pyfunction!(available_gpus, m)?)?;
+    m.add_function(wrap_pyfunction!(update_bake_queue, m)?)?;
+    m.add_function(wrap_pyfunction!(move_in_bake_queue, m)?)?;
 
     m.add_class::<Simulation>()?;
     m.add_class::<SimulationInput>()?;
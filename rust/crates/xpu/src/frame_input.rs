@@ -42,6 +42,7 @@ pub struct FrameInput {
 
     // needs to be rebuilt every frame change
     bvh: squishy_volumes_mesh_util::BoundingVolumeHierarchy,
+    narrow_band: squishy_volumes_mesh_util::NarrowBand,
 
     // b could be none (end of input)
     a: InputInterpolationPoint,
@@ -194,7 +195,7 @@ impl FrameInput {
 
         let vertex_velocities = linear_vertex_velocities(&consts, &a, b.as_ref());
 
-        let bvh = update_bvh(&consts, &topology, &a, b.as_ref());
+        let (bvh, narrow_band) = update_bvh(&consts, &topology, &a, b.as_ref());
 
         Ok(Self {
             frame,
@@ -203,6 +204,7 @@ impl FrameInput {
             input_reader,
             topology,
             bvh,
+            narrow_band,
             a,
             b,
             vertex_velocities,
@@ -214,6 +216,7 @@ impl FrameInput {
     }
 
     pub fn load(&mut self, frame: usize) -> Result<(), FrameInputError> {
+        let _span = tracing::debug_span!("load_input", frame).entered();
         let prior_frame = self.a.frame;
 
         // weird little dance s.t. the type of a can be non-option
@@ -231,7 +234,8 @@ impl FrameInput {
         if prior_frame != self.a.frame {
             self.vertex_velocities =
                 linear_vertex_velocities(&self.consts, &self.a, self.b.as_ref());
-            self.bvh = update_bvh(&self.consts, &self.topology, &self.a, self.b.as_ref());
+            (self.bvh, self.narrow_band) =
+                update_bvh(&self.consts, &self.topology, &self.a, self.b.as_ref());
         }
 
         self.frame = frame;
@@ -251,6 +255,10 @@ impl FrameInput {
         &self.bvh
     }
 
+    pub fn narrow_band(&self) -> &squishy_volumes_mesh_util::NarrowBand {
+        &self.narrow_band
+    }
+
     pub fn a(&self) -> &InputInterpolationPoint {
         &self.a
     }
@@ -347,14 +355,19 @@ fn linear_vertex_velocities(
     }
 }
 
+// The narrow band is built from the same leaf AABBs
 fn update_bvh(
     consts: &squishy_volumes_file_input::InputConsts,
     topology: &squishy_volumes_mesh_util::Topology,
     a: &InputInterpolationPoint,
     b: Option<&InputInterpolationPoint>,
-) -> squishy_volumes_mesh_util::BoundingVolumeHierarchy {
+) -> (
+    squishy_volumes_mesh_util::BoundingVolumeHierarchy,
+    squishy_volumes_mesh_util::NarrowBand,
+) {
     use squishy_volumes_util::Aabb;
 
+    let _span = tracing::debug_span!("update_bvh").entered();
     let margin = consts.forget_distance();
     let aabbs = topology
         .triangle_indices()
@@ -384,7 +397,18 @@ fn update_bvh(
                     .map(|c| ((c + margin) / consts.leaf_size).ceil() as i32),
             }
         })
-        .collect();
-
-    squishy_volumes_mesh_util::BoundingVolumeHierarchy::new(aabbs, consts.leaf_threshold)
+        .collect::<Vec<_>>();
+
+    let narrow_band = squishy_volumes_mesh_util::NarrowBand::new(
+        consts.leaf_size,
+        margin,
+        topology.triangle_indices(),
+        &aabbs,
+        &a.vertex_positions,
+        b.map(|b| b.vertex_positions.as_slice()),
+    );
+    (
+        squishy_volumes_mesh_util::BoundingVolumeHierarchy::new(aabbs, consts.leaf_threshold),
+        narrow_band,
+    )
 }
@@ -10,7 +10,7 @@ use std::{
     num::NonZero,
     sync::{
         Arc, Mutex, Weak,
-        atomic::{AtomicBool, Ordering},
+        atomic::{AtomicBool, AtomicU64, Ordering},
     },
 };
 
@@ -53,13 +53,20 @@ impl Report {
 pub struct Harness {
     run: Arc<AtomicBool>,
     report: Arc<Mutex<Report>>,
+    // shared with all scopes, counts every change to the reports
+    changes: Arc<AtomicU64>,
 }
 
 impl Harness {
     pub fn new(label: String, steps_to_completion: NonZero<usize>) -> Self {
         let run = Arc::new(AtomicBool::new(true));
         let report = Arc::new(Mutex::new(Report::new(label, steps_to_completion)));
-        Self { run, report }
+        let changes = Arc::new(AtomicU64::new(0));
+        Self {
+            run,
+            report,
+            changes,
+        }
     }
 
     pub fn cancel(&self) {
@@ -78,12 +85,16 @@ impl Harness {
         !self.run.load(Ordering::Relaxed)
     }
 
+    // Called after every phase, most of the time without any progress.
     pub fn step_to(&self, completed_steps: usize) -> Result<(), HarnessError> {
-        self.report
+        let mut report = self
+            .report
             .lock()
-            .map_err(|_| HarnessError::ReportMutexPoisoned)?
-            .info
-            .completed_steps = completed_steps;
+            .map_err(|_| HarnessError::ReportMutexPoisoned)?;
+        if report.info.completed_steps != completed_steps {
+            report.info.completed_steps = completed_steps;
+            self.changes.fetch_add(1, Ordering::Relaxed);
+        }
         Ok(())
     }
 
@@ -93,6 +104,7 @@ impl Harness {
             .map_err(|_| HarnessError::ReportMutexPoisoned)?
             .info
             .completed_steps += 1;
+        self.changes.fetch_add(1, Ordering::Relaxed);
         Ok(())
     }
 
@@ -119,8 +131,18 @@ impl Harness {
         let report = Arc::new(Mutex::new(Report::new(label, steps_to_completion)));
 
         current_report.sub_report = Arc::downgrade(&report);
+        self.changes.fetch_add(1, Ordering::Relaxed);
+
+        Ok(Self {
+            run,
+            report,
+            changes: self.changes.clone(),
+        })
+    }
 
-        Ok(Self { run, report })
+    /// Increases whenever `get_infos` might return something new.
+    pub fn changes(&self) -> u64 {
+        self.changes.load(Ordering::Relaxed)
     }
 
     pub fn get_infos(&self) -> Result<Vec<ReportInfo>, HarnessError> {